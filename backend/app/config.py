@@ -20,6 +20,22 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Async engine for hot endpoints (needs sqlalchemy[asyncio] and asyncpg/aiosqlite);
+    # DATABASE_ASYNC_URL defaults to DATABASE_URL with the async driver
+    DATABASE_ASYNC_ENABLED: bool = False
+    DATABASE_ASYNC_URL: str = ""
+    # Apply pending schema migrations at startup; off by default because deploys
+    # run app.tools.migrate_db once before starting workers
+    DB_MIGRATE_ON_STARTUP: bool = False
+    # Read replicas for read-only endpoints (comma-separated or JSON list)
+    DATABASE_READ_URLS: str = ""
+    DATABASE_READ_HEALTH_CHECK_SECONDS: float = 10.0
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    REDIS_READ_ROUTING_PREFIX: str = "careerbridge:rw"
     
     # Email (for OTP)
     SMTP_HOST: str = "smtp.gmail.com"
@@ -41,6 +57,8 @@ class Settings(BaseSettings):
     
     # Encryption
     ENCRYPTION_KEY: str
+    ENCRYPTION_SECONDARY_KEYS: str = ""  # Retired keys, still accepted for decryption
+    ENCRYPTION_REWRAP_WORKERS: int = 4
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -62,6 +80,56 @@ class Settings(BaseSettings):
     LOGIN_RATE_LIMIT_PER_HOUR: int = 10
     RATE_LIMIT_USE_REDIS: bool = True
     REDIS_RATE_LIMIT_PREFIX: str = "careerbridge:ratelimit"
+    # Dedicated connection pool for the rate limiter (URL defaults to REDIS_URL)
+    RATE_LIMIT_REDIS_URL: str = ""
+    RATE_LIMIT_REDIS_MAX_CONNECTIONS: int = 50
+    RATE_LIMIT_REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.25
+    # In-process fallback limiter: LRU-capped keys, idle keys swept periodically
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 50000
+    RATE_LIMIT_LOCAL_SWEEP_SECONDS: float = 30.0
+
+    # Feed timelines (fan-out on write)
+    FEED_TIMELINE_ENABLED: bool = True
+    FEED_TIMELINE_USE_REDIS: bool = True
+    FEED_TIMELINE_MAX_ENTRIES: int = 500
+    FEED_TIMELINE_TTL_SECONDS: int = 604800  # 7 days, Redis only
+    FEED_TIMELINE_LOCAL_MAX_USERS: int = 10000
+    FEED_TIMELINE_LOCAL_TTL_SECONDS: int = 60
+    REDIS_FEED_TIMELINE_PREFIX: str = "careerbridge:timeline"
+    FEED_COMMENT_PREVIEW_LIMIT: int = 3
+
+    # Job recommendations (precomputed per profile)
+    RECOMMENDATIONS_TOP_K: int = 50
+
+    # Bulk job import (NDJSON/CSV uploads)
+    JOB_IMPORT_MAX_ROWS: int = 5000
+    JOB_IMPORT_CHUNK_SIZE: int = 200
+
+    # Real-time messaging (WebSocket pub/sub)
+    REALTIME_USE_REDIS: bool = True
+    REDIS_REALTIME_PREFIX: str = "careerbridge:realtime"
+    REALTIME_QUEUE_SIZE: int = 100
+    REALTIME_TYPING_THROTTLE_SECONDS: float = 2.0
+
+    # Auth principal cache (in-process LRU, then REDIS_URL when reachable)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_USE_REDIS: bool = True
+    AUTH_CACHE_TTL_SECONDS: float = 15.0
+    AUTH_CACHE_REDIS_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    REDIS_AUTH_CACHE_PREFIX: str = "careerbridge:auth"
+
+    # Audit log writer
+    AUDIT_ASYNC_ENABLED: bool = True
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.2
+    AUDIT_VERIFY_BATCH_SIZE: int = 5000
+    AUDIT_CHECKPOINT_INTERVAL: int = 10000
+
+    # CPU-bound work executors
+    CPU_THREAD_POOL_SIZE: int = 8
+    CPU_PROCESS_POOL_SIZE: int = 0  # 0 disables the process pool
+    CPU_EXECUTOR_MAX_PENDING: int = 64
 
     # Request limits
     MAX_REQUEST_SIZE_BYTES: int = 12582912  # 12MB
@@ -73,6 +141,8 @@ class Settings(BaseSettings):
     # PKI
     PKI_PRIVATE_KEY_PATH: str = "/home/iiitd/projects/FCS/backend/keys/app_signing_private.pem"
     PKI_PUBLIC_KEY_PATH: str = "/home/iiitd/projects/FCS/backend/keys/app_signing_public.pem"
+    PKI_RETIRED_KEYS_DIR: str = ""  # defaults to "retired/" next to the public key
+    PKI_KEY_RELOAD_INTERVAL_SECONDS: float = 5.0
 
     # Host validation
     ALLOWED_HOSTS: str = "localhost,127.0.0.1,192.168.3.40"
@@ -103,6 +173,14 @@ class Settings(BaseSettings):
     @property
     def allowed_hosts_list(self) -> List[str]:
         return self._parse_list(self.ALLOWED_HOSTS)
+
+    @property
+    def database_read_urls_list(self) -> List[str]:
+        return self._parse_list(self.DATABASE_READ_URLS)
+
+    @property
+    def encryption_secondary_keys_list(self) -> List[str]:
+        return self._parse_list(self.ENCRYPTION_SECONDARY_KEYS)
     
     class Config:
         env_file = ".env"
@@ -1,17 +1,83 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+import functools
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+import anyio
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.utils.metrics import adjust_gauge, increment_counter, observe_latency
+
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+except Exception:  # greenlet is not installed
+    AsyncSession = None
+    async_sessionmaker = None
+    create_async_engine = None
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+def _timed_checkout(pool_cls):
+    """Pool subclass that records how long checkouts wait for a connection."""
+
+    class TimedPool(pool_cls):
+        def _do_get(self):
+            started_at = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                increment_counter("db.pool.checkout_timeouts")
+                raise
+            finally:
+                observe_latency("db.pool.checkout_wait", time.perf_counter() - started_at)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_cls.__name__}"
+    return TimedPool
+
+
+_TimedQueuePool = _timed_checkout(QueuePool)
+_TimedAsyncQueuePool = _timed_checkout(AsyncAdaptedQueuePool)
+
+
+def _engine_options(url: str, pool_cls) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,  # Verify connections before using
+        "echo": settings.DEBUG,  # Log SQL queries in debug mode
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single shared connection.
+        return options
+    options.update(
+        poolclass=pool_cls,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    return options
+
+
+def _track_checkouts(sync_engine, name: str) -> None:
+    event.listen(sync_engine, "checkout", lambda *_: adjust_gauge(f"db.pool.{name}.checked_out", 1))
+    event.listen(sync_engine, "checkin", lambda *_: adjust_gauge(f"db.pool.{name}.checked_out", -1))
+
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=settings.DEBUG   # Log SQL queries in debug mode
-)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL, _TimedQueuePool))
+_track_checkouts(engine, "sync")
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -20,6 +86,113 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_database_url() -> Optional[str]:
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    if not settings.DATABASE_ASYNC_ENABLED:
+        return None
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return None
+
+
+def _create_async_session_factory():
+    url = _async_database_url()
+    if url is None:
+        return None, None
+    if create_async_engine is None:
+        logger.warning("Async database engine requested but sqlalchemy[asyncio] is not installed")
+        return None, None
+    try:
+        async_db_engine = create_async_engine(url, **_engine_options(url, _TimedAsyncQueuePool))
+    except Exception:
+        logger.warning("Async database engine unavailable; using the sync engine in worker threads", exc_info=True)
+        return None, None
+    _track_checkouts(async_db_engine.sync_engine, "async")
+    return async_db_engine, async_sessionmaker(async_db_engine, autoflush=False, expire_on_commit=False)
+
+
+async_engine, AsyncSessionLocal = _create_async_session_factory()
+
+
+class _Replica:
+    __slots__ = ("engine", "session_factory", "healthy", "checked_at")
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, **_engine_options(url, _TimedQueuePool))
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.checked_at = time.monotonic()
+        event.listen(self.engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            self.healthy = False
+            self.checked_at = time.monotonic()
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas.
+
+    A replica whose health was last checked more than
+    DATABASE_READ_HEALTH_CHECK_SECONDS ago is probed with SELECT 1 before it
+    is handed out; dropped connections mark it unhealthy right away. When no
+    replica is healthy, reads fall back to the primary.
+    """
+
+    def __init__(self, urls: list[str]):
+        self._replicas = [_Replica(url) for url in urls]
+        self._next = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self._replicas)
+
+    @staticmethod
+    def _probe(replica: _Replica) -> None:
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+            increment_counter("db.replica.health_check_failures")
+        replica.checked_at = time.monotonic()
+
+    def choose(self) -> Optional[_Replica]:
+        if not self._replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self._replicas)):
+            replica = self._replicas[(start + offset) % len(self._replicas)]
+            if time.monotonic() - replica.checked_at >= settings.DATABASE_READ_HEALTH_CHECK_SECONDS:
+                self._probe(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+    def dispose(self) -> None:
+        for replica in self._replicas:
+            replica.engine.dispose()
+
+
+read_replicas = ReplicaSet(settings.database_read_urls_list)
+
+
+def read_session() -> Session:
+    """A session on the next healthy read replica, or on the primary if there is none."""
+    replica = read_replicas.choose()
+    if replica is None:
+        if read_replicas:
+            increment_counter("db.replica.fallback_to_primary")
+        return SessionLocal()
+    return replica.session_factory()
+
+
 # Dependency to get database session
 def get_db():
     """
@@ -31,3 +204,49 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class AsyncDB:
+    """
+    Runs ORM work for async handlers without blocking the event loop.
+
+    With the async engine configured, work runs through AsyncSession.run_sync
+    on the non-blocking driver. Otherwise a regular Session is used from a
+    worker thread. Either way the callable receives a sync Session, so
+    existing query helpers work unchanged.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if AsyncSession is not None and isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await anyio.to_thread.run_sync(functools.partial(fn, self.session, *args, **kwargs))
+
+
+@asynccontextmanager
+async def async_db_session() -> AsyncIterator[AsyncDB]:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield AsyncDB(session)
+        return
+
+    db = SessionLocal()
+    try:
+        yield AsyncDB(db)
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency for hot async endpoints; yields an AsyncDB."""
+    async with async_db_session() as db:
+        yield db
+
+
+async def dispose_engines() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
+    read_replicas.dispose()
+    engine.dispose()
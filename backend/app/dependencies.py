@@ -1,23 +1,97 @@
 """
 FastAPI dependencies for authentication and authorization
 """
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncIterator, Optional
+import anyio
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import AsyncDB, SessionLocal, async_db_session, get_db, read_replicas, read_session
 from app.models.user import User, UserRole
+from app.utils.auth_cache import AuthPrincipal, get_principal
+from app.utils.read_routing import note_write, recently_wrote
 from app.utils.security import verify_token
 
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
+class CurrentUser:
+    """
+    The authenticated user, backed by the cached auth principal.
+
+    id, role and the account flags come from the cache. Any other attribute
+    (email, totp_secret, ...) loads the User row from the request's session
+    on first use, and assignments are applied to that row.
+    """
+
+    __slots__ = ("_principal", "_db", "_user")
+
+    def __init__(self, principal: AuthPrincipal, db: Session):
+        object.__setattr__(self, "_principal", principal)
+        object.__setattr__(self, "_db", db)
+        object.__setattr__(self, "_user", None)
+
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            user = self._db.get(User, self._principal.id)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            object.__setattr__(self, "_user", user)
+        return self._user
+
+    def _field(self, name: str):
+        if self._user is not None:
+            return getattr(self._user, name)
+        return getattr(self._principal, name)
+
+    @property
+    def id(self) -> int:
+        return self._principal.id
+
+    @property
+    def role(self) -> UserRole:
+        return self._field("role")
+
+    @property
+    def is_active(self) -> bool:
+        return self._field("is_active")
+
+    @property
+    def is_suspended(self) -> bool:
+        return self._field("is_suspended")
+
+    @property
+    def is_verified(self) -> bool:
+        return self._field("is_verified")
+
+    def __getattr__(self, name: str):
+        return getattr(self.user, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self.user, name, value)
+
+
+async def _principal_from_token(token: str, db: Session) -> Optional[AuthPrincipal]:
+    payload = verify_token(token, token_type="access")
+    if not payload or payload.get("sub") is None:
+        return None
+    return await get_principal(db, int(payload["sub"]))
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     """
     Dependency to get the current authenticated user from JWT token
     
@@ -31,50 +105,43 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-    payload = verify_token(token, token_type="access")
-    
-    if not payload:
+    payload = verify_token(credentials.credentials, token_type="access")
+    if not payload or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+
+    principal = await get_principal(db, int(payload["sub"]))
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    if not user.is_active:
+
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
-    
-    if user.is_suspended:
+
+    if principal.is_suspended:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is suspended"
         )
-    
-    return user
+
+    if read_replicas and request.method in _WRITE_METHODS:
+        await note_write(principal.id)
+
+    return CurrentUser(principal, db)
 
 
 async def get_current_verified_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     Dependency to ensure current user is verified
     
@@ -96,8 +163,8 @@ async def get_current_verified_user(
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_verified_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_verified_user)
+) -> CurrentUser:
     """
     Dependency to ensure current user is an admin
     
@@ -119,8 +186,8 @@ async def get_current_admin(
 
 
 async def get_current_recruiter(
-    current_user: User = Depends(get_current_verified_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_verified_user)
+) -> CurrentUser:
     """
     Dependency to ensure current user is a recruiter or admin
     
@@ -144,7 +211,7 @@ async def get_current_recruiter(
 async def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CurrentUser]:
     """
     Dependency to optionally get current user (doesn't raise error if not authenticated)
     
@@ -158,15 +225,48 @@ async def get_optional_current_user(
     if not credentials:
         return None
     
-    token = credentials.credentials
-    payload = verify_token(token, token_type="access")
-    
-    if not payload:
-        return None
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
+    principal = await _principal_from_token(credentials.credentials, db)
+    if principal is None or not principal.is_active or principal.is_suspended:
         return None
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    return user if user and user.is_active and not user.is_suspended else None
+    return CurrentUser(principal, db)
+
+
+async def _reads_from_primary(current_user: Optional[CurrentUser]) -> bool:
+    if not read_replicas:
+        return True
+    return current_user is not None and await recently_wrote(current_user.id)
+
+
+async def get_read_db(
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user)
+) -> AsyncIterator[Session]:
+    """
+    Session for read-only endpoints, on a read replica when one is configured.
+
+    Users who wrote within READ_YOUR_WRITES_SECONDS read from the primary so
+    they see their own changes.
+    """
+    if await _reads_from_primary(current_user):
+        db = SessionLocal()
+    else:
+        db = await anyio.to_thread.run_sync(read_session)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user)
+) -> AsyncIterator[AsyncDB]:
+    """AsyncDB counterpart of get_read_db for the async handlers."""
+    if await _reads_from_primary(current_user):
+        async with async_db_session() as db:
+            yield db
+        return
+
+    session = await anyio.to_thread.run_sync(read_session)
+    try:
+        yield AsyncDB(session)
+    finally:
+        session.close()
@@ -2,18 +2,24 @@
 Main FastAPI application
 """
 import os
-import time
-from collections import defaultdict, deque
-from threading import Lock
+from functools import lru_cache
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import inspect, text
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, dispose_engines
+from app.migrations import MIGRATIONS, apply_migrations, current_revision, head_revision
+from app.utils.audit import start_audit_writer, stop_audit_writer
+from app.utils.auth_cache import configure_auth_cache
+from app.utils.executor import shutdown_executors
+from app.utils.rate_limit import LocalRateLimiter, connect_rate_limiter
+from app.utils.read_routing import configure_read_routing
+from app.utils.realtime import close_realtime_broker, configure_realtime_broker
+from app.utils.timeline import configure_timeline_store
 from app import models  # noqa: F401
 from app.routers import auth, profile, resume, admin, company, jobs, messaging, connections, search, feed
 
@@ -50,12 +56,39 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
 
+def _iter_routes(routes):
+    for route in routes:
+        # Newer FastAPI keeps included routers nested instead of copying their routes.
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from _iter_routes(included.routes)
+        else:
+            yield route
+
+
+@lru_cache(maxsize=4096)
+def _route_template(method: str, path: str) -> str:
+    """The path template of the route serving path (e.g. /jobs/{job_id}), so IDs share one limit."""
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    partial = None
+    for route in _iter_routes(app.router.routes):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
         super().__init__(app)
-        self._requests_by_key: dict[str, deque[float]] = defaultdict(deque)
         self._window_seconds = 60.0
-        self._lock = Lock()
+        self._local = LocalRateLimiter(
+            self._window_seconds,
+            max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS,
+            sweep_interval=settings.RATE_LIMIT_LOCAL_SWEEP_SECONDS,
+        )
 
     def _client_ip(self, request) -> str:
         forwarded_for = request.headers.get("x-forwarded-for")
@@ -70,45 +103,29 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return settings.AUTH_RATE_LIMIT_PER_MINUTE
         return settings.RATE_LIMIT_PER_MINUTE
 
-    def _redis_key(self, ip: str, path: str) -> str:
-        safe_path = path.strip("/").replace("/", ":") or "root"
-        return f"{settings.REDIS_RATE_LIMIT_PREFIX}:{ip}:{safe_path}"
+    def _redis_key(self, ip: str, route: str) -> str:
+        safe_route = route.strip("/").replace("/", ":") or "root"
+        return f"{settings.REDIS_RATE_LIMIT_PREFIX}:{ip}:{safe_route}"
 
-    async def _enforce_redis_limit(self, request, ip: str, path: str, limit: int):
-        redis_client = getattr(request.app.state, "rate_limit_redis", None)
-        if redis_client is None:
-            return None
+    def _too_many_requests(self, retry_after: int) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests. Please slow down."},
+            headers={"Retry-After": str(retry_after)},
+        )
 
-        now = time.time()
-        key = self._redis_key(ip, path)
-        window_start = now - self._window_seconds
+    async def _enforce_redis_limit(self, request, ip: str, route: str, limit: int):
+        limiter = getattr(request.app.state, "rate_limiter", None)
+        if limiter is None:
+            return None
 
         try:
-            pipeline = redis_client.pipeline()
-            pipeline.zremrangebyscore(key, "-inf", window_start)
-            pipeline.zcard(key)
-            _, current_count = await pipeline.execute()
-
-            if current_count >= limit:
-                oldest = await redis_client.zrange(key, 0, 0, withscores=True)
-                if oldest:
-                    retry_after = int(self._window_seconds - (now - float(oldest[0][1])))
-                else:
-                    retry_after = int(self._window_seconds)
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Too many requests. Please slow down."},
-                    headers={"Retry-After": str(max(retry_after, 1))},
-                )
-
-            member = f"{now}:{time.time_ns()}"
-            pipeline = redis_client.pipeline()
-            pipeline.zadd(key, {member: now})
-            pipeline.expire(key, int(self._window_seconds) + 5)
-            await pipeline.execute()
-            return False
+            allowed, retry_after = await limiter.hit(self._redis_key(ip, route), limit, self._window_seconds)
         except Exception:
             return None
+        if allowed:
+            return False
+        return self._too_many_requests(retry_after)
 
     async def dispatch(self, request, call_next):
         path = request.url.path
@@ -117,31 +134,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         ip = self._client_ip(request)
         limit = self._route_limit(path)
+        route = _route_template(request.method, path)
 
-        redis_response = await self._enforce_redis_limit(request, ip, path, limit)
+        redis_response = await self._enforce_redis_limit(request, ip, route, limit)
         if isinstance(redis_response, JSONResponse):
             return redis_response
         if redis_response is False:
             return await call_next(request)
 
-        now = time.monotonic()
-        key = f"{ip}:{path}"
-
-        with self._lock:
-            attempts = self._requests_by_key[key]
-            window_start = now - self._window_seconds
-            while attempts and attempts[0] < window_start:
-                attempts.popleft()
-
-            if len(attempts) >= limit:
-                retry_after = int(self._window_seconds - (now - attempts[0])) if attempts else 60
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Too many requests. Please slow down."},
-                    headers={"Retry-After": str(max(retry_after, 1))},
-                )
-
-            attempts.append(now)
+        allowed, retry_after = self._local.hit(f"{ip}:{route}", limit)
+        if not allowed:
+            return self._too_many_requests(retry_after)
 
         return await call_next(request)
 
@@ -174,6 +177,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts_list)
 app.add_middleware(RequestSizeLimitMiddleware)
@@ -201,62 +205,62 @@ app.include_router(search.router)
 app.include_router(feed.router)
 
 
-@app.on_event("startup")
-async def ensure_schema_updates():
-    """Ensure required user columns exist for mobile OTP verification."""
-    Base.metadata.create_all(bind=engine)
+def check_schema_revision() -> None:
+    """
+    Make sure the database schema is at the newest migration.
 
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
+    Costs one query when it is. Pending migrations are applied here only if
+    DB_MIGRATE_ON_STARTUP is set; deploys run app.tools.migrate_db instead.
+    """
+    with engine.connect() as connection:
+        revision = current_revision(connection)
+    head = head_revision(MIGRATIONS)
+    if revision == head:
         return
+    if not settings.DB_MIGRATE_ON_STARTUP:
+        raise RuntimeError(
+            f"Database schema is at revision {revision}, expected {head}; "
+            "run `python -m app.tools.migrate_db upgrade`"
+        )
+    apply_migrations(engine, MIGRATIONS)
 
-    existing_columns = {column["name"] for column in inspector.get_columns("users")}
-
-    with engine.begin() as connection:
-        if "mobile_number" not in existing_columns:
-            connection.execute(text("ALTER TABLE users ADD COLUMN mobile_number VARCHAR(20)"))
-        if "is_mobile_verified" not in existing_columns:
-            connection.execute(text("ALTER TABLE users ADD COLUMN is_mobile_verified BOOLEAN DEFAULT FALSE"))
-
-    if "resumes" in inspector.get_table_names():
-        resume_columns = {column["name"] for column in inspector.get_columns("resumes")}
-        with engine.begin() as connection:
-            if "file_hash_sha256" not in resume_columns:
-                connection.execute(text("ALTER TABLE resumes ADD COLUMN file_hash_sha256 VARCHAR(64)"))
-            if "integrity_signature" not in resume_columns:
-                connection.execute(text("ALTER TABLE resumes ADD COLUMN integrity_signature TEXT"))
-            if "integrity_algorithm" not in resume_columns:
-                connection.execute(text("ALTER TABLE resumes ADD COLUMN integrity_algorithm VARCHAR(50) DEFAULT 'rsa-pss-sha256'"))
-
-    if "profiles" in inspector.get_table_names():
-        profile_columns = {column["name"] for column in inspector.get_columns("profiles")}
-        with engine.begin() as connection:
-            if "education" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN education TEXT"))
-            if "experience" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN experience TEXT"))
-            if "skills" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN skills TEXT"))
-            if "privacy_education" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN privacy_education VARCHAR(20) DEFAULT 'public'"))
-            if "privacy_experience" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN privacy_experience VARCHAR(20) DEFAULT 'public'"))
-            if "privacy_skills" not in profile_columns:
-                connection.execute(text("ALTER TABLE profiles ADD COLUMN privacy_skills VARCHAR(20) DEFAULT 'public'"))
-
-    app.state.rate_limit_redis = None
-    if settings.RATE_LIMIT_USE_REDIS and redis is not None:
+
+@app.on_event("startup")
+async def startup_services():
+    """Check the schema revision and connect Redis-backed services."""
+    check_schema_revision()
+
+    app.state.redis = None
+    app.state.rate_limiter = None
+    if redis is not None and (
+        settings.RATE_LIMIT_USE_REDIS or settings.FEED_TIMELINE_USE_REDIS or settings.REALTIME_USE_REDIS
+    ):
         try:
             redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
             await redis_client.ping()
-            app.state.rate_limit_redis = redis_client
+            app.state.redis = redis_client
         except Exception:
-            app.state.rate_limit_redis = None
+            app.state.redis = None
+
+    if settings.RATE_LIMIT_USE_REDIS and redis is not None:
+        app.state.rate_limiter = await connect_rate_limiter()
+    configure_timeline_store(app.state.redis if settings.FEED_TIMELINE_USE_REDIS else None)
+    configure_realtime_broker(app.state.redis if settings.REALTIME_USE_REDIS else None)
+    configure_auth_cache(app.state.redis if settings.AUTH_CACHE_USE_REDIS else None)
+    configure_read_routing(app.state.redis)
+    start_audit_writer()
 
 
 @app.on_event("shutdown")
 async def shutdown_cleanup():
-    redis_client = getattr(app.state, "rate_limit_redis", None)
+    stop_audit_writer()
+    await close_realtime_broker()
+    shutdown_executors()
+    await dispose_engines()
+    rate_limiter = getattr(app.state, "rate_limiter", None)
+    if rate_limiter is not None:
+        await rate_limiter.close()
+    redis_client = getattr(app.state, "redis", None)
     if redis_client is None:
         return
 
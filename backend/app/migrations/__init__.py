@@ -0,0 +1,24 @@
+"""
+Versioned schema migrations.
+
+Applied versions are recorded in the schema_migrations table. Deploys apply
+pending migrations ahead of time with ``python -m app.tools.migrate_db``;
+worker startup then only reads the current revision.
+"""
+from app.migrations.runner import (
+    Migration,
+    apply_migrations,
+    current_revision,
+    head_revision,
+    pending_migrations,
+)
+from app.migrations.versions import MIGRATIONS
+
+__all__ = [
+    "MIGRATIONS",
+    "Migration",
+    "apply_migrations",
+    "current_revision",
+    "head_revision",
+    "pending_migrations",
+]
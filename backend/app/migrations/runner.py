@@ -0,0 +1,107 @@
+"""
+Applies schema migrations and tracks them in the schema_migrations table.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(32), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Serializes whole migration runs across workers and deploy hosts (PostgreSQL only).
+_ADVISORY_LOCK_ID = 0x43425F4D  # "CB_M"
+
+
+class Migration(NamedTuple):
+    version: str
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def add_column_if_missing(connection: Connection, table: str, column: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN unless the column already exists (databases that predate migrations)."""
+    inspector = inspect(connection)
+    if table not in inspector.get_table_names():
+        return
+    if column in {existing["name"] for existing in inspector.get_columns(table)}:
+        return
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def head_revision(migrations: list[Migration]) -> str:
+    return migrations[-1].version
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """The newest applied version, in a single query; None if nothing was applied yet."""
+    try:
+        return connection.execute(
+            select(schema_migrations.c.version).order_by(schema_migrations.c.version.desc()).limit(1)
+        ).scalar()
+    except (OperationalError, ProgrammingError):
+        # schema_migrations does not exist yet
+        if connection.in_transaction():
+            connection.rollback()
+        return None
+
+
+def _applied_versions(connection: Connection) -> set[str]:
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine: Engine, migrations: list[Migration]) -> list[Migration]:
+    with engine.connect() as connection:
+        _metadata.create_all(connection)
+        connection.commit()
+        applied = _applied_versions(connection)
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def apply_migrations(engine: Engine, migrations: list[Migration]) -> list[str]:
+    """Apply pending migrations in order, each in its own transaction; returns the applied versions."""
+    applied_now: list[str] = []
+    with engine.connect() as connection:
+        locked = connection.dialect.name == "postgresql"
+        if locked:
+            # Session-level lock, held across the per-migration transactions so
+            # a concurrent run waits before it even creates schema_migrations.
+            connection.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": _ADVISORY_LOCK_ID})
+            connection.commit()
+        try:
+            _metadata.create_all(connection)
+            connection.commit()
+
+            for migration in migrations:
+                with connection.begin():
+                    if migration.version in _applied_versions(connection):
+                        continue
+                    logger.info("Applying migration %s: %s", migration.version, migration.description)
+                    migration.upgrade(connection)
+                    connection.execute(schema_migrations.insert().values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.utcnow(),
+                    ))
+                applied_now.append(migration.version)
+        finally:
+            if locked:
+                # Pooled connections outlive this call; release the lock explicitly.
+                if connection.in_transaction():
+                    connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": _ADVISORY_LOCK_ID})
+                connection.commit()
+    return applied_now
@@ -0,0 +1,94 @@
+"""
+The ordered list of schema migrations.
+
+Versions are zero-padded so they sort lexically. Migrations must tolerate
+databases created before this table existed, where some of their changes were
+already made by the old startup patching.
+"""
+from __future__ import annotations
+
+from sqlalchemy.engine import Connection
+
+from app import models  # noqa: F401
+from app.database import Base
+from app.migrations.runner import Migration, add_column_if_missing
+from app.models.networking import JobApplication, JobPosting, Message, PostComment, UserPost
+from app.models.recommendation import JobRecommendation
+from app.models.search import SearchIndexVersion
+from app.models.skills import JobSkill, ProfileSkill, Skill
+from app.utils.search_index import ensure_search_indexes
+
+
+def _0001_create_tables(connection: Connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+
+def _0002_users_mobile_otp(connection: Connection) -> None:
+    add_column_if_missing(connection, "users", "mobile_number", "VARCHAR(20)")
+    add_column_if_missing(connection, "users", "is_mobile_verified", "BOOLEAN DEFAULT FALSE")
+
+
+def _0003_resume_integrity(connection: Connection) -> None:
+    add_column_if_missing(connection, "resumes", "file_hash_sha256", "VARCHAR(64)")
+    add_column_if_missing(connection, "resumes", "integrity_signature", "TEXT")
+    add_column_if_missing(connection, "resumes", "integrity_algorithm", "VARCHAR(50) DEFAULT 'rsa-pss-sha256'")
+    add_column_if_missing(connection, "resumes", "integrity_key_id", "VARCHAR(64)")
+
+
+def _0004_profile_sections(connection: Connection) -> None:
+    add_column_if_missing(connection, "profiles", "education", "TEXT")
+    add_column_if_missing(connection, "profiles", "experience", "TEXT")
+    add_column_if_missing(connection, "profiles", "skills", "TEXT")
+    add_column_if_missing(connection, "profiles", "privacy_education", "VARCHAR(20) DEFAULT 'public'")
+    add_column_if_missing(connection, "profiles", "privacy_experience", "VARCHAR(20) DEFAULT 'public'")
+    add_column_if_missing(connection, "profiles", "privacy_skills", "VARCHAR(20) DEFAULT 'public'")
+
+
+def _0005_conversation_read_marker(connection: Connection) -> None:
+    add_column_if_missing(connection, "conversation_participants", "last_read_message_id", "INTEGER")
+
+
+def _0006_feed_and_search_indexes(connection: Connection) -> None:
+    for table in (UserPost.__table__, JobPosting.__table__, PostComment.__table__, Message.__table__):
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    ensure_search_indexes(connection)
+
+
+def _0007_skill_taxonomy(connection: Connection) -> None:
+    # Existing rows are linked by `python -m app.tools.backfill_skills`.
+    for table in (Skill.__table__, JobSkill.__table__, ProfileSkill.__table__):
+        table.create(bind=connection, checkfirst=True)
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+def _0008_job_recommendations(connection: Connection) -> None:
+    # Filled by `python -m app.tools.refresh_recommendations`, or per user on first request.
+    table = JobRecommendation.__table__
+    table.create(bind=connection, checkfirst=True)
+    for index in table.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _0009_applicant_pipeline_index(connection: Connection) -> None:
+    for index in JobApplication.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _0010_search_index_versions(connection: Connection) -> None:
+    SearchIndexVersion.__table__.create(bind=connection, checkfirst=True)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration("0001", "Create tables", _0001_create_tables),
+    Migration("0002", "Add mobile OTP columns to users", _0002_users_mobile_otp),
+    Migration("0003", "Add integrity signature columns to resumes", _0003_resume_integrity),
+    Migration("0004", "Add education, experience and skills sections to profiles", _0004_profile_sections),
+    Migration("0005", "Add last read message marker to conversation participants", _0005_conversation_read_marker),
+    Migration("0006", "Create feed, messaging and search indexes", _0006_feed_and_search_indexes),
+    Migration("0007", "Create skills, job_skills and profile_skills", _0007_skill_taxonomy),
+    Migration("0008", "Create job_recommendations", _0008_job_recommendations),
+    Migration("0009", "Index job applications by job, status and date", _0009_applicant_pipeline_index),
+    Migration("0010", "Create search_index_versions", _0010_search_index_versions),
+]
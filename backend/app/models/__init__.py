@@ -1,6 +1,9 @@
 # Make models importable from app.models
 from app.models.user import User, Profile, ProfileView, OTPToken, UserRole
 from app.models.resume import Resume
+from app.models.skills import Skill, JobSkill, ProfileSkill
+from app.models.recommendation import JobRecommendation
+from app.models.search import SearchIndexVersion
 from app.models.networking import (
 	WorkMode,
 	EmploymentType,
@@ -32,6 +35,11 @@ __all__ = [
 	"OTPToken",
 	"UserRole",
 	"Resume",
+	"Skill",
+	"JobSkill",
+	"ProfileSkill",
+	"JobRecommendation",
+	"SearchIndexVersion",
 	"WorkMode",
 	"EmploymentType",
 	"ApplicationStatus",
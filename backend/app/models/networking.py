@@ -3,7 +3,7 @@ Models for companies, jobs, applications, messaging, and audit logs
 """
 from datetime import datetime
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -101,6 +101,9 @@ class JobPosting(Base):
     applications = relationship("JobApplication", back_populates="job", cascade="all, delete-orphan")
 
 
+Index("ix_job_postings_active_created_at", JobPosting.is_active, JobPosting.created_at.desc())
+
+
 class JobApplication(Base):
     __tablename__ = "job_applications"
 
@@ -122,6 +125,10 @@ class JobApplication(Base):
     job = relationship("JobPosting", back_populates="applications")
 
 
+# Recruiter pipeline pages: one job's applications by status, newest first.
+Index("ix_job_applications_job_status_created", JobApplication.job_id, JobApplication.status, JobApplication.created_at)
+
+
 class Conversation(Base):
     __tablename__ = "conversations"
 
@@ -143,6 +150,7 @@ class ConversationParticipant(Base):
     conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_read_message_id = Column(Integer, nullable=True)
 
     conversation = relationship("Conversation", back_populates="participants")
 
@@ -164,6 +172,9 @@ class Message(Base):
     conversation = relationship("Conversation", back_populates="messages")
 
 
+Index("ix_messages_conversation_created_id", Message.conversation_id, Message.created_at, Message.id)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -178,6 +189,17 @@ class AuditLog(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class AuditCheckpoint(Base):
+    __tablename__ = "audit_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    audit_log_id = Column(Integer, nullable=False, unique=True, index=True)
+    entry_hash = Column(String(64), nullable=False)
+    entries_verified = Column(Integer, nullable=False)
+    signature = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class ConnectionRequest(Base):
     __tablename__ = "connection_requests"
 
@@ -243,6 +265,9 @@ class UserPost(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+Index("ix_user_posts_author_created_at", UserPost.author_id, UserPost.created_at.desc())
+
+
 class PostLike(Base):
     __tablename__ = "post_likes"
     __table_args__ = (
@@ -264,3 +289,6 @@ class PostComment(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+Index("ix_post_comments_post_created_at", PostComment.post_id, PostComment.created_at)
@@ -0,0 +1,21 @@
+"""
+Precomputed job recommendations for candidates
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+class JobRecommendation(Base):
+    """One of a user's best-matching jobs, kept up to date by app.utils.recommendations"""
+    __tablename__ = "job_recommendations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+Index("ix_job_recommendations_user_score", JobRecommendation.user_id, JobRecommendation.score.desc())
+# Serves "who holds this job" when a job changes.
+Index("ix_job_recommendations_job", JobRecommendation.job_id)
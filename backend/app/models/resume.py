@@ -28,6 +28,7 @@ class Resume(Base):
     file_hash_sha256 = Column(String(64), nullable=True)
     integrity_signature = Column(String(4096), nullable=True)
     integrity_algorithm = Column(String(50), default="rsa-pss-sha256", nullable=False)
+    integrity_key_id = Column(String(64), nullable=True)  # Signing key; NULL for pre-rotation rows
     
     # Access control
     is_public = Column(Boolean, default=False)  # If true, anyone can download
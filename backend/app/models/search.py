@@ -0,0 +1,13 @@
+"""
+Change counters for the in-process search indexes
+"""
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class SearchIndexVersion(Base):
+    """Bumped by app.utils.search_index when a flush changes a column an index is built from"""
+    __tablename__ = "search_index_versions"
+
+    name = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
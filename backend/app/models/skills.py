@@ -0,0 +1,35 @@
+"""
+Normalized skills and their links to job postings and profiles
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Canonical lower-case form that aliases resolve to, e.g. "node.js" for "NodeJS"
+    slug = Column(String(100), nullable=False, unique=True, index=True)
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+
+    job_id = Column(Integer, ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+
+
+class ProfileSkill(Base):
+    __tablename__ = "profile_skills"
+
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+
+
+# Skill-first indexes serve "which jobs/profiles have skill X" lookups.
+Index("ix_job_skills_skill_job", JobSkill.skill_id, JobSkill.job_id)
+Index("ix_profile_skills_skill_profile", ProfileSkill.skill_id, ProfileSkill.profile_id)
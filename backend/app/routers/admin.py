@@ -3,18 +3,28 @@ Admin dashboard endpoints for user and platform management
 """
 import json
 from typing import Optional
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.database import get_db
+from app.database import AsyncDB, get_db
 from app.models.user import User, Profile
 from app.models.resume import Resume
 from app.models.networking import AuditLog
 from app.schemas.user import UserResponse, UserSuspend
 from app.schemas.networking import AuditLogResponse
-from app.dependencies import get_current_admin
-from app.utils.audit import log_audit_event, verify_audit_chain
-from app.utils.pki import sign_bytes, verify_signature, get_public_key_pem
+from app.dependencies import get_current_admin, get_read_db
+from app.utils.audit import (
+    flush_audit_events,
+    get_verification_job,
+    log_audit_event,
+    start_full_verification,
+    verify_audit_chain,
+)
+from app.utils.auth_cache import invalidate_principal
+from app.utils.metrics import metrics_snapshot
+from app.utils.pki import sign_with_key_id_async, verify_signature_async, get_public_key_pem
+from app.utils.rewrap import get_rewrap_job, start_rewrap_job
 
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
@@ -34,7 +44,8 @@ def _log_admin_view(db: Session, current_admin: User, action: str, details: Opti
 @router.get("/stats", response_model=dict)
 async def get_platform_stats(
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
     """
     Get platform statistics
@@ -46,19 +57,19 @@ async def get_platform_stats(
     - Total resumes uploaded
     - Users by role
     """
-    total_users = db.query(func.count(User.id)).scalar()
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
-    verified_users = db.query(func.count(User.id)).filter(User.is_verified == True).scalar()
-    suspended_users = db.query(func.count(User.id)).filter(User.is_suspended == True).scalar()
-    total_resumes = db.query(func.count(Resume.id)).scalar()
+    total_users = read_db.query(func.count(User.id)).scalar()
+    active_users = read_db.query(func.count(User.id)).filter(User.is_active == True).scalar()
+    verified_users = read_db.query(func.count(User.id)).filter(User.is_verified == True).scalar()
+    suspended_users = read_db.query(func.count(User.id)).filter(User.is_suspended == True).scalar()
+    total_resumes = read_db.query(func.count(Resume.id)).scalar()
     
     # Count by role
-    users_count = db.query(func.count(User.id)).filter(User.role == "user").scalar()
-    recruiters_count = db.query(func.count(User.id)).filter(User.role == "recruiter").scalar()
-    admins_count = db.query(func.count(User.id)).filter(User.role == "admin").scalar()
+    users_count = read_db.query(func.count(User.id)).filter(User.role == "user").scalar()
+    recruiters_count = read_db.query(func.count(User.id)).filter(User.role == "recruiter").scalar()
+    admins_count = read_db.query(func.count(User.id)).filter(User.role == "admin").scalar()
     
     # TOTP statistics
-    totp_enabled_count = db.query(func.count(User.id)).filter(User.totp_enabled == True).scalar()
+    totp_enabled_count = read_db.query(func.count(User.id)).filter(User.totp_enabled == True).scalar()
     
     _log_admin_view(db, current_admin, "admin_view_stats")
 
@@ -88,7 +99,8 @@ async def list_all_users(
     is_verified: Optional[bool] = None,
     is_suspended: Optional[bool] = None,
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
     """
     List all users with filtering and pagination
@@ -101,7 +113,7 @@ async def list_all_users(
     - is_verified: Filter by verification status
     - is_suspended: Filter by suspension status
     """
-    query = db.query(User)
+    query = read_db.query(User)
     
     # Apply filters
     if role:
@@ -145,7 +157,8 @@ async def list_all_users(
 async def get_user_details(
     user_id: int,
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific user
@@ -156,7 +169,7 @@ async def get_user_details(
     - Resume count
     - Account activity
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = read_db.query(User).filter(User.id == user_id).first()
     
     if not user:
         raise HTTPException(
@@ -164,8 +177,8 @@ async def get_user_details(
             detail="User not found"
         )
     
-    profile = db.query(Profile).filter(Profile.user_id == user_id).first()
-    resume_count = db.query(func.count(Resume.id)).filter(Resume.user_id == user_id).scalar()
+    profile = read_db.query(Profile).filter(Profile.user_id == user_id).first()
+    resume_count = read_db.query(func.count(Resume.id)).filter(Resume.user_id == user_id).scalar()
     
     _log_admin_view(db, current_admin, "admin_view_user_details", {"user_id": user_id})
 
@@ -219,8 +232,10 @@ async def suspend_user(
         actor_user_id=current_admin.id,
         target_id=str(user_id),
         details={"reason": suspend_data.reason},
+        sync=True,
     )
     db.commit()
+    await invalidate_principal(user_id)
     
     return {
         "message": f"User {user.email} suspended successfully",
@@ -260,8 +275,10 @@ async def activate_user(
         target_type="user",
         actor_user_id=current_admin.id,
         target_id=str(user_id),
+        sync=True,
     )
     db.commit()
+    await invalidate_principal(user_id)
     
     return {
         "message": f"User {user.email} activated successfully",
@@ -305,11 +322,13 @@ async def delete_user(
         actor_user_id=current_admin.id,
         target_id=str(user_id),
         details={"email": email},
+        sync=True,
     )
     
     # Delete will cascade to profile, otp_tokens, and resumes
     db.delete(user)
     db.commit()
+    await invalidate_principal(user_id)
     
     return {
         "message": f"User {email} deleted permanently",
@@ -322,12 +341,13 @@ async def list_all_resumes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
     """
     List all uploaded resumes (admin view)
     """
-    query = db.query(Resume)
+    query = read_db.query(Resume)
     
     total = query.count()
     resumes = query.offset(skip).limit(limit).all()
@@ -346,7 +366,8 @@ async def list_all_resumes(
 async def get_recent_activity(
     limit: int = Query(50, ge=1, le=500),
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
     """
     Get recent platform activity
@@ -356,14 +377,14 @@ async def get_recent_activity(
     - Recently uploaded resumes
     """
     recent_users = (
-        db.query(User)
+        read_db.query(User)
         .order_by(User.created_at.desc())
         .limit(limit)
         .all()
     )
     
     recent_resumes = (
-        db.query(Resume)
+        read_db.query(Resume)
         .order_by(Resume.uploaded_at.desc())
         .limit(limit)
         .all()
@@ -404,6 +425,7 @@ async def get_audit_logs(
     Get recent tamper-evident audit log entries.
     """
     _log_admin_view(db, current_admin, "admin_view_audit_logs", {"limit": limit})
+    await anyio.to_thread.run_sync(flush_audit_events)
 
     return (
         db.query(AuditLog)
@@ -418,22 +440,96 @@ async def verify_audit_logs(
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    result = verify_audit_chain(db)
+    await anyio.to_thread.run_sync(flush_audit_events)
+    result = await AsyncDB(db).run(verify_audit_chain)
     latest_entry = db.query(AuditLog).order_by(AuditLog.id.desc()).first()
     snapshot = {
         "valid": result["valid"],
         "broken_at_id": result["broken_at_id"],
         "total_entries": result["total_entries"],
+        "checkpoint_id": result["checkpoint_id"],
         "latest_entry_hash": latest_entry.entry_hash if latest_entry else None,
     }
     payload = json.dumps(snapshot, sort_keys=True).encode("utf-8")
-    signature = sign_bytes(payload)
-    signature_valid = verify_signature(payload, signature)
+    signature, key_id = await sign_with_key_id_async(payload)
+    signature_valid = await verify_signature_async(payload, signature, key_id)
 
-    _log_admin_view(db, current_admin, "admin_verify_audit_chain", {"valid": result["valid"]})
+    if not result["valid"]:
+        # Routine passing checks are not logged; each entry would extend the chain being verified.
+        _log_admin_view(
+            db,
+            current_admin,
+            "admin_verify_audit_chain",
+            {"valid": False, "broken_at_id": result["broken_at_id"], "reason": result["reason"]},
+        )
     return {
         **result,
         "pki_snapshot_signature": signature,
         "pki_signature_valid": signature_valid,
-        "signer_public_key": get_public_key_pem(),
+        "signer_key_id": key_id,
+        "signer_public_key": get_public_key_pem(key_id),
     }
+
+
+@router.post("/audit-logs/verify/full", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def start_full_audit_verification(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a background re-verification of the entire audit chain.
+
+    Poll /admin/audit-logs/verify/jobs/{job_id} for progress and the result.
+    """
+    await anyio.to_thread.run_sync(flush_audit_events)
+    job = start_full_verification(db)
+    _log_admin_view(db, current_admin, "admin_full_audit_verification_started", {"job_id": job.job_id})
+    return job.as_dict()
+
+
+@router.get("/audit-logs/verify/jobs/{job_id}", response_model=dict)
+async def get_audit_verification_job(
+    job_id: str,
+    current_admin: User = Depends(get_current_admin),
+):
+    job = get_verification_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Verification job not found")
+    return job.as_dict()
+
+
+@router.post("/encryption/rewrap", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def start_resume_rewrap(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Start re-encrypting stored resume files under the primary encryption key.
+
+    Poll /admin/encryption/rewrap/jobs/{job_id} for progress and the result.
+    """
+    job = start_rewrap_job()
+    _log_admin_view(db, current_admin, "admin_resume_rewrap_started", {"job_id": job.job_id})
+    return job.as_dict()
+
+
+@router.get("/encryption/rewrap/jobs/{job_id}", response_model=dict)
+async def get_resume_rewrap_job(
+    job_id: str,
+    current_admin: User = Depends(get_current_admin),
+):
+    job = get_rewrap_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rewrap job not found")
+    return job.as_dict()
+
+
+@router.get("/metrics", response_model=dict)
+async def get_runtime_metrics(
+    current_admin: User = Depends(get_current_admin),
+):
+    """
+    In-process runtime metrics for this worker: executor latency and queue
+    depth per operation.
+    """
+    return metrics_snapshot()
@@ -21,14 +21,15 @@ from app.schemas.user import (
     UserResponse, UserWithProfile
 )
 from app.utils.security import (
-    hash_password, verify_password,
+    hash_password_async, verify_password_async,
     create_access_token, create_refresh_token, verify_token
 )
 from app.utils.otp import create_otp_token, verify_otp
-from app.utils.totp import generate_totp_secret, get_totp_uri, generate_qr_code, verify_totp
+from app.utils.totp import generate_totp_secret, get_totp_uri, generate_qr_code_async, verify_totp
 from app.dependencies import get_current_user, get_current_verified_user
 from app.config import settings
 from app.utils.audit import log_audit_event
+from app.utils.auth_cache import invalidate_principal
 from app.utils.input_sanitization import sanitize_text
 
 
@@ -186,7 +187,7 @@ async def register(
             )
 
         existing_user.full_name = full_name
-        existing_user.hashed_password = hash_password(user_data.password)
+        existing_user.hashed_password = await hash_password_async(user_data.password)
         existing_user.role = user_data.role
         existing_user.mobile_number = normalized_mobile
         existing_user.is_active = True
@@ -200,6 +201,7 @@ async def register(
 
         db.commit()
         db.refresh(existing_user)
+        await invalidate_principal(existing_user.id)
 
         shared_otp, _ = create_otp_token(db, existing_user.id, purpose="registration")
         background_tasks.add_task(send_otp_email, existing_user.email, shared_otp, "registration")
@@ -230,7 +232,7 @@ async def register(
     new_user = User(
         email=user_data.email,
         mobile_number=normalized_mobile,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         full_name=full_name,
         role=user_data.role,
         is_active=True,
@@ -321,6 +323,7 @@ async def verify_otp_endpoint(
         target_id=str(user.id),
     )
     db.commit()
+    await invalidate_principal(user.id)
     
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
@@ -381,7 +384,7 @@ async def login(
     # Find user
     user = db.query(User).filter(User.email == login_data.email).first()
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -583,13 +586,14 @@ async def confirm_password_reset(
         )
     
     # Update password
-    user.hashed_password = hash_password(reset_data.new_password)
+    user.hashed_password = await hash_password_async(reset_data.new_password)
     log_audit_event(
         db,
         action="password_reset_confirmed",
         target_type="user",
         actor_user_id=user.id,
         target_id=str(user.id),
+        sync=True,
     )
     db.commit()
     
@@ -623,7 +627,7 @@ async def enable_totp(
     
     # Generate QR code
     totp_uri = get_totp_uri(secret, current_user.email)
-    qr_code = generate_qr_code(totp_uri)
+    qr_code = await generate_qr_code_async(totp_uri)
     
     return {
         "message": "TOTP secret generated. Scan QR code with authenticator app and verify.",
@@ -689,7 +693,7 @@ async def disable_totp(
         )
     
     # Verify password
-    if not verify_password(password, current_user.hashed_password):
+    if not await verify_password_async(password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
@@ -720,7 +724,7 @@ async def login_with_totp(
     # Find user
     user = db.query(User).filter(User.email == login_data.email).first()
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
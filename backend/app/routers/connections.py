@@ -14,42 +14,14 @@ from app.schemas.networking import (
 	UserConnectionResponse,
 )
 from app.utils.audit import log_audit_event
+from app.utils.relationships import resolve_relationship_statuses
+from app.utils.skills import profiles_with_skills, skill_filter_ids
+from app.utils.timeline import backfill_connection, purge_connection
 
 
 router = APIRouter(prefix="/connections", tags=["Connections"])
 
 
-def _relationship_status(db: Session, current_user_id: int, other_user_id: int) -> str:
-	existing = (
-		db.query(ConnectionRequest)
-		.filter(
-			or_(
-				and_(
-					ConnectionRequest.requester_id == current_user_id,
-					ConnectionRequest.recipient_id == other_user_id,
-				),
-				and_(
-					ConnectionRequest.requester_id == other_user_id,
-					ConnectionRequest.recipient_id == current_user_id,
-				),
-			)
-		)
-		.order_by(ConnectionRequest.updated_at.desc())
-		.first()
-	)
-
-	if not existing:
-		return "none"
-
-	if existing.status == ConnectionRequestStatus.ACCEPTED:
-		return "connected"
-
-	if existing.status == ConnectionRequestStatus.PENDING:
-		return "pending_sent" if existing.requester_id == current_user_id else "pending_received"
-
-	return "none"
-
-
 def _user_display_name(user: User | None) -> str | None:
 	if not user:
 		return None
@@ -59,12 +31,25 @@ def _user_display_name(user: User | None) -> str | None:
 @router.get("/search", response_model=list[UserConnectionResponse])
 async def search_users_for_connection(
 	query: str = Query("", min_length=0, max_length=100),
+	skills: str | None = Query(None, max_length=500),
 	limit: int = Query(20, ge=1, le=100),
 	current_user: User = Depends(get_current_verified_user),
 	db: Session = Depends(get_db),
 ):
+	"""Find people by name or email, optionally only those listing every skill in `skills` (comma-separated)."""
 	users_query = db.query(User).filter(User.id != current_user.id)
 
+	if skills:
+		skill_ids = skill_filter_ids(db, skills)
+		if skill_ids is None:
+			return []
+		if skill_ids:
+			# Only skills the profile owner has made public can be searched on.
+			users_query = users_query.join(Profile, Profile.user_id == User.id).filter(
+				Profile.privacy_skills == "public",
+				Profile.id.in_(profiles_with_skills(skill_ids)),
+			)
+
 	if query:
 		pattern = f"%{query}%"
 		users_query = users_query.filter(
@@ -76,20 +61,26 @@ async def search_users_for_connection(
 
 	users = users_query.order_by(User.full_name.asc()).limit(limit).all()
 
-	results = []
-	for user in users:
-		profile = db.query(Profile).filter(Profile.user_id == user.id).first()
-		results.append(
-			UserConnectionResponse(
-				id=user.id,
-				full_name=user.full_name or user.email,
-				role=user.role.value,
-				headline=profile.headline if profile else None,
-				connection_status=_relationship_status(db, current_user.id, user.id),
-			)
-		)
+	if not users:
+		return []
+
+	user_ids = [user.id for user in users]
+	profile_map = {
+		profile.user_id: profile
+		for profile in db.query(Profile).filter(Profile.user_id.in_(user_ids)).all()
+	}
+	status_map = resolve_relationship_statuses(db, current_user.id, user_ids)
 
-	return results
+	return [
+		UserConnectionResponse(
+			id=user.id,
+			full_name=user.full_name or user.email,
+			role=user.role.value,
+			headline=profile_map.get(user.id).headline if profile_map.get(user.id) else None,
+			connection_status=status_map.get(user.id, "none"),
+		)
+		for user in users
+	]
 
 
 @router.post("/requests", response_model=ConnectionRequestResponse, status_code=status.HTTP_201_CREATED)
@@ -247,6 +238,7 @@ async def accept_connection_request(
 
 	db.commit()
 	db.refresh(request)
+	await backfill_connection(db, request.requester_id, request.recipient_id)
 	return request
 
 
@@ -359,6 +351,7 @@ async def remove_friend(
 	)
 
 	db.commit()
+	await purge_connection(db, current_user.id, friend_id)
 	return {"message": "Friend removed"}
 
 
@@ -9,16 +9,14 @@ from datetime import datetime
 from typing import cast
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
-from sqlalchemy import or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
-from app.dependencies import get_current_verified_user
+from app.database import AsyncDB, get_async_db
+from app.dependencies import get_async_read_db, get_current_verified_user
 from app.models.networking import (
     Company,
-    ConnectionRequest,
-    ConnectionRequestStatus,
     JobPosting,
     PostComment,
     PostLike,
@@ -29,11 +27,15 @@ from app.schemas.networking import (
     CompanyJobFeedResponse,
     HomeFeedResponse,
     PostCommentCreate,
+    PostCommentPageResponse,
     PostCommentResponse,
     PostUpdateRequest,
     UserPostResponse,
 )
 from app.utils.input_sanitization import sanitize_text
+from app.utils.relationships import get_connected_user_ids
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.utils.timeline import fan_out_post, read_timeline, retract_post
 
 
 router = APIRouter(prefix="/feed", tags=["Feed"])
@@ -43,29 +45,10 @@ os.makedirs(POST_IMAGE_DIR, exist_ok=True)
 _ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
 
 
-def _get_connected_user_ids(db: Session, current_user_id: int) -> set[int]:
-    rows = (
-        db.query(ConnectionRequest)
-        .filter(
-            ConnectionRequest.status == ConnectionRequestStatus.ACCEPTED,
-            or_(
-                ConnectionRequest.requester_id == current_user_id,
-                ConnectionRequest.recipient_id == current_user_id,
-            ),
-        )
-        .all()
-    )
-    user_ids = {current_user_id}
-    for row in rows:
-        requester_id = int(cast(int, row.requester_id))
-        recipient_id = int(cast(int, row.recipient_id))
-        user_ids.add(recipient_id if requester_id == current_user_id else requester_id)
-    return user_ids
-
-
 def _build_post_response(post: UserPost, author_name: str) -> UserPostResponse:
     comments = cast(list[PostCommentResponse], getattr(post, "_feed_comments", []))
     like_count = int(cast(int, getattr(post, "_feed_like_count", 0)))
+    comment_count = int(cast(int, getattr(post, "_feed_comment_count", len(comments))))
     is_liked_by_me = bool(cast(bool, getattr(post, "_feed_is_liked", False)))
     return UserPostResponse(
         id=int(cast(int, post.id)),
@@ -74,7 +57,7 @@ def _build_post_response(post: UserPost, author_name: str) -> UserPostResponse:
         content=str(cast(str, post.content)),
         image_url=cast(str | None, post.image_url),
         like_count=like_count,
-        comment_count=len(comments),
+        comment_count=comment_count,
         is_liked_by_me=is_liked_by_me,
         comments=comments,
         created_at=cast(datetime, post.created_at),
@@ -91,50 +74,90 @@ def _extract_image_path(image_url: str | None) -> str | None:
     return os.path.join(POST_IMAGE_DIR, filename)
 
 
+def _comment_responses(db: Session, comments: list[PostComment]) -> list[PostCommentResponse]:
+    comment_user_ids = {int(cast(int, comment.user_id)) for comment in comments}
+    users = db.query(User.id, User.full_name, User.email).filter(User.id.in_(comment_user_ids)).all() if comment_user_ids else []
+    user_map = {int(user_id): (full_name or email) for user_id, full_name, email in users}
+
+    return [
+        PostCommentResponse(
+            id=int(cast(int, comment.id)),
+            post_id=int(cast(int, comment.post_id)),
+            user_id=int(cast(int, comment.user_id)),
+            user_name=user_map.get(int(cast(int, comment.user_id)), f"User #{int(cast(int, comment.user_id))}"),
+            content=str(cast(str, comment.content)),
+            created_at=cast(datetime, comment.created_at),
+            updated_at=cast(datetime | None, comment.updated_at),
+        )
+        for comment in comments
+    ]
+
+
 def _hydrate_post_interactions(db: Session, posts: list[UserPost], current_user_id: int) -> None:
+    """
+    Attach like/comment counts, the viewer's like flag and a preview of the
+    latest FEED_COMMENT_PREVIEW_LIMIT comments to each post.
+    """
     post_ids = [int(cast(int, post.id)) for post in posts]
     if not post_ids:
         return
 
-    likes = db.query(PostLike).filter(PostLike.post_id.in_(post_ids)).all()
-    like_count_map: dict[int, int] = {}
-    liked_by_me = set()
-    for like in likes:
-        post_id = int(cast(int, like.post_id))
-        user_id = int(cast(int, like.user_id))
-        like_count_map[post_id] = like_count_map.get(post_id, 0) + 1
-        if user_id == current_user_id:
-            liked_by_me.add(post_id)
-
-    comments = (
-        db.query(PostComment)
-        .filter(PostComment.post_id.in_(post_ids))
-        .order_by(PostComment.created_at.asc())
-        .all()
-    )
-    comment_user_ids = {int(cast(int, comment.user_id)) for comment in comments}
-    users = db.query(User).filter(User.id.in_(comment_user_ids)).all() if comment_user_ids else []
-    user_map = {int(cast(int, user.id)): (user.full_name or user.email) for user in users}
-
-    comments_map: dict[int, list[PostCommentResponse]] = {post_id: [] for post_id in post_ids}
-    for comment in comments:
-        post_id = int(cast(int, comment.post_id))
-        user_id = int(cast(int, comment.user_id))
-        comments_map.setdefault(post_id, []).append(
-            PostCommentResponse(
-                id=int(cast(int, comment.id)),
-                post_id=post_id,
-                user_id=user_id,
-                user_name=user_map.get(user_id, f"User #{user_id}"),
-                content=str(cast(str, comment.content)),
-                created_at=cast(datetime, comment.created_at),
-                updated_at=cast(datetime | None, comment.updated_at),
+    like_count_map = {
+        int(post_id): int(count)
+        for post_id, count in (
+            db.query(PostLike.post_id, func.count(PostLike.id))
+            .filter(PostLike.post_id.in_(post_ids))
+            .group_by(PostLike.post_id)
+            .all()
+        )
+    }
+    comment_count_map = {
+        int(post_id): int(count)
+        for post_id, count in (
+            db.query(PostComment.post_id, func.count(PostComment.id))
+            .filter(PostComment.post_id.in_(post_ids))
+            .group_by(PostComment.post_id)
+            .all()
+        )
+    }
+    liked_by_me = {
+        int(row[0])
+        for row in (
+            db.query(PostLike.post_id)
+            .filter(PostLike.user_id == current_user_id, PostLike.post_id.in_(post_ids))
+            .all()
+        )
+    }
+
+    comments: list[PostComment] = []
+    if any(comment_count_map.values()):
+        ranked = (
+            db.query(
+                PostComment.id.label("comment_id"),
+                func.row_number().over(
+                    partition_by=PostComment.post_id,
+                    order_by=(PostComment.created_at.desc(), PostComment.id.desc()),
+                ).label("position"),
             )
+            .filter(PostComment.post_id.in_(post_ids))
+            .subquery()
+        )
+        comments = (
+            db.query(PostComment)
+            .join(ranked, ranked.c.comment_id == PostComment.id)
+            .filter(ranked.c.position <= settings.FEED_COMMENT_PREVIEW_LIMIT)
+            .order_by(PostComment.created_at.asc(), PostComment.id.asc())
+            .all()
         )
 
+    comments_map: dict[int, list[PostCommentResponse]] = {post_id: [] for post_id in post_ids}
+    for comment in _comment_responses(db, comments):
+        comments_map.setdefault(comment.post_id, []).append(comment)
+
     for post in posts:
         post_id = int(cast(int, post.id))
         setattr(post, "_feed_like_count", like_count_map.get(post_id, 0))
+        setattr(post, "_feed_comment_count", comment_count_map.get(post_id, 0))
         setattr(post, "_feed_is_liked", post_id in liked_by_me)
         setattr(post, "_feed_comments", comments_map.get(post_id, []))
 
@@ -146,13 +169,23 @@ def _load_post_or_404(db: Session, post_id: int) -> UserPost:
     return post
 
 
+def _author_name(db: Session, user_id: int) -> str:
+    author = db.query(User.full_name, User.email).filter(User.id == user_id).first()
+    return (author.full_name or author.email) if author else f"User #{user_id}"
+
+
+def _post_response(db: Session, post: UserPost, current_user_id: int) -> UserPostResponse:
+    _hydrate_post_interactions(db, [post], current_user_id)
+    return _build_post_response(post, _author_name(db, int(cast(int, post.author_id))))
+
+
 @router.post("/posts", response_model=UserPostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     request: Request,
     content: str = Form(""),
     image: UploadFile | None = File(None),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
     sanitized_content = sanitize_text(content, max_length=5000) or ""
     if not sanitized_content.strip() and image is None:
@@ -177,39 +210,95 @@ async def create_post(
         base_url = str(request.base_url).rstrip("/")
         image_url = f"{base_url}/post-images/{filename}"
 
-    post = UserPost(
-        author_id=int(cast(int, current_user.id)),
-        content=sanitized_content,
-        image_url=image_url,
-    )
+    current_user_id = int(cast(int, current_user.id))
+    response = await db.run(_create_post, current_user_id, sanitized_content, image_url)
+    await fan_out_post(db, current_user_id, response.id)
+    return response
+
+
+def _create_post(db: Session, author_id: int, content: str, image_url: str | None) -> UserPostResponse:
+    post = UserPost(author_id=author_id, content=content, image_url=image_url)
     db.add(post)
     db.commit()
     db.refresh(post)
-
-    author_name = current_user.full_name or current_user.email
-    return _build_post_response(post, author_name)
+    return _build_post_response(post, _author_name(db, author_id))
 
 
 @router.get("/home", response_model=HomeFeedResponse)
 async def get_home_feed(
-    post_offset: int = Query(0, ge=0),
-    job_offset: int = Query(0, ge=0),
+    post_cursor: str | None = Query(None, max_length=200),
+    job_cursor: str | None = Query(None, max_length=200),
+    post_offset: int = Query(0, ge=0, deprecated=True),
+    job_offset: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(10, ge=1, le=50),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_read_db),
 ):
+    """
+    Home feed with friend posts and company jobs.
+
+    Both streams are ordered by (created_at, id) descending and paged with the
+    opaque next_post_cursor / next_job_cursor values. post_offset and
+    job_offset are kept for older clients and ignored when a cursor is sent.
+    """
+    try:
+        post_position = decode_cursor(post_cursor) if post_cursor else None
+        job_position = decode_cursor(job_cursor) if job_cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid feed cursor")
+
     current_user_id = int(cast(int, current_user.id))
-    connected_user_ids = _get_connected_user_ids(db, current_user_id)
-
-    posts = (
-        db.query(UserPost)
-        .filter(UserPost.author_id.in_(connected_user_ids))
-        .order_by(UserPost.created_at.desc())
-        .offset(post_offset)
-        .limit(limit + 1)
-        .all()
+
+    timeline_post_ids = None
+    if post_position or not post_offset:
+        before_id = post_position[1] if post_position else None
+        timeline_post_ids = await read_timeline(current_user_id, before_id, limit + 1)
+
+    return await db.run(
+        _home_feed_page,
+        current_user_id,
+        timeline_post_ids,
+        post_position,
+        job_position,
+        post_cursor,
+        job_cursor,
+        post_offset,
+        job_offset,
+        limit,
     )
 
+
+def _home_feed_page(
+    db: Session,
+    current_user_id: int,
+    timeline_post_ids: list[int] | None,
+    post_position: tuple | None,
+    job_position: tuple | None,
+    post_cursor: str | None,
+    job_cursor: str | None,
+    post_offset: int,
+    job_offset: int,
+    limit: int,
+) -> HomeFeedResponse:
+    if timeline_post_ids is not None:
+        post_map = {
+            int(cast(int, post.id)): post
+            for post in db.query(UserPost).filter(UserPost.id.in_(timeline_post_ids)).all()
+        } if timeline_post_ids else {}
+        posts = [post_map[post_id] for post_id in timeline_post_ids if post_id in post_map]
+    else:
+        connected_user_ids = get_connected_user_ids(db, current_user_id)
+        posts_query = (
+            db.query(UserPost)
+            .filter(UserPost.author_id.in_(connected_user_ids))
+            .order_by(UserPost.created_at.desc(), UserPost.id.desc())
+        )
+        if post_position:
+            posts_query = posts_query.filter(keyset_filter(UserPost.created_at, UserPost.id, *post_position))
+        elif post_offset:
+            posts_query = posts_query.offset(post_offset)
+        posts = posts_query.limit(limit + 1).all()
+
     has_more_posts = len(posts) > limit
     posts_page = posts[:limit]
     _hydrate_post_interactions(db, posts_page, current_user_id)
@@ -223,15 +312,17 @@ async def get_home_feed(
         for post in posts_page
     ]
 
-    jobs = (
+    jobs_query = (
         db.query(JobPosting, Company)
         .join(Company, Company.id == JobPosting.company_id)
         .filter(JobPosting.is_active == True)
-        .order_by(JobPosting.created_at.desc())
-        .offset(job_offset)
-        .limit(limit + 1)
-        .all()
+        .order_by(JobPosting.created_at.desc(), JobPosting.id.desc())
     )
+    if job_position:
+        jobs_query = jobs_query.filter(keyset_filter(JobPosting.created_at, JobPosting.id, *job_position))
+    elif job_offset:
+        jobs_query = jobs_query.offset(job_offset)
+    jobs = jobs_query.limit(limit + 1).all()
 
     has_more_jobs = len(jobs) > limit
     jobs_page = jobs[:limit]
@@ -251,11 +342,16 @@ async def get_home_feed(
         for job, company in jobs_page
     ]
 
+    last_post = posts_page[-1] if posts_page else None
+    last_job = jobs_page[-1][0] if jobs_page else None
+
     return HomeFeedResponse(
         friend_posts=friend_posts,
         company_jobs=company_jobs,
         next_post_offset=post_offset + len(friend_posts),
         next_job_offset=job_offset + len(company_jobs),
+        next_post_cursor=encode_cursor(last_post.created_at, last_post.id) if last_post else post_cursor,
+        next_job_cursor=encode_cursor(last_job.created_at, last_job.id) if last_job else job_cursor,
         has_more_posts=has_more_posts,
         has_more_jobs=has_more_jobs,
     )
@@ -266,41 +362,35 @@ async def update_post(
     post_id: int,
     payload: PostUpdateRequest,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
+    sanitized_content = sanitize_text(payload.content, max_length=5000) or ""
+    return await db.run(_update_post, post_id, int(cast(int, current_user.id)), sanitized_content)
+
+
+def _update_post(db: Session, post_id: int, current_user_id: int, content: str) -> UserPostResponse:
     post = _load_post_or_404(db, post_id)
-    current_user_id = int(cast(int, current_user.id))
     if int(cast(int, post.author_id)) != current_user_id:
         raise HTTPException(status_code=403, detail="You can only edit your own posts")
 
-    sanitized_content = sanitize_text(payload.content, max_length=5000) or ""
-    if not sanitized_content.strip():
+    if not content.strip():
         raise HTTPException(status_code=400, detail="Post content cannot be empty")
 
-    post.content = sanitized_content
+    post.content = content
     db.commit()
     db.refresh(post)
-
-    _hydrate_post_interactions(db, [post], current_user_id)
-    return _build_post_response(post, current_user.full_name or current_user.email)
+    return _post_response(db, post, current_user_id)
 
 
 @router.delete("/posts/{post_id}", response_model=dict)
 async def delete_post(
     post_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    post = _load_post_or_404(db, post_id)
     current_user_id = int(cast(int, current_user.id))
-    if int(cast(int, post.author_id)) != current_user_id:
-        raise HTTPException(status_code=403, detail="You can only delete your own posts")
-
-    image_path = _extract_image_path(cast(str | None, post.image_url))
-    db.query(PostLike).filter(PostLike.post_id == post_id).delete()
-    db.query(PostComment).filter(PostComment.post_id == post_id).delete()
-    db.delete(post)
-    db.commit()
+    image_path = await db.run(_delete_post, post_id, current_user_id)
+    await retract_post(db, current_user_id, post_id)
 
     if image_path and os.path.exists(image_path):
         try:
@@ -311,14 +401,30 @@ async def delete_post(
     return {"message": "Post deleted"}
 
 
+def _delete_post(db: Session, post_id: int, current_user_id: int) -> str | None:
+    post = _load_post_or_404(db, post_id)
+    if int(cast(int, post.author_id)) != current_user_id:
+        raise HTTPException(status_code=403, detail="You can only delete your own posts")
+
+    image_path = _extract_image_path(cast(str | None, post.image_url))
+    db.query(PostLike).filter(PostLike.post_id == post_id).delete()
+    db.query(PostComment).filter(PostComment.post_id == post_id).delete()
+    db.delete(post)
+    db.commit()
+    return image_path
+
+
 @router.post("/posts/{post_id}/likes/toggle", response_model=UserPostResponse)
 async def toggle_post_like(
     post_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
+    return await db.run(_toggle_post_like, post_id, int(cast(int, current_user.id)))
+
+
+def _toggle_post_like(db: Session, post_id: int, current_user_id: int) -> UserPostResponse:
     post = _load_post_or_404(db, post_id)
-    current_user_id = int(cast(int, current_user.id))
 
     existing_like = (
         db.query(PostLike)
@@ -332,11 +438,7 @@ async def toggle_post_like(
 
     db.commit()
     db.refresh(post)
-    _hydrate_post_interactions(db, [post], current_user_id)
-
-    author = db.query(User).filter(User.id == post.author_id).first()
-    author_name = (author.full_name or author.email) if author else f"User #{int(cast(int, post.author_id))}"
-    return _build_post_response(post, author_name)
+    return _post_response(db, post, current_user_id)
 
 
 @router.post("/posts/{post_id}/comments", response_model=UserPostResponse)
@@ -344,25 +446,63 @@ async def add_post_comment(
     post_id: int,
     payload: PostCommentCreate,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    post = _load_post_or_404(db, post_id)
     sanitized_content = sanitize_text(payload.content, max_length=1000) or ""
-    if not sanitized_content.strip():
+    return await db.run(_add_post_comment, post_id, int(cast(int, current_user.id)), sanitized_content)
+
+
+def _add_post_comment(db: Session, post_id: int, current_user_id: int, content: str) -> UserPostResponse:
+    post = _load_post_or_404(db, post_id)
+    if not content.strip():
         raise HTTPException(status_code=400, detail="Comment content cannot be empty")
 
-    db.add(
-        PostComment(
-            post_id=post_id,
-            user_id=int(cast(int, current_user.id)),
-            content=sanitized_content,
-        )
-    )
+    db.add(PostComment(post_id=post_id, user_id=current_user_id, content=content))
     db.commit()
     db.refresh(post)
+    return _post_response(db, post, current_user_id)
 
-    current_user_id = int(cast(int, current_user.id))
-    _hydrate_post_interactions(db, [post], current_user_id)
-    author = db.query(User).filter(User.id == post.author_id).first()
-    author_name = (author.full_name or author.email) if author else f"User #{int(cast(int, post.author_id))}"
-    return _build_post_response(post, author_name)
+
+@router.get("/posts/{post_id}/comments", response_model=PostCommentPageResponse)
+async def list_post_comments(
+    post_id: int,
+    cursor: str | None = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_verified_user),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    """
+    Page through a post's comments from newest to oldest.
+
+    Each page is returned in chronological order; pass next_cursor to load
+    the comments that came before it.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid comments cursor")
+
+    return await db.run(_post_comment_page, post_id, position, limit)
+
+
+def _post_comment_page(db: Session, post_id: int, position: tuple | None, limit: int) -> PostCommentPageResponse:
+    _load_post_or_404(db, post_id)
+
+    query = (
+        db.query(PostComment)
+        .filter(PostComment.post_id == post_id)
+        .order_by(PostComment.created_at.desc(), PostComment.id.desc())
+    )
+    if position:
+        query = query.filter(keyset_filter(PostComment.created_at, PostComment.id, *position))
+    comments = query.limit(limit + 1).all()
+
+    has_more = len(comments) > limit
+    page = comments[:limit]
+    oldest = page[-1] if page else None
+
+    return PostCommentPageResponse(
+        comments=_comment_responses(db, list(reversed(page))),
+        next_cursor=encode_cursor(oldest.created_at, oldest.id) if oldest and has_more else None,
+        has_more=has_more,
+    )
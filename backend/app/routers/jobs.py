@@ -1,13 +1,21 @@
 """
 Job posting, search, and application tracking endpoints.
 """
+import json
+import logging
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
+from typing import AsyncIterator, Iterator, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies import get_current_recruiter, get_current_verified_user
+from starlette.background import BackgroundTask
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+from app.database import AsyncDB, SessionLocal, async_db_session, get_db, read_session
+from app.dependencies import get_current_recruiter, get_current_verified_user, get_read_db
 from app.models.user import User
 from app.models.resume import Resume
 from app.models.networking import (
@@ -16,23 +24,36 @@ from app.models.networking import (
     JobPosting,
     JobApplication,
     ApplicationStatus,
-    WorkMode,
     EmploymentType,
 )
 from app.schemas.networking import (
     JobCreate,
     JobUpdate,
     JobResponse,
+    JobSearchResponse,
+    RecommendedJobResponse,
+    ApplicationStatusCounts,
     JobApplicationCreate,
     JobApplicationUpdate,
+    JobApplicationBulkUpdate,
+    JobApplicationBulkUpdateResult,
     JobApplicationResponse,
 )
+from app.utils import applicant_pipeline, job_search, job_transfer, recommendations
 from app.utils.audit import log_audit_event
 from app.utils.input_sanitization import sanitize_fields
+from app.utils.pagination import decode_cursor
+from app.utils.read_routing import recently_wrote
+from app.utils.skills import sync_job_skills
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
+# Page size when a cursor is sent without a limit.
+DEFAULT_PAGE_SIZE = 50
+
 
 def _is_company_admin(db: Session, company_id: int, user_id: int) -> bool:
     return (
@@ -43,7 +64,11 @@ def _is_company_admin(db: Session, company_id: int, user_id: int) -> bool:
     )
 
 
-def _application_to_response(application: JobApplication, candidate: User | None = None) -> JobApplicationResponse:
+def _application_to_response(
+    application: JobApplication,
+    candidate: User | None = None,
+    match_score: float | None = None,
+) -> JobApplicationResponse:
     return JobApplicationResponse(
         id=application.id,
         job_id=application.job_id,
@@ -57,40 +82,30 @@ def _application_to_response(application: JobApplication, candidate: User | None
         is_shortlisted=application.is_shortlisted,
         created_at=application.created_at,
         updated_at=application.updated_at,
+        match_score=match_score,
     )
 
 
-@router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
-async def create_job(
-    payload: JobCreate,
-    current_user: User = Depends(get_current_recruiter),
-    db: Session = Depends(get_db),
-):
-    payload_data = sanitize_fields(
-        payload.dict(),
-        text_fields=["title", "description", "required_skills", "location"],
-    )
+_JOB_TEXT_FIELDS = ["title", "description", "required_skills", "location"]
 
-    if not payload_data.get("title") or not payload_data.get("description"):
-        raise HTTPException(status_code=400, detail="Title and description are required")
 
-    company = db.query(Company).filter(Company.id == payload_data["company_id"]).first()
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-
-    if not _is_company_admin(db, payload_data["company_id"], current_user.id) and current_user.role.value != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized to post for this company")
+def _job_value_error(payload_data: dict) -> Optional[str]:
+    """Why a sanitized JobCreate payload cannot be posted, or None; fills in the default deadline."""
+    if not payload_data.get("title") or not payload_data.get("description"):
+        return "Title and description are required"
 
     if payload_data.get("salary_min") and payload_data.get("salary_max") and payload_data["salary_min"] > payload_data["salary_max"]:
-        raise HTTPException(status_code=400, detail="salary_min cannot exceed salary_max")
+        return "salary_min cannot exceed salary_max"
+
+    if payload_data.get("application_deadline") is None:
+        payload_data["application_deadline"] = datetime.utcnow() + timedelta(days=30)
+    if payload_data["application_deadline"] <= datetime.utcnow():
+        return "application_deadline must be in the future"
+    return None
 
-    deadline_value = payload_data.get("application_deadline")
-    if deadline_value is None:
-        deadline_value = datetime.utcnow() + timedelta(days=30)
-    if deadline_value <= datetime.utcnow():
-        raise HTTPException(status_code=400, detail="application_deadline must be in the future")
 
-    job = JobPosting(
+def _new_job(payload_data: dict, user_id: int) -> JobPosting:
+    return JobPosting(
         company_id=payload_data["company_id"],
         title=payload_data["title"],
         description=payload_data["description"],
@@ -100,10 +115,35 @@ async def create_job(
         employment_type=payload_data.get("employment_type"),
         salary_min=payload_data.get("salary_min"),
         salary_max=payload_data.get("salary_max"),
-        application_deadline=deadline_value,
-        created_by=current_user.id,
+        application_deadline=payload_data["application_deadline"],
+        created_by=user_id,
     )
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
+async def create_job(
+    payload: JobCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_recruiter),
+    db: Session = Depends(get_db),
+):
+    payload_data = sanitize_fields(payload.dict(), text_fields=_JOB_TEXT_FIELDS)
+
+    company = db.query(Company).filter(Company.id == payload_data["company_id"]).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    if not _is_company_admin(db, payload_data["company_id"], current_user.id) and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to post for this company")
+
+    value_error = _job_value_error(payload_data)
+    if value_error:
+        raise HTTPException(status_code=400, detail=value_error)
+
+    job = _new_job(payload_data, current_user.id)
     db.add(job)
+    db.flush()
+    sync_job_skills(db, job)
 
     log_audit_event(
         db,
@@ -116,62 +156,318 @@ async def create_job(
 
     db.commit()
     db.refresh(job)
+    background_tasks.add_task(recommendations.refresh_for_job, job.id)
     return job
 
 
-@router.get("/search", response_model=list[JobResponse])
-async def search_jobs(
-    keyword: Optional[str] = None,
-    company_id: Optional[int] = None,
-    company: Optional[str] = None,
-    location: Optional[str] = None,
-    skill: Optional[str] = None,
-    remote: Optional[bool] = None,
-    employment_type: Optional[str] = Query(None, pattern="^(full-time|internship)$"),
-    active_only: bool = True,
+class _JobImporter:
+    """
+    Validates uploaded job rows like create_job and writes them in chunks, one
+    transaction each, through AsyncDB so the event loop never waits on the
+    database.
+
+    Results are released in row order as soon as they are final; a row that
+    fails validation while a chunk is pending waits for that chunk's commit.
+    """
+
+    def __init__(self, current_user: User):
+        self.user_id = int(current_user.id)
+        self.is_admin = current_user.role.value == "admin"
+        self.rows = 0
+        self.failed = 0
+        self.created_ids: list[int] = []
+        self._ready: list[dict] = []
+        self._waiting: list[dict] = []
+        self._pending: list[tuple[dict, JobPosting]] = []
+        self._company_errors: dict[int, Optional[str]] = {}
+
+    def _check_company(self, db: Session, company_id: int) -> Optional[str]:
+        if db.query(Company.id).filter(Company.id == company_id).first() is None:
+            return "Company not found"
+        if not self.is_admin and not _is_company_admin(db, company_id, self.user_id):
+            return "Not authorized to post for this company"
+        return None
+
+    async def _company_error(self, db: AsyncDB, company_id: int) -> Optional[str]:
+        # Checked once per company, however many rows it has.
+        if company_id not in self._company_errors:
+            self._company_errors[company_id] = await db.run(self._check_company, company_id)
+        return self._company_errors[company_id]
+
+    def fail(self, row: Optional[int], *errors: str) -> None:
+        self.failed += 1
+        (self._waiting if self._pending else self._ready).append({"row": row, "status": "error", "errors": list(errors)})
+
+    async def add(self, db: AsyncDB, row: int, data, parse_error: Optional[str]) -> None:
+        self.rows += 1
+        if parse_error:
+            self.fail(row, parse_error)
+            return
+        if not isinstance(data, dict):
+            self.fail(row, "Expected an object of job fields")
+            return
+        try:
+            payload = JobCreate.model_validate(data)
+        except ValidationError as exc:
+            self.fail(row, *(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            ))
+            return
+
+        payload_data = sanitize_fields(payload.dict(), text_fields=_JOB_TEXT_FIELDS)
+        error = _job_value_error(payload_data) or await self._company_error(db, payload_data["company_id"])
+        if error:
+            self.fail(row, error)
+            return
+
+        result: dict = {"row": row}
+        self._waiting.append(result)
+        self._pending.append((result, _new_job(payload_data, self.user_id)))
+        if len(self._pending) >= settings.JOB_IMPORT_CHUNK_SIZE:
+            await self.flush(db)
+
+    def _write_chunk(self, db: Session, jobs: list[JobPosting]) -> Optional[list[int]]:
+        try:
+            db.add_all(jobs)
+            db.flush()
+            job_ids = [int(job.id) for job in jobs]
+            for job in jobs:
+                sync_job_skills(db, job)
+            log_audit_event(
+                db,
+                action="jobs_imported",
+                target_type="job_posting",
+                actor_user_id=self.user_id,
+                details={"job_ids": job_ids, "company_ids": sorted({int(job.company_id) for job in jobs})},
+            )
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Job import chunk failed")
+            return None
+        return job_ids
+
+    async def flush(self, db: AsyncDB) -> None:
+        pending, self._pending = self._pending, []
+        if pending:
+            job_ids = await db.run(self._write_chunk, [job for _, job in pending])
+            if job_ids is None:
+                self.failed += len(pending)
+                for result, _ in pending:
+                    result.update(status="error", errors=["Could not save this row's chunk; retry it"])
+            else:
+                self.created_ids.extend(job_ids)
+                for (result, _), job_id in zip(pending, job_ids):
+                    result.update(status="created", job_id=job_id)
+        self._ready.extend(self._waiting)
+        self._waiting = []
+
+    def _drain(self) -> Iterator[str]:
+        ready, self._ready = self._ready, []
+        for result in ready:
+            yield json.dumps(result) + "\n"
+
+    async def result_lines(self, records: AsyncIterator[job_transfer.ImportRecord]) -> AsyncIterator[str]:
+        async with async_db_session() as db:
+            try:
+                async for row, data, parse_error in records:
+                    if self.rows >= settings.JOB_IMPORT_MAX_ROWS:
+                        self.fail(row, f"Imports are limited to {settings.JOB_IMPORT_MAX_ROWS} rows")
+                        break
+                    await self.add(db, row, data, parse_error)
+                    for line in self._drain():
+                        yield line
+            except ValueError as exc:
+                self.fail(None, str(exc))
+            await self.flush(db)
+        for line in self._drain():
+            yield line
+        yield json.dumps({"created": len(self.created_ids), "failed": self.failed}) + "\n"
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    Streams results while the upload is still being read.
+
+    Before ASGI spec 2.4, StreamingResponse also reads receive() to watch for
+    disconnects, which would swallow upload chunks. Here only the body
+    iterator reads it; a disconnect surfaces from request.stream() instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/import")
+async def import_jobs(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_recruiter),
+):
+    """
+    Create jobs from an NDJSON or CSV upload of JobCreate fields.
+
+    The format defaults to CSV for a text/csv body and NDJSON otherwise. Rows
+    are validated like POST /jobs and saved in chunks of JOB_IMPORT_CHUNK_SIZE,
+    one transaction each. The response streams one NDJSON result per row
+    ({"row", "status", "job_id" or "errors"}) in row order, each as soon as
+    its chunk commits, then the totals.
+    """
+    if import_format is None:
+        import_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    parse = job_transfer.iter_csv_records if import_format == "csv" else job_transfer.iter_ndjson_records
+
+    importer = _JobImporter(current_user)
+    return _UploadStreamingResponse(
+        importer.result_lines(parse(request.stream())),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(recommendations.refresh_for_jobs, importer.created_ids),
+    )
+
+
+@router.get("/export")
+async def export_jobs(
+    company_id: int,
+    resource: str = Query("jobs", pattern="^(jobs|applications)$"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_recruiter),
     db: Session = Depends(get_db),
 ):
-    query = db.query(JobPosting).join(Company, Company.id == JobPosting.company_id)
+    """Stream a company's jobs, or the applications to them, as NDJSON or CSV."""
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
 
-    if active_only:
-        query = query.filter(JobPosting.is_active == True)
+    if not _is_company_admin(db, company_id, current_user.id) and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to export for this company")
 
-    if keyword:
-        like_query = f"%{keyword}%"
-        query = query.filter(
-            or_(
-                JobPosting.title.ilike(like_query),
-                JobPosting.description.ilike(like_query),
-            )
-        )
+    log_audit_event(
+        db,
+        action="jobs_exported",
+        target_type="company",
+        actor_user_id=current_user.id,
+        target_id=str(company_id),
+        details={"resource": resource, "format": export_format},
+    )
+    db.commit()
 
-    if company_id is not None:
-        query = query.filter(JobPosting.company_id == company_id)
+    # Users who just wrote read their own changes from the primary.
+    session_factory = SessionLocal if await recently_wrote(current_user.id) else read_session
+    records = job_transfer.iter_export_records(session_factory, company_id, resource)
+    if export_format == "csv":
+        body = job_transfer.encode_csv(records, job_transfer.export_fields(resource))
+        media_type = "text/csv"
+    else:
+        body = job_transfer.encode_ndjson(records)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="company-{company_id}-{resource}.{export_format}"'},
+    )
 
-    if company:
-        query = query.filter(Company.name.ilike(f"%{company}%"))
 
-    if location:
-        query = query.filter(JobPosting.location.ilike(f"%{location}%"))
+class _SearchParams:
+    """Query parameters shared by the job search endpoints."""
+
+    def __init__(
+        self,
+        keyword: Optional[str] = None,
+        company_id: Optional[int] = None,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        skill: Optional[str] = None,
+        remote: Optional[bool] = None,
+        employment_type: Optional[str] = Query(None, pattern="^(full-time|internship)$"),
+        salary_min: Optional[int] = Query(None, ge=0),
+        salary_max: Optional[int] = Query(None, ge=0),
+        active_only: bool = True,
+        sort: str = Query("relevance", pattern="^(relevance|recent)$"),
+        cursor: Optional[str] = Query(None, max_length=200),
+        limit: Optional[int] = Query(None, ge=1, le=200),
+    ):
+        self.filters = job_search.JobSearchFilters(
+            keyword=keyword,
+            company_id=company_id,
+            company=company,
+            location=location,
+            skill=skill,
+            remote=remote,
+            employment_type=EmploymentType(employment_type) if employment_type else None,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            active_only=active_only,
+        )
+        self.sort = sort
+        self.cursor = cursor
+        # Older clients send neither and expect every match in one response.
+        self.limit = limit if limit is not None or cursor is None else DEFAULT_PAGE_SIZE
 
-    if skill:
-        query = query.filter(JobPosting.required_skills.ilike(f"%{skill}%"))
 
-    if remote is not None:
-        query = query.filter(JobPosting.work_mode == (WorkMode.REMOTE if remote else WorkMode.ONSITE))
+def _run_search(db: Session, params: _SearchParams, with_facets: bool) -> job_search.JobSearchPage:
+    try:
+        position = decode_cursor(params.cursor) if params.cursor else None
+        return job_search.search_jobs(db, params.filters, params.limit, position, params.sort, with_facets)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid search cursor")
 
-    if employment_type:
-        query = query.filter(
-            JobPosting.employment_type == (
-                EmploymentType.FULL_TIME if employment_type == "full-time" else EmploymentType.INTERNSHIP
-            )
-        )
 
-    return query.order_by(JobPosting.created_at.desc()).all()
+@router.get("/search", response_model=list[JobResponse])
+async def search_jobs(
+    response: Response,
+    params: _SearchParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Search jobs, best matches first when a keyword is given, otherwise newest first.
+
+    Results are paged only when limit or cursor is given (default page size
+    50); then, when more results exist, the X-Next-Cursor response header
+    carries the cursor for the next page. /jobs/search/faceted returns the same page with
+    totals and facet counts.
+    """
+    page = _run_search(db, params, with_facets=False)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
+
+@router.get("/search/faceted", response_model=JobSearchResponse)
+async def search_jobs_faceted(
+    params: _SearchParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    """Job search with the total match count and facet counts for refining it."""
+    page = _run_search(db, params, with_facets=True)
+    return {
+        "items": page.items,
+        "total": page.total,
+        "facets": page.facets,
+        "next_cursor": page.next_cursor,
+    }
+
+
+@router.get("/recommended", response_model=list[RecommendedJobResponse])
+async def get_recommended_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db),
+):
+    """Open jobs that best match the current user's profile, best first."""
+    ranked = await AsyncDB(db).run(recommendations.recommended_jobs, current_user.id, limit)
+    return [
+        RecommendedJobResponse(**JobResponse.model_validate(job).model_dump(), match_score=round(score, 4))
+        for job, score in ranked
+    ]
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: Session = Depends(get_read_db)):
     job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -182,6 +478,7 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
 async def update_job(
     job_id: int,
     payload: JobUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_recruiter),
     db: Session = Depends(get_db),
 ):
@@ -192,10 +489,7 @@ async def update_job(
     if not _is_company_admin(db, job.company_id, current_user.id) and current_user.role.value != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to update this job")
 
-    update_data = sanitize_fields(
-        payload.dict(exclude_unset=True),
-        text_fields=["title", "description", "required_skills", "location"],
-    )
+    update_data = sanitize_fields(payload.dict(exclude_unset=True), text_fields=_JOB_TEXT_FIELDS)
 
     salary_min = update_data.get("salary_min", job.salary_min)
     salary_max = update_data.get("salary_max", job.salary_max)
@@ -208,6 +502,8 @@ async def update_job(
 
     for field, value in update_data.items():
         setattr(job, field, value)
+    if "required_skills" in update_data:
+        sync_job_skills(db, job)
 
     log_audit_event(
         db,
@@ -220,6 +516,7 @@ async def update_job(
 
     db.commit()
     db.refresh(job)
+    background_tasks.add_task(recommendations.refresh_for_job, job.id)
     return job
 
 
@@ -280,7 +577,7 @@ async def apply_to_job(
 @router.get("/applications/me", response_model=list[JobApplicationResponse])
 async def list_my_applications(
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     applications = (
         db.query(JobApplication)
@@ -294,36 +591,120 @@ async def list_my_applications(
     ]
 
 
-@router.get("/{job_id}/applications", response_model=list[JobApplicationResponse])
-async def list_job_applications(
-    job_id: int,
-    current_user: User = Depends(get_current_recruiter),
-    db: Session = Depends(get_db),
-):
+def _managed_job(db: Session, job_id: int, current_user: User, action: str) -> JobPosting:
     job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if not _is_company_admin(db, job.company_id, current_user.id) and current_user.role.value != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized to view applicants")
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action}")
+    return job
 
-    applications = (
-        db.query(JobApplication)
-        .filter(JobApplication.job_id == job_id)
-        .order_by(JobApplication.created_at.desc())
-        .all()
-    )
 
-    candidate_ids = {application.candidate_id for application in applications}
+@router.get("/{job_id}/applications", response_model=list[JobApplicationResponse])
+async def list_job_applications(
+    job_id: int,
+    response: Response,
+    application_status: Optional[ApplicationStatus] = Query(None, alias="status"),
+    is_shortlisted: Optional[bool] = None,
+    sort: str = Query("recent", pattern="^(recent|match)$"),
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    current_user: User = Depends(get_current_recruiter),
+    db: Session = Depends(get_db),
+):
+    """
+    Applicants for a job, newest first, or best profile match first with sort=match.
+
+    Applicants are paged only when limit or cursor is given (default page
+    size 50); then, when more applicants match, the X-Next-Cursor response
+    header carries the cursor for the next page.
+    """
+    job = _managed_job(db, job_id, current_user, "view applicants")
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        position = decode_cursor(cursor) if cursor else None
+        page_args = (job, limit, position, application_status, is_shortlisted, sort)
+        if sort == "match":
+            # Scoring reads profiles and builds or reuses the job matrix; keep it off the event loop.
+            page = await AsyncDB(db).run(applicant_pipeline.applicant_page, *page_args)
+        else:
+            page = applicant_pipeline.applicant_page(db, *page_args)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid applicants cursor")
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    candidate_ids = {application.candidate_id for application in page.items}
     candidates = db.query(User).filter(User.id.in_(candidate_ids)).all() if candidate_ids else []
     candidate_map = {candidate.id: candidate for candidate in candidates}
+    scores = page.scores or {}
 
     return [
-        _application_to_response(application, candidate_map.get(application.candidate_id))
-        for application in applications
+        _application_to_response(
+            application,
+            candidate_map.get(application.candidate_id),
+            round(scores[application.candidate_id], 4) if application.candidate_id in scores else None,
+        )
+        for application in page.items
     ]
 
 
+@router.get("/{job_id}/applications/counts", response_model=ApplicationStatusCounts)
+async def count_job_applications(
+    job_id: int,
+    current_user: User = Depends(get_current_recruiter),
+    db: Session = Depends(get_db),
+):
+    """Applicants per pipeline status, and how many are shortlisted."""
+    _managed_job(db, job_id, current_user, "view applicants")
+    return applicant_pipeline.application_status_counts(db, job_id)
+
+
+@router.patch("/{job_id}/applications/status", response_model=JobApplicationBulkUpdateResult)
+async def bulk_update_application_status(
+    job_id: int,
+    payload: JobApplicationBulkUpdate,
+    current_user: User = Depends(get_current_recruiter),
+    db: Session = Depends(get_db),
+):
+    """Move many applications of a job to one status, recorded as a single audit entry."""
+    _managed_job(db, job_id, current_user, "update applications")
+
+    update_data = sanitize_fields(
+        payload.dict(exclude_unset=True),
+        text_fields=["recruiter_notes"],
+    )
+    updated_ids = applicant_pipeline.bulk_update_status(
+        db,
+        job_id,
+        payload.application_ids,
+        payload.status,
+        is_shortlisted=payload.is_shortlisted,
+        recruiter_notes=update_data.get("recruiter_notes"),
+        set_notes="recruiter_notes" in update_data,
+    )
+    not_found_ids = sorted(set(payload.application_ids) - set(updated_ids))
+
+    if updated_ids:
+        log_audit_event(
+            db,
+            action="application_status_bulk_updated",
+            target_type="job_posting",
+            actor_user_id=current_user.id,
+            target_id=str(job_id),
+            details={
+                "status": payload.status.value,
+                "is_shortlisted": payload.is_shortlisted,
+                "application_ids": updated_ids,
+            },
+        )
+        db.commit()
+    return {"updated_ids": updated_ids, "not_found_ids": not_found_ids}
+
+
 @router.patch("/applications/{application_id}/status", response_model=JobApplicationResponse)
 async def update_application_status(
     application_id: int,
@@ -1,12 +1,17 @@
 """
 Encrypted messaging endpoints for one-to-one and group chats.
 """
+import asyncio
+import json
+import logging
+import time
 from datetime import datetime
-from typing import cast
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, or_
+from typing import Any, cast
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import settings
+from app.database import AsyncDB, SessionLocal, async_db_session, get_async_db, get_db
 from app.dependencies import get_current_verified_user
 from app.models.user import User
 from app.models.networking import (
@@ -24,6 +29,7 @@ from app.schemas.networking import (
     ConversationCreate,
     ConversationResponse,
     MessageCreate,
+    MessageReadUpdate,
     MessageResponse,
     UserEncryptionKeyUpsert,
     UserEncryptionKeyResponse,
@@ -35,9 +41,15 @@ from app.schemas.networking import (
     GroupSearchResult,
 )
 from app.utils.audit import log_audit_event
+from app.utils.auth_cache import get_principal
 from app.utils.input_sanitization import sanitize_text
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.utils.realtime import Subscription, get_broker, publish_to_users
+from app.utils.security import verify_token
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/messages", tags=["Messaging"])
 
 
@@ -53,6 +65,47 @@ def _is_participant(db: Session, conversation_id: int, user_id: int) -> bool:
     )
 
 
+def _participant_ids(db: Session, conversation_id: int) -> list[int]:
+    rows = (
+        db.query(ConversationParticipant.user_id)
+        .filter(ConversationParticipant.conversation_id == conversation_id)
+        .all()
+    )
+    return [int(row[0]) for row in rows]
+
+
+def _mark_conversation_read(db: Session, conversation_id: int, user_id: int, message_id: int) -> int | None:
+    """
+    Move the participant's read cursor forward to message_id.
+
+    Returns the new cursor, or None when the message is not in the
+    conversation or the cursor is already at or past it.
+    """
+    participant = (
+        db.query(ConversationParticipant)
+        .filter(
+            ConversationParticipant.conversation_id == conversation_id,
+            ConversationParticipant.user_id == user_id,
+        )
+        .first()
+    )
+    if participant is None:
+        return None
+
+    in_conversation = (
+        db.query(Message.id)
+        .filter(Message.id == message_id, Message.conversation_id == conversation_id)
+        .first()
+    )
+    current = cast(int | None, participant.last_read_message_id)
+    if in_conversation is None or (current is not None and current >= message_id):
+        return None
+
+    setattr(participant, "last_read_message_id", message_id)
+    db.commit()
+    return message_id
+
+
 def _is_connected_friend(db: Session, user_id_a: int, user_id_b: int) -> bool:
     return (
         db.query(ConnectionRequest)
@@ -76,39 +129,82 @@ def _require_group_admin(conversation: Conversation, user_id: int) -> None:
         raise HTTPException(status_code=403, detail="Only the group admin can perform this action")
 
 
-def _conversation_response(db: Session, conversation: Conversation) -> ConversationResponse:
-    members = (
-        db.query(ConversationParticipant)
-        .filter(ConversationParticipant.conversation_id == conversation.id)
+def _conversation_responses(db: Session, conversations: list[Conversation]) -> list[ConversationResponse]:
+    """
+    Build responses for many conversations with one participants query and
+    one latest-message query, regardless of how many conversations there are.
+    """
+    conversation_ids = [int(cast(int, conversation.id)) for conversation in conversations]
+    if not conversation_ids:
+        return []
+
+    participant_rows = (
+        db.query(
+            ConversationParticipant.conversation_id,
+            ConversationParticipant.last_read_message_id,
+            User.id,
+            User.full_name,
+            User.email,
+        )
+        .join(User, User.id == ConversationParticipant.user_id)
+        .filter(ConversationParticipant.conversation_id.in_(conversation_ids))
+        .order_by(ConversationParticipant.id.asc())
         .all()
     )
-    participant_ids = [int(cast(int, m.user_id)) for m in members]
-    users = db.query(User).filter(User.id.in_(participant_ids)).all() if participant_ids else []
-    user_map = {int(cast(int, u.id)): u for u in users}
-    participant_names = {
-        str(uid): (user_map[uid].full_name or user_map[uid].email or f"User #{uid}")
-        for uid in participant_ids
-        if uid in user_map
+    participant_ids_map: dict[int, list[int]] = {conversation_id: [] for conversation_id in conversation_ids}
+    participant_names_map: dict[int, dict[str, str]] = {conversation_id: {} for conversation_id in conversation_ids}
+    read_cursors_map: dict[int, dict[str, int]] = {conversation_id: {} for conversation_id in conversation_ids}
+    for conversation_id, last_read_message_id, user_id, full_name, email in participant_rows:
+        participant_ids_map[int(conversation_id)].append(int(user_id))
+        participant_names_map[int(conversation_id)][str(user_id)] = full_name or email or f"User #{user_id}"
+        if last_read_message_id is not None:
+            read_cursors_map[int(conversation_id)][str(user_id)] = int(last_read_message_id)
+
+    ranked = (
+        db.query(
+            Message.conversation_id.label("conversation_id"),
+            Message.sender_id.label("sender_id"),
+            Message.created_at.label("created_at"),
+            func.row_number().over(
+                partition_by=Message.conversation_id,
+                order_by=(Message.created_at.desc(), Message.id.desc()),
+            ).label("position"),
+        )
+        .filter(Message.conversation_id.in_(conversation_ids))
+        .subquery()
+    )
+    latest_map = {
+        int(conversation_id): (created_at, int(sender_id))
+        for conversation_id, sender_id, created_at in (
+            db.query(ranked.c.conversation_id, ranked.c.sender_id, ranked.c.created_at)
+            .filter(ranked.c.position == 1)
+            .all()
+        )
     }
 
-    latest_message = (
-        db.query(Message)
-        .filter(Message.conversation_id == conversation.id)
-        .order_by(Message.created_at.desc())
-        .first()
-    )
+    responses = []
+    for conversation in conversations:
+        conversation_id = int(cast(int, conversation.id))
+        latest = latest_map.get(conversation_id)
+        responses.append(
+            ConversationResponse(
+                id=conversation_id,
+                name=cast(str | None, conversation.name),
+                is_group=bool(cast(bool, conversation.is_group)),
+                created_by=cast(int | None, conversation.created_by),
+                created_at=cast(datetime, conversation.created_at),
+                participant_ids=participant_ids_map[conversation_id],
+                participant_names=participant_names_map[conversation_id],
+                last_message_created_at=latest[0] if latest else None,
+                last_message_sender_id=latest[1] if latest else None,
+                read_cursors=read_cursors_map[conversation_id],
+            )
+        )
+    return responses
 
-    return ConversationResponse(
-        id=int(cast(int, conversation.id)),
-        name=cast(str | None, conversation.name),
-        is_group=bool(cast(bool, conversation.is_group)),
-        created_by=cast(int | None, conversation.created_by),
-        created_at=cast(datetime, conversation.created_at),
-        participant_ids=participant_ids,
-        participant_names=participant_names,
-        last_message_created_at=cast(datetime | None, latest_message.created_at if latest_message else None),
-        last_message_sender_id=cast(int | None, latest_message.sender_id if latest_message else None),
-    )
+
+def _conversation_response(db: Session, conversation: Conversation) -> ConversationResponse:
+    return _conversation_responses(db, [conversation])[0]
 
 
 @router.post("/conversations", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
@@ -158,31 +254,49 @@ async def create_conversation(
 
 @router.get("/conversations", response_model=list[ConversationResponse])
 async def list_my_conversations(
+    response: Response,
+    cursor: str | None = Query(None, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    participant_rows = (
-        db.query(ConversationParticipant)
-        .filter(ConversationParticipant.user_id == current_user.id)
-        .all()
-    )
-    conversation_ids = [row.conversation_id for row in participant_rows]
+    """
+    List the caller's conversations, most recently active first.
 
-    if not conversation_ids:
-        return []
+    When more conversations exist, the X-Next-Cursor response header carries
+    the cursor for the next page.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid conversations cursor")
 
-    conversations = (
+    conversations, next_cursor = await db.run(_conversation_page, int(cast(int, current_user.id)), position, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return conversations
+
+
+def _conversation_page(
+    db: Session, current_user_id: int, position: tuple | None, limit: int
+) -> tuple[list[ConversationResponse], str | None]:
+    activity = func.coalesce(Conversation.updated_at, Conversation.created_at)
+    query = (
         db.query(Conversation)
-        .filter(Conversation.id.in_(conversation_ids))
-        .order_by(Conversation.updated_at.desc())
-        .all()
+        .join(ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id)
+        .filter(ConversationParticipant.user_id == current_user_id)
     )
+    if position:
+        query = query.filter(keyset_filter(activity, Conversation.id, *position))
+    conversations = query.order_by(activity.desc(), Conversation.id.desc()).limit(limit + 1).all()
 
-    response = []
-    for conversation in conversations:
-        response.append(_conversation_response(db, conversation))
+    next_cursor = None
+    if len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        next_cursor = encode_cursor(last.updated_at or last.created_at, last.id)
 
-    return response
+    return _conversation_responses(db, conversations), next_cursor
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
@@ -190,9 +304,23 @@ async def send_message(
     conversation_id: int,
     payload: MessageCreate,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    current_user_id = int(cast(int, current_user.id))
+    message, participant_ids = await db.run(_store_message, conversation_id, int(cast(int, current_user.id)), payload)
+    await publish_to_users(
+        participant_ids,
+        {
+            "type": "message",
+            "conversation_id": conversation_id,
+            "message": message.model_dump(mode="json"),
+        },
+    )
+    return message
+
+
+def _store_message(
+    db: Session, conversation_id: int, current_user_id: int, payload: MessageCreate
+) -> tuple[MessageResponse, list[int]]:
     conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -220,16 +348,74 @@ async def send_message(
 
     db.commit()
     db.refresh(message)
-    return message
+    return MessageResponse.model_validate(message), _participant_ids(db, conversation_id)
+
+
+@router.post("/conversations/{conversation_id}/read", response_model=dict)
+async def mark_conversation_read(
+    conversation_id: int,
+    payload: MessageReadUpdate,
+    current_user: User = Depends(get_current_verified_user),
+    db: AsyncDB = Depends(get_async_db),
+):
+    current_user_id = int(cast(int, current_user.id))
+    participant_ids = await db.run(_participant_ids, conversation_id)
+    if current_user_id not in participant_ids:
+        raise HTTPException(status_code=403, detail="Not a participant in this conversation")
+
+    if await db.run(_mark_conversation_read, conversation_id, current_user_id, payload.message_id) is not None:
+        await publish_to_users(
+            participant_ids,
+            {"type": "read", "conversation_id": conversation_id, "user_id": current_user_id, "message_id": payload.message_id},
+        )
+
+    return {"conversation_id": conversation_id, "message_id": payload.message_id}
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=list[MessageResponse])
 async def list_messages(
     conversation_id: int,
+    response: Response,
+    before: str | None = Query(None, max_length=200),
+    after: str | None = Query(None, max_length=200),
+    since_id: int | None = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    current_user_id = int(cast(int, current_user.id))
+    """
+    Return a page of messages in chronological order.
+
+    Without a cursor the latest page is returned. `before` pages back through
+    older history, while `after` and `since_id` fetch only newer messages.
+    When more messages exist in the requested direction, X-Next-Cursor holds
+    the cursor to continue with.
+    """
+    if sum(value is not None for value in (before, after, since_id)) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of before, after or since_id")
+
+    try:
+        position = decode_cursor(before or after) if (before or after) else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid messages cursor")
+
+    messages, next_cursor = await db.run(
+        _message_page, conversation_id, int(cast(int, current_user.id)), position, after is not None, since_id, limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
+
+
+def _message_page(
+    db: Session,
+    conversation_id: int,
+    current_user_id: int,
+    position: tuple | None,
+    after: bool,
+    since_id: int | None,
+    limit: int,
+) -> tuple[list[MessageResponse], str | None]:
     conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -237,12 +423,31 @@ async def list_messages(
     if not _is_participant(db, conversation_id, current_user_id):
         raise HTTPException(status_code=403, detail="Not a participant in this conversation")
 
-    return (
-        db.query(Message)
-        .filter(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at.asc())
-        .all()
-    )
+    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+    newer = after or since_id is not None
+    if since_id is not None:
+        query = query.filter(Message.id > since_id).order_by(Message.id.asc())
+    elif after and position:
+        query = query.filter(
+            keyset_filter(Message.created_at, Message.id, *position, descending=False)
+        ).order_by(Message.created_at.asc(), Message.id.asc())
+    else:
+        if position:
+            query = query.filter(keyset_filter(Message.created_at, Message.id, *position))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+    messages = query.limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not newer:
+        messages.reverse()
+
+    next_cursor = None
+    if has_more and messages:
+        edge = messages[-1] if newer else messages[0]
+        next_cursor = encode_cursor(edge.created_at, edge.id)
+
+    return [MessageResponse.model_validate(message) for message in messages], next_cursor
 
 
 @router.put("/keys/me", response_model=UserEncryptionKeyResponse)
@@ -690,3 +895,112 @@ async def reject_group_join_request(
     request_row.status = GroupJoinRequestStatus.REJECTED
     db.commit()
     return {"message": "Join request rejected"}
+
+
+async def _authenticate_websocket(token: str | None) -> int | None:
+    payload = verify_token(token, token_type="access") if token else None
+    if not payload or payload.get("sub") is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        principal = await get_principal(db, int(payload["sub"]))
+        if principal is None or not principal.is_active or principal.is_suspended or not principal.is_verified:
+            return None
+        return principal.id
+    finally:
+        db.close()
+
+
+async def _forward_events(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        event = await subscription.get()
+        await websocket.send_json(event)
+
+
+def _log_forwarder_exit(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Realtime event forwarding stopped", exc_info=task.exception())
+
+
+async def _handle_client_event(user_id: int, event: dict[str, Any], last_typing: dict[int, float]) -> dict[str, Any] | None:
+    """Apply one client event; returns a reply for the sender, if any."""
+    event_type = event.get("type")
+    if event_type == "ping":
+        return {"type": "pong"}
+
+    try:
+        conversation_id = int(event["conversation_id"])
+    except (KeyError, TypeError, ValueError):
+        return {"type": "error", "detail": "conversation_id is required"}
+
+    if event_type == "typing":
+        now = time.monotonic()
+        if now - last_typing.get(conversation_id, 0.0) < settings.REALTIME_TYPING_THROTTLE_SECONDS:
+            return None
+        last_typing[conversation_id] = now
+
+    async with async_db_session() as db:
+        participant_ids = await db.run(_participant_ids, conversation_id)
+        if user_id not in participant_ids:
+            return {"type": "error", "detail": "Not a participant in this conversation"}
+
+        if event_type == "typing":
+            await publish_to_users(
+                [participant_id for participant_id in participant_ids if participant_id != user_id],
+                {"type": "typing", "conversation_id": conversation_id, "user_id": user_id},
+            )
+            return None
+
+        if event_type == "read":
+            try:
+                message_id = int(event["message_id"])
+            except (KeyError, TypeError, ValueError):
+                return {"type": "error", "detail": "message_id is required"}
+            if await db.run(_mark_conversation_read, conversation_id, user_id, message_id) is not None:
+                await publish_to_users(
+                    participant_ids,
+                    {"type": "read", "conversation_id": conversation_id, "user_id": user_id, "message_id": message_id},
+                )
+            return None
+
+    return {"type": "error", "detail": "Unsupported event type"}
+
+
+@router.websocket("/ws")
+async def messaging_websocket(websocket: WebSocket, token: str | None = Query(None)):
+    """
+    Real-time channel for new messages, read cursors and typing events.
+
+    Authenticate with an access token in the `token` query parameter.
+    Clients send JSON events of type `typing`, `read` or `ping`.
+    """
+    user_id = await _authenticate_websocket(token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = await get_broker().subscribe(user_id)
+    forwarder = asyncio.create_task(_forward_events(websocket, subscription))
+    forwarder.add_done_callback(_log_forwarder_exit)
+    last_typing: dict[int, float] = {}
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                event = None
+            if not isinstance(event, dict):
+                await websocket.send_json({"type": "error", "detail": "Events must be JSON objects"})
+                continue
+
+            reply = await _handle_client_event(user_id, event, last_typing)
+            if reply is not None:
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+        await subscription.close()
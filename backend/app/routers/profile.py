@@ -5,7 +5,7 @@ import mimetypes
 import os
 import uuid
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from app.database import get_db
@@ -13,9 +13,12 @@ from app.models.user import User, Profile, ProfileView
 from app.models.networking import ConnectionRequest, ConnectionRequestStatus
 from app.schemas.user import ProfileUpdate, ProfileResponse, UserWithProfile
 from app.dependencies import get_current_verified_user, get_optional_current_user
+from app.utils.auth_cache import invalidate_principal
 from app.utils.otp import verify_otp
 from app.utils.audit import log_audit_event
 from app.utils.input_sanitization import sanitize_fields
+from app.utils.recommendations import refresh_for_profile
+from app.utils.skills import sync_profile_skills
 from app.config import settings
 
 
@@ -146,6 +149,7 @@ async def get_user_profile(
 @router.put("/me", response_model=ProfileResponse)
 async def update_my_profile(
     profile_data: ProfileUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_verified_user),
     db: Session = Depends(get_db)
 ):
@@ -175,9 +179,13 @@ async def update_my_profile(
     
     for field, value in update_data.items():
         setattr(profile, field, value)
+    if "skills" in update_data:
+        sync_profile_skills(db, profile)
     
     db.commit()
     db.refresh(profile)
+    if update_data.keys() & {"headline", "location", "experience", "skills"}:
+        background_tasks.add_task(refresh_for_profile, current_user.id)
     
     return profile
 
@@ -273,8 +281,10 @@ async def delete_my_profile(
         target_type="user",
         actor_user_id=current_user.id,
         target_id=str(current_user.id),
+        sync=True,
     )
     db.commit()
+    await invalidate_principal(current_user.id)
 
     return {
         "message": "Account deactivated successfully. Contact admin to reactivate."
@@ -3,7 +3,9 @@ Resume upload and download endpoints with encryption
 """
 import os
 import hashlib
+import itertools
 from datetime import datetime
+from typing import Iterator, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
@@ -13,12 +15,18 @@ from app.models.resume import Resume
 from app.models.networking import JobApplication, JobPosting, CompanyAdmin
 from app.schemas.resume import ResumeResponse, ResumeListResponse
 from app.dependencies import get_current_verified_user, get_optional_current_user
-from app.utils.encryption import encrypt_file, decrypt_file, generate_unique_filename
+from app.utils.encryption import (
+    STREAM_ENCRYPTION_METHOD,
+    STREAM_SEGMENT_SIZE,
+    StreamEncryptor,
+    generate_unique_filename,
+    iter_decrypted_file,
+)
 from app.utils.otp import verify_otp
-from app.utils.pki import sign_bytes, verify_signature, get_public_key_pem
+from app.utils.executor import run_in_thread
+from app.utils.pki import sign_with_key_id_async, verify_signature_async, get_public_key_pem
 from app.utils.audit import log_audit_event
 from app.config import settings
-import io
 
 
 router = APIRouter(prefix="/resume", tags=["Resume Management"])
@@ -27,6 +35,38 @@ router = APIRouter(prefix="/resume", tags=["Resume Management"])
 # Allowed file types
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc"}
 MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE  # 10MB
+UPLOAD_READ_SIZE = 4 * STREAM_SEGMENT_SIZE
+
+
+class ResumeIntegrityError(Exception):
+    pass
+
+
+def _iter_verified_plaintext(file_path: str, expected_hash: Optional[str]) -> Iterator[bytes]:
+    """Yield decrypted chunks, checking the SHA-256 of the whole file at the end."""
+    hasher = hashlib.sha256()
+    for chunk in iter_decrypted_file(file_path):
+        hasher.update(chunk)
+        yield chunk
+    if expected_hash and hasher.hexdigest() != expected_hash:
+        raise ResumeIntegrityError("Resume integrity check failed (hash mismatch)")
+
+
+def _read_ahead(chunks: Iterator[bytes]) -> tuple[list[bytes], bool]:
+    """
+    The first two chunks, and whether they were all of them. Reading past the
+    end runs the whole-file hash check, so single-segment files (including
+    legacy Fernet files) are verified before anything is sent.
+    """
+    head = list(itertools.islice(chunks, 2))
+    return head, len(head) < 2
+
+
+def _hash_encrypted_file(file_path: str) -> str:
+    hasher = hashlib.sha256()
+    for chunk in iter_decrypted_file(file_path):
+        hasher.update(chunk)
+    return hasher.hexdigest()
 
 
 @router.post("/upload", response_model=ResumeResponse, status_code=status.HTTP_201_CREATED)
@@ -40,7 +80,7 @@ async def upload_resume(
     Upload and encrypt a resume file
     
     - Validates file type (PDF, DOCX, DOC)
-    - Encrypts file with Fernet
+    - Encrypts file in 64KB AES-GCM segments while it is received
     - Stores encrypted file on disk
     - Creates database record
     """
@@ -52,28 +92,6 @@ async def upload_resume(
             detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
-    
-    # Validate file size
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
-    if file_size == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is empty"
-        )
-    
-    # Encrypt file content
-    encrypted_content = encrypt_file(file_content)
-    file_hash_sha256 = hashlib.sha256(file_content).hexdigest()
-    integrity_signature = sign_bytes(file_hash_sha256.encode("utf-8"))
-    
     # Generate unique filename
     encrypted_filename = generate_unique_filename(file.filename, current_user.id)
     
@@ -81,10 +99,42 @@ async def upload_resume(
     upload_dir = settings.UPLOAD_DIR
     os.makedirs(upload_dir, exist_ok=True)
     
-    # Save encrypted file to disk
+    # Encrypt and hash the upload segment by segment, writing to a temporary
+    # file that only replaces the final path once the upload is complete
     file_path = os.path.join(upload_dir, encrypted_filename)
-    with open(file_path, "wb") as f:
-        f.write(encrypted_content)
+    partial_path = f"{file_path}.part"
+    encryptor = StreamEncryptor()
+    hasher = hashlib.sha256()
+    file_size = 0
+    try:
+        with open(partial_path, "wb") as f:
+            def absorb(chunk: bytes) -> None:
+                hasher.update(chunk)
+                f.write(encryptor.update(chunk))
+
+            while chunk := await file.read(UPLOAD_READ_SIZE):
+                file_size += len(chunk)
+                # Validate file size
+                if file_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
+                    )
+                await run_in_thread("resume_encrypt", absorb, chunk)
+
+            if file_size == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File is empty"
+                )
+            f.write(encryptor.finalize())
+        os.replace(partial_path, file_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    file_hash_sha256 = hasher.hexdigest()
+    integrity_signature, integrity_key_id = await sign_with_key_id_async(file_hash_sha256.encode("utf-8"))
     
     # Create database record
     resume = Resume(
@@ -93,11 +143,12 @@ async def upload_resume(
         encrypted_filename=encrypted_filename,
         file_size=file_size,
         file_type=file.content_type,
-        encryption_method="fernet",
+        encryption_method=STREAM_ENCRYPTION_METHOD,
         is_encrypted=True,
         file_hash_sha256=file_hash_sha256,
         integrity_signature=integrity_signature,
         integrity_algorithm="rsa-pss-sha256",
+        integrity_key_id=integrity_key_id,
         is_public=is_public,
         download_count=0
     )
@@ -210,32 +261,33 @@ async def download_resume(
             detail="Resume file not found on disk"
         )
     
-    with open(file_path, "rb") as f:
-        encrypted_content = f.read()
-    
-    # Decrypt file content
+    if resume.file_hash_sha256 and resume.integrity_signature:
+        signature_ok = await verify_signature_async(
+            resume.file_hash_sha256.encode("utf-8"), resume.integrity_signature, resume.integrity_key_id
+        )
+        if not signature_ok:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Resume integrity signature verification failed",
+            )
+
+    # Decrypt lazily; the first segments are decrypted up front so key,
+    # format and (for single-segment files) hash errors still produce a clean
+    # error response. Later segments are decrypted as Starlette iterates the
+    # generator in its threadpool, and the hash is checked after the last one.
+    plaintext_chunks = _iter_verified_plaintext(file_path, resume.file_hash_sha256)
     try:
-        decrypted_content = decrypt_file(encrypted_content)
-    except Exception as e:
+        head_chunks, fully_read = await run_in_thread("resume_decrypt", _read_ahead, plaintext_chunks)
+    except ResumeIntegrityError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to decrypt resume file"
+            detail="Resume integrity check failed (hash mismatch)",
         )
-
-    computed_hash = hashlib.sha256(decrypted_content).hexdigest()
-    if resume.file_hash_sha256 and computed_hash != resume.file_hash_sha256:
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Resume integrity check failed (hash mismatch)",
+            detail="Failed to decrypt resume file"
         )
-
-    if resume.file_hash_sha256 and resume.integrity_signature:
-        signature_ok = verify_signature(resume.file_hash_sha256.encode("utf-8"), resume.integrity_signature)
-        if not signature_ok:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Resume integrity signature verification failed",
-            )
     
     # Update download count and last accessed
     resume.download_count += 1
@@ -247,16 +299,17 @@ async def download_resume(
             target_type="resume",
             actor_user_id=current_user.id,
             target_id=str(resume_id),
-            details={"integrity_verified": True},
+            details={"integrity_verified": fully_read and bool(resume.file_hash_sha256)},
         )
     db.commit()
     
-    # Return decrypted file
+    # Stream the decrypted file
     return StreamingResponse(
-        io.BytesIO(decrypted_content),
+        itertools.chain(head_chunks, plaintext_chunks),
         media_type=resume.file_type,
         headers={
-            "Content-Disposition": f'attachment; filename="{resume.original_filename}"'
+            "Content-Disposition": f'attachment; filename="{resume.original_filename}"',
+            "Content-Length": str(resume.file_size),
         }
     )
 
@@ -363,15 +416,15 @@ async def verify_resume_integrity(
     if not os.path.exists(file_path):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume file not found on disk")
 
-    with open(file_path, "rb") as file_stream:
-        encrypted_content = file_stream.read()
-
-    decrypted_content = decrypt_file(encrypted_content)
-    computed_hash = hashlib.sha256(decrypted_content).hexdigest()
+    computed_hash = await run_in_thread("resume_hash", _hash_encrypted_file, file_path)
 
     hash_matches = computed_hash == (resume.file_hash_sha256 or "")
     signature_valid = bool(
-        resume.file_hash_sha256 and resume.integrity_signature and verify_signature(resume.file_hash_sha256.encode("utf-8"), resume.integrity_signature)
+        resume.file_hash_sha256
+        and resume.integrity_signature
+        and await verify_signature_async(
+            resume.file_hash_sha256.encode("utf-8"), resume.integrity_signature, resume.integrity_key_id
+        )
     )
 
     return {
@@ -381,5 +434,6 @@ async def verify_resume_integrity(
         "hash_matches": hash_matches,
         "signature_valid": signature_valid,
         "integrity_algorithm": resume.integrity_algorithm,
-        "signer_public_key": get_public_key_pem(),
+        "integrity_key_id": resume.integrity_key_id,
+        "signer_public_key": get_public_key_pem(resume.integrity_key_id),
     }
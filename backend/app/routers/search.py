@@ -2,70 +2,43 @@
 Global search endpoints for people, companies, and jobs.
 """
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.dependencies import get_current_verified_user
+from app.database import AsyncDB
+from app.dependencies import get_async_read_db, get_current_verified_user
 from app.models.user import User, Profile
-from app.models.networking import Company, JobPosting, ConnectionRequest, ConnectionRequestStatus
 from app.schemas.networking import GlobalSearchResult
+from app.utils.relationships import resolve_relationship_statuses
+from app.utils.search_index import search_companies, search_job_postings, search_people
 
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
-def _relationship_status(db: Session, current_user_id: int, other_user_id: int) -> str:
-	existing = (
-		db.query(ConnectionRequest)
-		.filter(
-			or_(
-				and_(ConnectionRequest.requester_id == current_user_id, ConnectionRequest.recipient_id == other_user_id),
-				and_(ConnectionRequest.requester_id == other_user_id, ConnectionRequest.recipient_id == current_user_id),
-			)
-		)
-		.order_by(ConnectionRequest.updated_at.desc())
-		.first()
-	)
-
-	if not existing:
-		return "none"
-
-	if existing.status == ConnectionRequestStatus.ACCEPTED:
-		return "connected"
-
-	if existing.status == ConnectionRequestStatus.PENDING:
-		return "pending_sent" if existing.requester_id == current_user_id else "pending_received"
-
-	return "none"
-
-
 @router.get("", response_model=list[GlobalSearchResult])
 async def global_search(
 	query: str = Query("", min_length=1, max_length=100),
 	limit: int = Query(20, ge=1, le=50),
 	current_user: User = Depends(get_current_verified_user),
-	db: Session = Depends(get_db),
+	db: AsyncDB = Depends(get_async_read_db),
 ):
 	search_term = query.strip()
 	if not search_term:
 		return []
 
-	like_query = f"%{search_term}%"
+	return await db.run(_global_search, search_term, limit, current_user.id)
+
+
+def _global_search(db: Session, search_term: str, limit: int, current_user_id: int) -> list[GlobalSearchResult]:
 	results: list[GlobalSearchResult] = []
 
-	users = (
-		db.query(User)
-		.filter(User.id != current_user.id)
-		.filter(or_(User.full_name.ilike(like_query), User.email.ilike(like_query)))
-		.order_by(User.full_name.asc())
-		.limit(limit)
-		.all()
-	)
+	users = search_people(db, search_term, limit, exclude_user_id=current_user_id)
 	if users:
-		profile_map = {profile.user_id: profile for profile in db.query(Profile).filter(Profile.user_id.in_([user.id for user in users])).all()}
+		user_ids = [user.id for user in users]
+		profile_map = {profile.user_id: profile for profile in db.query(Profile).filter(Profile.user_id.in_(user_ids)).all()}
+		status_map = resolve_relationship_statuses(db, current_user_id, user_ids)
 		for user in users:
-			relationship_status = _relationship_status(db, current_user.id, user.id)
+			relationship_status = status_map.get(user.id, "none")
 			profile = profile_map.get(user.id)
 			person_url = f"/messages?user={user.id}" if relationship_status == "connected" else f"/messages?q={(user.full_name or user.email)}"
 			results.append(
@@ -80,19 +53,7 @@ async def global_search(
 				)
 			)
 
-	companies = (
-		db.query(Company)
-		.filter(
-			or_(
-				Company.name.ilike(like_query),
-				Company.location.ilike(like_query),
-				Company.description.ilike(like_query),
-			)
-		)
-		.order_by(Company.created_at.desc())
-		.limit(limit)
-		.all()
-	)
+	companies = search_companies(db, search_term, limit)
 	for company in companies:
 		results.append(
 			GlobalSearchResult(
@@ -105,22 +66,7 @@ async def global_search(
 			)
 		)
 
-	jobs = (
-		db.query(JobPosting)
-		.join(Company, Company.id == JobPosting.company_id)
-		.filter(
-			or_(
-				JobPosting.title.ilike(like_query),
-				JobPosting.description.ilike(like_query),
-				Company.name.ilike(like_query),
-				JobPosting.location.ilike(like_query),
-				JobPosting.required_skills.ilike(like_query),
-			)
-		)
-		.order_by(JobPosting.created_at.desc())
-		.limit(limit)
-		.all()
-	)
+	jobs = search_job_postings(db, search_term, limit)
 	for job in jobs:
 		results.append(
 			GlobalSearchResult(
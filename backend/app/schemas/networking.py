@@ -86,6 +86,31 @@ class JobResponse(BaseModel):
         from_attributes = True
 
 
+class RecommendedJobResponse(JobResponse):
+    match_score: float
+
+
+class FacetCount(BaseModel):
+    value: str
+    label: Optional[str] = None
+    count: int
+
+
+class JobSearchFacets(BaseModel):
+    work_mode: list[FacetCount]
+    employment_type: list[FacetCount]
+    location: list[FacetCount]
+    company: list[FacetCount]
+    salary: list[FacetCount]
+
+
+class JobSearchResponse(BaseModel):
+    items: list[JobResponse]
+    total: int
+    facets: JobSearchFacets
+    next_cursor: Optional[str] = None
+
+
 class JobApplicationCreate(BaseModel):
     resume_id: Optional[int] = None
     cover_note: Optional[str] = Field(None, max_length=2000)
@@ -97,6 +122,24 @@ class JobApplicationUpdate(BaseModel):
     is_shortlisted: Optional[bool] = None
 
 
+class JobApplicationBulkUpdate(BaseModel):
+    application_ids: list[int] = Field(..., min_length=1, max_length=500)
+    status: ApplicationStatus
+    recruiter_notes: Optional[str] = Field(None, max_length=2000)
+    is_shortlisted: Optional[bool] = None
+
+
+class JobApplicationBulkUpdateResult(BaseModel):
+    updated_ids: list[int]
+    not_found_ids: list[int]
+
+
+class ApplicationStatusCounts(BaseModel):
+    total: int
+    shortlisted: int
+    by_status: dict[ApplicationStatus, int]
+
+
 class JobApplicationResponse(BaseModel):
     id: int
     job_id: int
@@ -110,6 +153,7 @@ class JobApplicationResponse(BaseModel):
     is_shortlisted: bool
     created_at: datetime
     updated_at: datetime
+    match_score: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -136,6 +180,7 @@ class ConversationResponse(BaseModel):
     participant_names: dict[str, str] = {}
     last_message_created_at: Optional[datetime] = None
     last_message_sender_id: Optional[int] = None
+    read_cursors: dict[str, int] = {}
 
 
 class MessageResponse(BaseModel):
@@ -150,6 +195,10 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+class MessageReadUpdate(BaseModel):
+    message_id: int = Field(..., ge=1)
+
+
 class AuditLogResponse(BaseModel):
     id: int
     actor_user_id: Optional[int]
@@ -290,6 +339,8 @@ class HomeFeedResponse(BaseModel):
     company_jobs: list[CompanyJobFeedResponse]
     next_post_offset: int
     next_job_offset: int
+    next_post_cursor: Optional[str] = None
+    next_job_cursor: Optional[str] = None
     has_more_posts: bool
     has_more_jobs: bool
 
@@ -310,3 +361,9 @@ class PostCommentResponse(BaseModel):
     content: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+
+class PostCommentPageResponse(BaseModel):
+    comments: list[PostCommentResponse]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
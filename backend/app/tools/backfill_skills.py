@@ -0,0 +1,28 @@
+"""
+Link existing job postings and profiles to the normalized skills table.
+
+Usage:
+    python -m app.tools.backfill_skills [--batch-size N]
+
+Run once after applying migration 0007. New and edited jobs and profiles are
+linked as they are saved; re-running the backfill is harmless.
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.utils.skills import backfill_skills
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    counts = backfill_skills(SessionLocal, batch_size=args.batch_size)
+    print(" ".join(f"{name}={value}" for name, value in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
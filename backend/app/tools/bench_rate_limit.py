@@ -0,0 +1,114 @@
+"""
+Compare per-request overhead of the Lua rate limiter with the old pipelines.
+
+Usage:
+    python -m app.tools.bench_rate_limit [--requests N] [--concurrency C] [--limit L]
+
+Needs the Redis server from RATE_LIMIT_REDIS_URL / REDIS_URL. Both limiters
+run against throwaway keys, which are deleted afterwards. The old
+implementation made two or three round trips per request (zremrangebyscore +
+zcard, zrange when limited, zadd + expire); the script makes one.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from app.utils.rate_limit import RedisRateLimiter, create_rate_limit_client
+
+WINDOW_SECONDS = 60.0
+
+
+async def _pipeline_hit(redis_client, key: str, limit: int, window_seconds: float) -> tuple[bool, int]:
+    """The middleware's previous check-then-add, kept for comparison."""
+    now = time.time()
+    pipeline = redis_client.pipeline()
+    pipeline.zremrangebyscore(key, "-inf", now - window_seconds)
+    pipeline.zcard(key)
+    _, current_count = await pipeline.execute()
+
+    if current_count >= limit:
+        oldest = await redis_client.zrange(key, 0, 0, withscores=True)
+        retry_after = int(window_seconds - (now - float(oldest[0][1]))) if oldest else int(window_seconds)
+        return False, max(retry_after, 1)
+
+    pipeline = redis_client.pipeline()
+    pipeline.zadd(key, {f"{now}:{time.time_ns()}": now})
+    pipeline.expire(key, int(window_seconds) + 5)
+    await pipeline.execute()
+    return True, 0
+
+
+async def _measure(hit, keys: list[str], requests: int, concurrency: int, limit: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    allowed_count = 0
+
+    async def worker(worker_index: int) -> None:
+        nonlocal allowed_count
+        key = keys[worker_index % len(keys)]
+        for _ in range(requests // concurrency):
+            started_at = time.perf_counter()
+            allowed, _ = await hit(key, limit, WINDOW_SECONDS)
+            latencies.append(time.perf_counter() - started_at)
+            allowed_count += allowed
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return latencies, allowed_count
+
+
+def _summary(name: str, latencies: list[float], allowed: int, round_trips: str) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"{name:<9} requests={len(ordered)} allowed={allowed} round_trips={round_trips} "
+        f"mean_us={statistics.fmean(ordered) * 1e6:.0f} p50_us={statistics.median(ordered) * 1e6:.0f} "
+        f"p99_us={p99 * 1e6:.0f}"
+    )
+
+
+async def _run(requests: int, concurrency: int, limit: int) -> int:
+    redis_client = create_rate_limit_client()
+    if redis_client is None:
+        print("redis package is not installed", file=sys.stderr)
+        return 1
+    limiter = RedisRateLimiter(redis_client)
+    try:
+        await redis_client.ping()
+    except Exception as exc:
+        print(f"Redis is not reachable: {exc}", file=sys.stderr)
+        await limiter.close()
+        return 1
+
+    prefix = f"bench:ratelimit:{uuid.uuid4().hex}"
+    keys = [f"{prefix}:{index}" for index in range(concurrency)]
+    try:
+        pipeline_latencies, pipeline_allowed = await _measure(
+            lambda key, *args: _pipeline_hit(redis_client, key + ":pipeline", *args),
+            keys, requests, concurrency, limit,
+        )
+        script_latencies, script_allowed = await _measure(
+            lambda key, *args: limiter.hit(key + ":script", *args),
+            keys, requests, concurrency, limit,
+        )
+        print(_summary("pipelines", pipeline_latencies, pipeline_allowed, "2-3"))
+        print(_summary("lua", script_latencies, script_allowed, "1"))
+        print(f"speedup={statistics.fmean(pipeline_latencies) / statistics.fmean(script_latencies):.2f}x")
+    finally:
+        await redis_client.delete(*[f"{key}:{kind}" for key in keys for kind in ("pipeline", "script")])
+        await limiter.close()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=100, help="requests allowed per key per window")
+    args = parser.parse_args()
+    return asyncio.run(_run(args.requests, max(1, args.concurrency), args.limit))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Apply or inspect database schema migrations.
+
+Usage:
+    python -m app.tools.migrate_db [upgrade|current|pending]
+
+Run ``upgrade`` before starting new workers on a deploy. Workers then only
+check the current revision at startup instead of patching the schema.
+"""
+import argparse
+import sys
+
+from app.database import engine
+from app.migrations import MIGRATIONS, apply_migrations, current_revision, head_revision, pending_migrations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "current", "pending"])
+    args = parser.parse_args()
+
+    if args.command == "current":
+        with engine.connect() as connection:
+            print(f"current={current_revision(connection)} head={head_revision(MIGRATIONS)}")
+        return 0
+
+    if args.command == "pending":
+        for migration in pending_migrations(engine, MIGRATIONS):
+            print(f"{migration.version} {migration.description}")
+        return 0
+
+    applied = apply_migrations(engine, MIGRATIONS)
+    print(f"applied={','.join(applied) or '-'} head={head_revision(MIGRATIONS)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
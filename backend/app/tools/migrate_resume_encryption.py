@@ -0,0 +1,109 @@
+"""
+Convert legacy Fernet-encrypted resume files to the segmented AES-GCM format.
+
+Usage:
+    python -m app.tools.migrate_resume_encryption [--dry-run] [--limit N]
+
+Each file is decrypted, checked against its stored SHA-256, re-encrypted to
+a temporary file and atomically swapped into place before the row is
+updated. Files that are already in the new format only have their row
+updated, so an interrupted run can simply be started again.
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.resume import Resume
+from app.utils.encryption import (
+    FERNET_ENCRYPTION_METHOD,
+    STREAM_ENCRYPTION_METHOD,
+    STREAM_SEGMENT_SIZE,
+    StreamEncryptor,
+    decrypt_file,
+    is_stream_encrypted,
+)
+
+
+def _convert_file(file_path: str, expected_hash: str | None) -> None:
+    with open(file_path, "rb") as source:
+        plaintext = decrypt_file(source.read())
+
+    if expected_hash and hashlib.sha256(plaintext).hexdigest() != expected_hash:
+        raise ValueError("stored hash does not match decrypted content")
+
+    partial_path = f"{file_path}.part"
+    encryptor = StreamEncryptor()
+    try:
+        with open(partial_path, "wb") as target:
+            for offset in range(0, len(plaintext), STREAM_SEGMENT_SIZE):
+                target.write(encryptor.update(plaintext[offset:offset + STREAM_SEGMENT_SIZE]))
+            target.write(encryptor.finalize())
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(partial_path, file_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def migrate(dry_run: bool = False, limit: int | None = None) -> dict[str, int]:
+    counts = {"converted": 0, "already_converted": 0, "missing": 0, "failed": 0}
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Resume)
+            .filter(Resume.encryption_method == FERNET_ENCRYPTION_METHOD)
+            .order_by(Resume.id.asc())
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        for resume_id in [row.id for row in query.with_entities(Resume.id).all()]:
+            resume = db.query(Resume).filter(Resume.id == resume_id).first()
+            if resume is None:
+                continue
+            file_path = os.path.join(settings.UPLOAD_DIR, resume.encrypted_filename)
+            if not os.path.exists(file_path):
+                counts["missing"] += 1
+                print(f"resume {resume.id}: file missing ({resume.encrypted_filename})", file=sys.stderr)
+                continue
+
+            with open(file_path, "rb") as source:
+                already_converted = is_stream_encrypted(source.read(8))
+
+            if dry_run:
+                counts["already_converted" if already_converted else "converted"] += 1
+                continue
+
+            try:
+                if not already_converted:
+                    _convert_file(file_path, resume.file_hash_sha256)
+            except Exception as exc:
+                counts["failed"] += 1
+                print(f"resume {resume.id}: {exc}", file=sys.stderr)
+                continue
+
+            resume.encryption_method = STREAM_ENCRYPTION_METHOD
+            db.commit()
+            counts["already_converted" if already_converted else "converted"] += 1
+    finally:
+        db.close()
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would be converted without writing")
+    parser.add_argument("--limit", type=int, default=None, help="convert at most N resumes")
+    args = parser.parse_args()
+
+    counts = migrate(dry_run=args.dry_run, limit=args.limit)
+    print(" ".join(f"{name}={value}" for name, value in counts.items()))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
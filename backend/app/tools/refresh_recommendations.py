@@ -0,0 +1,29 @@
+"""
+Recompute every user's stored job recommendations.
+
+Usage:
+    python -m app.tools.refresh_recommendations [--batch-size N]
+
+Run after applying migration 0008 (and after backfill_skills), or
+periodically: job changes only reach users who share one of the job's
+skills, and IDF weights drift as the set of open jobs changes.
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.utils.recommendations import refresh_all_recommendations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    refreshed = refresh_all_recommendations(SessionLocal, batch_size=args.batch_size)
+    print(f"profiles={refreshed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
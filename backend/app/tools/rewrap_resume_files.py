@@ -0,0 +1,34 @@
+"""
+Re-encrypt stored resume files under the primary encryption key.
+
+Usage:
+    python -m app.tools.rewrap_resume_files [--workers N]
+
+Rotate by setting ENCRYPTION_KEY to the new key and moving the old one to
+ENCRYPTION_SECONDARY_KEYS, then run this tool. It can be interrupted and
+started again; finished files are recorded in a journal in UPLOAD_DIR. Once
+it reports failed=0 the old key can be removed. Only one run at a time is
+allowed per UPLOAD_DIR; a second one exits with status 2.
+"""
+import argparse
+import sys
+
+from app.utils.rewrap import RewrapInProgressError, rewrap_upload_dir
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="parallel workers (default ENCRYPTION_REWRAP_WORKERS)")
+    args = parser.parse_args()
+
+    try:
+        counts = rewrap_upload_dir(workers=args.workers)
+    except RewrapInProgressError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(" ".join(f"{name}={value}" for name, value in counts.items()))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
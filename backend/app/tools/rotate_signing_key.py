@@ -0,0 +1,24 @@
+"""
+Rotate the PKI signing keypair.
+
+Usage:
+    python -m app.tools.rotate_signing_key
+
+The current public key is kept in the retired-keys directory under its key
+ID, so existing resume signatures keep verifying. Running workers pick up the
+new keypair within PKI_KEY_RELOAD_INTERVAL_SECONDS.
+"""
+import sys
+
+from app.utils.pki import current_key_id, rotate_signing_key
+
+
+def main() -> int:
+    previous_key_id = current_key_id()
+    new_key_id = rotate_signing_key()
+    print(f"retired={previous_key_id} current={new_key_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Recruiter view of a job's applicant pipeline: filtered, keyset-paginated
+pages, per-status counts and bulk status changes.
+
+Pages ordered by recency walk ix_job_applications_job_status_created (or the
+job_id index without a status filter). Ordering by match score has to score
+every filtered applicant, so that mode reads only (id, candidate_id) for the
+whole set and loads full rows for the returned page alone.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Query, Session
+
+from app.models.networking import ApplicationStatus, JobApplication, JobPosting
+from app.utils.pagination import encode_cursor, fetch_size, keyset_filter
+from app.utils.recommendations import applicant_match_scores
+
+
+class ApplicantPage:
+    __slots__ = ("items", "next_cursor", "scores")
+
+    def __init__(
+        self,
+        items: list[JobApplication],
+        next_cursor: Optional[str],
+        scores: Optional[dict[int, float]] = None,
+    ):
+        self.items = items
+        self.next_cursor = next_cursor
+        # Match score per candidate id, only for sort="match".
+        self.scores = scores
+
+
+def _filtered(
+    db: Session,
+    job_id: int,
+    status: Optional[ApplicationStatus],
+    is_shortlisted: Optional[bool],
+) -> Query:
+    query = db.query(JobApplication).filter(JobApplication.job_id == job_id)
+    if status is not None:
+        query = query.filter(JobApplication.status == status)
+    if is_shortlisted is not None:
+        query = query.filter(JobApplication.is_shortlisted == is_shortlisted)
+    return query
+
+
+def _recent_page(query: Query, limit: Optional[int], position: Optional[tuple]) -> ApplicantPage:
+    if position:
+        query = query.filter(keyset_filter(JobApplication.created_at, JobApplication.id, *position))
+    rows = query.order_by(JobApplication.created_at.desc(), JobApplication.id.desc()).limit(fetch_size(limit)).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, int(rows[-1].id))
+    return ApplicantPage(rows, next_cursor)
+
+
+def _match_page(
+    db: Session,
+    job: JobPosting,
+    query: Query,
+    limit: Optional[int],
+    position: Optional[tuple],
+) -> ApplicantPage:
+    rows = query.with_entities(JobApplication.id, JobApplication.candidate_id).all()
+    scores = applicant_match_scores(db, job, {candidate_id for _, candidate_id in rows})
+    ranked = sorted(
+        ((scores[candidate_id], application_id) for application_id, candidate_id in rows),
+        key=lambda item: (-item[0], -item[1]),
+    )
+    if position:
+        score, last_id = position
+        ranked = [item for item in ranked if item[0] < score or (item[0] == score and item[1] < last_id)]
+
+    page = ranked[: fetch_size(limit)]
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1][0], page[-1][1])
+
+    ids = [application_id for _, application_id in page]
+    loaded = db.query(JobApplication).filter(JobApplication.id.in_(ids)).all() if ids else []
+    row_map = {application.id: application for application in loaded}
+    items = [row_map[application_id] for application_id in ids if application_id in row_map]
+    return ApplicantPage(items, next_cursor, scores)
+
+
+def applicant_page(
+    db: Session,
+    job: JobPosting,
+    limit: Optional[int],
+    position: Optional[tuple] = None,
+    status: Optional[ApplicationStatus] = None,
+    is_shortlisted: Optional[bool] = None,
+    sort: str = "recent",
+) -> ApplicantPage:
+    """
+    One page of a job's applications, newest or best match first.
+
+    position is a decoded cursor from a previous page of the same listing; a
+    limit of None returns every application. Raises ValueError when the
+    cursor does not belong to the requested ordering.
+    """
+    if position is not None:
+        value = position[0]
+        if sort == "match" and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError("Cursor does not match the applicant ordering")
+        if sort != "match" and not hasattr(value, "isoformat"):
+            raise ValueError("Cursor does not match the applicant ordering")
+
+    query = _filtered(db, int(job.id), status, is_shortlisted)
+    if sort == "match":
+        return _match_page(db, job, query, limit, position)
+    return _recent_page(query, limit, position)
+
+
+def application_status_counts(db: Session, job_id: int) -> dict[str, Any]:
+    """Applications per status and shortlisted total for a job, from one grouped query."""
+    rows = (
+        db.query(
+            JobApplication.status,
+            func.count(JobApplication.id),
+            func.sum(case((JobApplication.is_shortlisted == True, 1), else_=0)),
+        )
+        .filter(JobApplication.job_id == job_id)
+        .group_by(JobApplication.status)
+        .all()
+    )
+    by_status = {status: 0 for status in ApplicationStatus}
+    shortlisted = 0
+    for status, count, shortlisted_count in rows:
+        by_status[status] = int(count)
+        shortlisted += int(shortlisted_count or 0)
+    return {"total": sum(by_status.values()), "shortlisted": shortlisted, "by_status": by_status}
+
+
+def bulk_update_status(
+    db: Session,
+    job_id: int,
+    application_ids: list[int],
+    status: ApplicationStatus,
+    is_shortlisted: Optional[bool] = None,
+    recruiter_notes: Optional[str] = None,
+    set_notes: bool = False,
+) -> list[int]:
+    """
+    Move applications of job_id to status in one UPDATE; returns the ids
+    that belonged to the job and were updated. The caller commits.
+    """
+    requested = sorted(set(application_ids))
+    found = [
+        application_id
+        for (application_id,) in db.query(JobApplication.id).filter(
+            JobApplication.job_id == job_id, JobApplication.id.in_(requested)
+        )
+    ]
+    if not found:
+        return []
+
+    values: dict[Any, Any] = {JobApplication.status: status, JobApplication.updated_at: datetime.utcnow()}
+    if is_shortlisted is not None:
+        values[JobApplication.is_shortlisted] = is_shortlisted
+    if set_notes:
+        values[JobApplication.recruiter_notes] = recruiter_notes
+    db.query(JobApplication).filter(JobApplication.job_id == job_id, JobApplication.id.in_(found)).update(
+        values, synchronize_session=False
+    )
+    return found
@@ -1,12 +1,32 @@
 """
 Utility helpers for initial tamper-evident audit logging.
+
+Entries form a SHA-256 hash chain. Events are collected on the business
+session and handed to a single background writer after commit, so request
+transactions never read the chain head themselves. Durable (sync=True)
+events are the exception: they are chained inside the business transaction
+just before it commits, so they land or roll back together with it.
 """
 import hashlib
 import json
+import logging
+import queue
+import time
+import uuid
 from datetime import datetime
-from typing import Any, Optional, cast
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Optional, cast
+from sqlalchemy import event, func, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.networking import AuditLog
+from app.config import settings
+from app.database import SessionLocal
+from app.models.networking import AuditCheckpoint, AuditLog
+from app.models.user import User
+from app.utils.metrics import increment_counter
+from app.utils.pki import sign_bytes, verify_signature
+
+logger = logging.getLogger(__name__)
 
 
 def _serialize_details(details: Optional[dict[str, Any]]) -> str:
@@ -36,6 +56,330 @@ def _compute_hash(
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
+class AuditEvent:
+    """An audit entry waiting to be chained and written."""
+
+    __slots__ = ("action", "target_type", "actor_user_id", "target_id", "details_json", "created_at", "sync", "written")
+
+    def __init__(
+        self,
+        action: str,
+        target_type: str,
+        actor_user_id: Optional[int],
+        target_id: Optional[str],
+        details_json: str,
+        created_at: datetime,
+        sync: bool,
+    ):
+        self.action = action
+        self.target_type = target_type
+        self.actor_user_id = actor_user_id
+        self.target_id = target_id
+        self.details_json = details_json
+        self.created_at = created_at
+        self.sync = sync
+        # Set once the entry is committed to the chain.
+        self.written = False
+
+
+class AuditWriter:
+    """
+    Single background writer that appends queued events to the hash chain.
+
+    Events are written in batches: one chain-head read and one commit per
+    batch. On PostgreSQL a transaction-scoped advisory lock serializes
+    writers across processes so two batches never chain off the same hash;
+    business transactions chaining durable events take the same lock.
+    """
+
+    def __init__(self, session_factory, batch_size: int, flush_interval_seconds: float):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._flush_interval_seconds = flush_interval_seconds
+        self._queue: "queue.Queue[Optional[AuditEvent]]" = queue.Queue()
+        self._write_lock = Lock()
+        self._progress = Condition()
+        self._enqueued = 0
+        self._written = 0
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if not self.running:
+            return
+        self._queue.put(None)
+        cast(Thread, self._thread).join(timeout)
+        self._thread = None
+
+    def enqueue(self, events: list[AuditEvent]) -> None:
+        if not self.running:
+            self.write_now(events)
+            return
+        with self._progress:
+            self._enqueued += len(events)
+        for event in events:
+            self._queue.put(event)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Block until every event enqueued so far has been processed. Returns
+        False on timeout; events that could not be written keep written=False.
+        """
+        with self._progress:
+            target = self._enqueued
+            return self._progress.wait_for(lambda: self._written >= target or not self.running, timeout)
+
+    def write_now(self, events: list[AuditEvent]) -> None:
+        """Write events synchronously when the background writer is not running."""
+        if events:
+            self._write_with_retry(events)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            event = self._queue.get()
+            if event is None:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self._flush_interval_seconds
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    next_event = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_event is None:
+                    stopping = True
+                    break
+                batch.append(next_event)
+
+            try:
+                self._write_with_retry(batch)
+            except Exception:
+                # Never let one batch stop the writer; queued events would be lost.
+                self._record_dropped(batch, "Unexpected audit writer failure")
+            finally:
+                with self._progress:
+                    self._written += len(batch)
+                    self._progress.notify_all()
+
+        # Drain whatever arrived after the stop sentinel.
+        leftovers: list[AuditEvent] = []
+        while True:
+            try:
+                leftover = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if leftover is not None:
+                leftovers.append(leftover)
+        if leftovers:
+            try:
+                self._write_with_retry(leftovers)
+            except Exception:
+                self._record_dropped(leftovers, "Unexpected audit writer failure")
+        with self._progress:
+            self._written = self._enqueued
+            self._progress.notify_all()
+
+    def _write_with_retry(self, batch: list[AuditEvent]) -> None:
+        delay = 0.5
+        for _ in range(5):
+            try:
+                self._write_batch(batch)
+                return
+            except IntegrityError:
+                # Typically an actor deleted before its event was written; write
+                # the batch one event at a time so only that entry is adjusted.
+                for event in batch:
+                    try:
+                        self._write_single_resolving_actor(event)
+                    except Exception:
+                        self._record_dropped([event], "Audit event write failed")
+                return
+            except Exception:
+                logger.exception("Audit batch write failed; retrying")
+                time.sleep(delay)
+                delay = min(delay * 2, 10.0)
+        self._record_dropped(batch, "Audit batch write kept failing", exc_info=False)
+
+    def _record_dropped(self, events: list[AuditEvent], reason: str, exc_info: bool = True) -> None:
+        logger.error(
+            "%s; dropping %d audit event(s): %s",
+            reason,
+            len(events),
+            ", ".join(event.action for event in events),
+            exc_info=exc_info,
+        )
+        increment_counter("audit.events_dropped", len(events))
+
+    def _write_single_resolving_actor(self, event: AuditEvent) -> None:
+        try:
+            self._write_batch([event])
+        except IntegrityError:
+            details = json.loads(event.details_json)
+            details["unresolved_actor_user_id"] = event.actor_user_id
+            event.actor_user_id = None
+            event.details_json = _serialize_details(details)
+            self._write_batch([event])
+
+    def _write_batch(self, events: list[AuditEvent]) -> None:
+        with self._write_lock:
+            session = self._session_factory()
+            try:
+                _advisory_chain_lock(session)
+                _append_to_chain(session, events)
+                session.commit()
+                for event in events:
+                    event.written = True
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    def lock_chain(self, session: Session) -> None:
+        """
+        Hold the chain lock for the rest of session's transaction.
+
+        PostgreSQL uses the transaction-scoped advisory lock; elsewhere the
+        in-process write lock is taken and released by release_chain.
+        """
+        if session.info.get(_CHAIN_LOCKED_KEY) or _advisory_chain_lock(session):
+            return
+        self._write_lock.acquire()
+        session.info[_CHAIN_LOCKED_KEY] = True
+
+    def release_chain(self, session: Session) -> None:
+        if session.info.pop(_CHAIN_LOCKED_KEY, False):
+            self._write_lock.release()
+
+
+_CHAIN_LOCK_KEY = 0x6175646974  # "audit"
+_PENDING_KEY = "pending_audit_events"
+_CHAIN_LOCKED_KEY = "audit_chain_locked"
+
+
+def _advisory_chain_lock(session: Session) -> bool:
+    """Take the cross-process chain lock for session's transaction on PostgreSQL."""
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHAIN_LOCK_KEY})
+    return True
+
+
+def _append_to_chain(session: Session, events: list[AuditEvent]) -> None:
+    """Add events at the chain head in session's transaction; the caller holds the chain lock."""
+    previous_entry = session.query(AuditLog.entry_hash).order_by(AuditLog.id.desc()).first()
+    previous_hash = cast(Optional[str], previous_entry[0]) if previous_entry else None
+
+    for event in events:
+        entry_hash = _compute_hash(
+            previous_hash=previous_hash,
+            actor_user_id=event.actor_user_id,
+            action=event.action,
+            target_type=event.target_type,
+            target_id=event.target_id,
+            details_json=event.details_json,
+            timestamp=event.created_at,
+        )
+        session.add(
+            AuditLog(
+                actor_user_id=event.actor_user_id,
+                action=event.action,
+                target_type=event.target_type,
+                target_id=event.target_id,
+                details_json=event.details_json,
+                previous_hash=previous_hash,
+                entry_hash=entry_hash,
+                created_at=event.created_at,
+            )
+        )
+        previous_hash = entry_hash
+
+
+def _resolve_missing_actors(session: Session, events: list[AuditEvent]) -> None:
+    actor_ids = {event.actor_user_id for event in events if event.actor_user_id is not None}
+    if not actor_ids:
+        return
+    existing = {user_id for (user_id,) in session.query(User.id).filter(User.id.in_(actor_ids))}
+    for event in events:
+        if event.actor_user_id is not None and event.actor_user_id not in existing:
+            details = json.loads(event.details_json)
+            details["unresolved_actor_user_id"] = event.actor_user_id
+            event.actor_user_id = None
+            event.details_json = _serialize_details(details)
+
+
+_writer = AuditWriter(
+    SessionLocal,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_seconds=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
+
+
+def _pending_events(session: Session) -> list[AuditEvent]:
+    pending = session.info.get(_PENDING_KEY) or {}
+    return [item for events in pending.values() for item in events]
+
+
+@event.listens_for(Session, "before_commit")
+def _write_durable_events(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    durable = [item for item in _pending_events(session) if item.sync]
+    if not durable:
+        return
+    # Chained in the business transaction: a failed write fails the commit.
+    session.flush()
+    _writer.lock_chain(session)
+    _resolve_missing_actors(session, durable)
+    _append_to_chain(session, durable)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    savepoint = session.get_nested_transaction()
+    if savepoint is not None:
+        # A released savepoint hands its events to the enclosing transaction.
+        events = pending.pop(savepoint, None) if pending else None
+        if events:
+            parent = savepoint.parent
+            pending.setdefault(parent if parent is not None and parent.nested else None, []).extend(events)
+        return
+
+    _writer.release_chain(session)
+    events = _pending_events(session)
+    session.info.pop(_PENDING_KEY, None)
+    for item in events:
+        if item.sync:
+            item.written = True
+    queued = [item for item in events if not item.sync]
+    if queued:
+        _writer.enqueue(queued)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted_events(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        _writer.release_chain(session)
+        session.info.pop(_PENDING_KEY, None)
+        return
+    pending = session.info.get(_PENDING_KEY)
+    if pending and transaction.nested:
+        # Still here only if the savepoint rolled back instead of being released.
+        pending.pop(transaction, None)
+
+
 def log_audit_event(
     db: Session,
     action: str,
@@ -43,76 +387,273 @@ def log_audit_event(
     actor_user_id: Optional[int] = None,
     target_id: Optional[str] = None,
     details: Optional[dict[str, Any]] = None,
-) -> AuditLog:
-    previous_entry = db.query(AuditLog).order_by(AuditLog.id.desc()).first()
-    previous_hash = cast(Optional[str], previous_entry.entry_hash) if previous_entry else None
-    details_json = _serialize_details(details)
-    timestamp = datetime.utcnow()
-
-    entry_hash = _compute_hash(
-        previous_hash=previous_hash,
-        actor_user_id=actor_user_id,
+    sync: bool = False,
+) -> AuditEvent:
+    """
+    Record an audit event that is written once the session commits.
+
+    Events are discarded if the transaction, or the savepoint they were
+    logged in, rolls back. By default they are queued for the background
+    writer; pass sync=True for actions that must be chained in the same
+    transaction, so the commit fails if they cannot be written.
+    """
+    audit_event = AuditEvent(
         action=action,
         target_type=target_type,
+        actor_user_id=int(actor_user_id) if actor_user_id is not None else None,
         target_id=target_id,
-        details_json=details_json,
-        timestamp=timestamp,
+        details_json=_serialize_details(details),
+        created_at=datetime.utcnow(),
+        sync=sync or not settings.AUDIT_ASYNC_ENABLED,
     )
+    # Keyed by the innermost savepoint, or None for the root transaction.
+    db.info.setdefault(_PENDING_KEY, {}).setdefault(db.get_nested_transaction(), []).append(audit_event)
+    return audit_event
 
-    audit_log = AuditLog(
-        actor_user_id=actor_user_id,
-        action=action,
-        target_type=target_type,
-        target_id=target_id,
-        details_json=details_json,
-        previous_hash=previous_hash,
-        entry_hash=entry_hash,
-        created_at=timestamp,
+
+def start_audit_writer() -> None:
+    if settings.AUDIT_ASYNC_ENABLED:
+        _writer.start()
+
+
+def stop_audit_writer() -> None:
+    _writer.stop()
+
+
+def flush_audit_events(timeout: float = 10.0) -> bool:
+    """Wait for queued audit events to be written, e.g. before reading the log."""
+    return _writer.flush(timeout)
+
+
+def _checkpoint_payload(audit_log_id: int, entry_hash: str, entries_verified: int) -> bytes:
+    return json.dumps(
+        {"audit_log_id": audit_log_id, "entry_hash": entry_hash, "entries_verified": entries_verified},
+        sort_keys=True,
+    ).encode("utf-8")
+
+
+def _checkpoint_is_authentic(checkpoint: AuditCheckpoint) -> bool:
+    payload = _checkpoint_payload(
+        int(cast(int, checkpoint.audit_log_id)),
+        str(checkpoint.entry_hash),
+        int(cast(int, checkpoint.entries_verified)),
     )
+    return verify_signature(payload, str(checkpoint.signature))
+
 
-    db.add(audit_log)
-    db.flush()
-    return audit_log
+def _verification_result(
+    valid: bool,
+    broken_at_id: Optional[int],
+    total_entries: int,
+    verified_entries: int,
+    started: float,
+    **extra: Any,
+) -> dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    return {
+        "valid": valid,
+        "broken_at_id": broken_at_id,
+        "total_entries": total_entries,
+        "verified_entries": verified_entries,
+        "elapsed_seconds": round(elapsed, 4),
+        "entries_per_second": round(verified_entries / elapsed, 1) if elapsed > 0 else None,
+        **extra,
+    }
 
 
-def verify_audit_chain(db: Session) -> dict[str, Any]:
-    entries = db.query(AuditLog).order_by(AuditLog.id.asc()).all()
+def verify_audit_chain(
+    db: Session,
+    full: bool = False,
+    progress: Optional[Callable[[int], None]] = None,
+) -> dict[str, Any]:
+    """
+    Verify the hash chain, by default only past the latest signed checkpoint.
 
-    previous_hash = None
-    for entry in entries:
-        entry_any = cast(Any, entry)
+    Rows are streamed with yield_per instead of being loaded at once. With
+    full=True the whole chain is rehashed and every stored checkpoint is
+    checked against it. New signed checkpoints are recorded every
+    AUDIT_CHECKPOINT_INTERVAL entries and at the end of a valid run.
+    """
+    started = time.perf_counter()
+    checkpoints = {
+        int(cast(int, checkpoint.audit_log_id)): checkpoint
+        for checkpoint in db.query(AuditCheckpoint).order_by(AuditCheckpoint.audit_log_id.asc()).all()
+    }
 
-        entry_id = int(entry_any.id)
-        actor_user_id = int(entry_any.actor_user_id) if entry_any.actor_user_id is not None else None
-        action = str(entry_any.action)
-        target_type = str(entry_any.target_type)
-        target_id = str(entry_any.target_id) if entry_any.target_id is not None else None
-        details_json = str(entry_any.details_json) if entry_any.details_json is not None else "{}"
-        timestamp = cast(datetime, entry_any.created_at)
-        entry_previous_hash = str(entry_any.previous_hash) if entry_any.previous_hash is not None else None
-        entry_hash = str(entry_any.entry_hash)
+    after_id = 0
+    previous_hash: Optional[str] = None
+    base_count = 0
+    start_checkpoint: Optional[AuditCheckpoint] = None
+    if not full and checkpoints:
+        start_checkpoint = checkpoints[max(checkpoints)]
+        anchor = (
+            db.query(AuditLog.entry_hash)
+            .filter(AuditLog.id == start_checkpoint.audit_log_id)
+            .first()
+        )
+        if not _checkpoint_is_authentic(start_checkpoint) or anchor is None or anchor[0] != start_checkpoint.entry_hash:
+            return _verification_result(
+                False,
+                int(cast(int, start_checkpoint.audit_log_id)),
+                int(cast(int, start_checkpoint.entries_verified)),
+                0,
+                started,
+                mode="incremental",
+                reason="checkpoint_mismatch",
+            )
+        after_id = int(cast(int, start_checkpoint.audit_log_id))
+        previous_hash = str(start_checkpoint.entry_hash)
+        base_count = int(cast(int, start_checkpoint.entries_verified))
 
+    rows = (
+        db.query(
+            AuditLog.id,
+            AuditLog.actor_user_id,
+            AuditLog.action,
+            AuditLog.target_type,
+            AuditLog.target_id,
+            AuditLog.details_json,
+            AuditLog.created_at,
+            AuditLog.previous_hash,
+            AuditLog.entry_hash,
+        )
+        .filter(AuditLog.id > after_id)
+        .order_by(AuditLog.id.asc())
+        .yield_per(settings.AUDIT_VERIFY_BATCH_SIZE)
+    )
+
+    verified = 0
+    last_checkpointed = after_id if not full else (max(checkpoints) if checkpoints else 0)
+    last_entry: Optional[tuple[int, str]] = None
+    new_checkpoints: list[tuple[int, str, int]] = []
+    broken_at_id: Optional[int] = None
+    reason: Optional[str] = None
+
+    for entry_id, actor_user_id, action, target_type, target_id, details_json, created_at, entry_previous_hash, entry_hash in rows:
         expected = _compute_hash(
             previous_hash=previous_hash,
             actor_user_id=actor_user_id,
             action=action,
             target_type=target_type,
             target_id=target_id,
-            details_json=details_json,
-            timestamp=timestamp,
+            details_json=details_json if details_json is not None else "{}",
+            timestamp=created_at,
         )
-
         if entry_previous_hash != previous_hash or entry_hash != expected:
-            return {
-                "valid": False,
-                "broken_at_id": entry_id,
-                "total_entries": len(entries),
-            }
+            broken_at_id, reason = int(entry_id), "hash_mismatch"
+            break
+
+        checkpoint = checkpoints.get(int(entry_id))
+        if checkpoint is not None and (
+            checkpoint.entry_hash != entry_hash
+            or int(cast(int, checkpoint.entries_verified)) != base_count + verified + 1
+            or not _checkpoint_is_authentic(checkpoint)
+        ):
+            broken_at_id, reason = int(entry_id), "checkpoint_mismatch"
+            break
 
         previous_hash = entry_hash
+        verified += 1
+        last_entry = (int(entry_id), entry_hash)
+        if int(entry_id) > last_checkpointed and verified % settings.AUDIT_CHECKPOINT_INTERVAL == 0:
+            new_checkpoints.append((int(entry_id), entry_hash, base_count + verified))
+            last_checkpointed = int(entry_id)
+        if progress is not None and verified % settings.AUDIT_VERIFY_BATCH_SIZE == 0:
+            progress(verified)
 
-    return {
-        "valid": True,
-        "broken_at_id": None,
-        "total_entries": len(entries),
-    }
+    if broken_at_id is None and last_entry is not None and last_entry[0] > last_checkpointed:
+        new_checkpoints.append((last_entry[0], last_entry[1], base_count + verified))
+
+    for audit_log_id, entry_hash, entries_verified in new_checkpoints:
+        try:
+            with db.begin_nested():
+                db.add(
+                    AuditCheckpoint(
+                        audit_log_id=audit_log_id,
+                        entry_hash=entry_hash,
+                        entries_verified=entries_verified,
+                        signature=sign_bytes(_checkpoint_payload(audit_log_id, entry_hash, entries_verified)),
+                    )
+                )
+        except IntegrityError:
+            # A concurrent verification recorded the same checkpoint.
+            pass
+    if new_checkpoints:
+        db.commit()
+    if progress is not None:
+        progress(verified)
+
+    return _verification_result(
+        broken_at_id is None,
+        broken_at_id,
+        base_count + verified,
+        verified,
+        started,
+        mode="full" if full else "incremental",
+        reason=reason,
+        from_checkpoint_id=int(cast(int, start_checkpoint.audit_log_id)) if start_checkpoint is not None else None,
+        checkpoint_id=new_checkpoints[-1][0] if new_checkpoints else (last_checkpointed or None),
+    )
+
+
+class AuditVerificationJob:
+    def __init__(self, job_id: str, total_estimate: int):
+        self.job_id = job_id
+        self.status = "running"
+        self.total_estimate = total_estimate
+        self.processed = 0
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "processed_entries": self.processed,
+            "total_entries_estimate": self.total_estimate,
+            "progress": round(self.processed / self.total_estimate, 4) if self.total_estimate else 1.0,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_jobs_lock = Lock()
+_verification_jobs: dict[str, AuditVerificationJob] = {}
+
+
+def _run_full_verification(job: AuditVerificationJob) -> None:
+    def report(processed: int) -> None:
+        job.processed = processed
+
+    session = SessionLocal()
+    try:
+        job.result = verify_audit_chain(session, full=True, progress=report)
+        job.status = "completed"
+    except Exception as exc:
+        logger.exception("Full audit chain verification failed")
+        job.error = str(exc)
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow()
+        session.close()
+
+
+def start_full_verification(db: Session) -> AuditVerificationJob:
+    """Start a background full re-verification, or return the one already running."""
+    with _jobs_lock:
+        for job in _verification_jobs.values():
+            if job.status == "running":
+                return job
+
+        job = AuditVerificationJob(uuid.uuid4().hex, int(db.query(func.count(AuditLog.id)).scalar() or 0))
+        _verification_jobs[job.job_id] = job
+        Thread(target=_run_full_verification, args=(job,), name="audit-verify", daemon=True).start()
+        return job
+
+
+def get_verification_job(job_id: str) -> Optional[AuditVerificationJob]:
+    return _verification_jobs.get(job_id)
@@ -0,0 +1,177 @@
+"""
+Cache of the minimal authentication principal for each user.
+
+Authenticated requests only need a user's id, role and account flags, so
+these are cached instead of loading the users row on every request: first in
+a small in-process LRU with a short TTL, then in Redis when it is reachable.
+Endpoints that change any of the flags call invalidate_principal() after
+committing. Other workers can keep their local copy for up to
+AUTH_CACHE_TTL_SECONDS, which bounds how long a suspension takes to apply
+everywhere.
+
+A lookup that loaded from the database only caches its result if no
+invalidation happened meanwhile: locally by comparing an invalidation
+counter, in Redis by comparing a per-user version key inside a Lua script,
+so a stale principal is never written back after invalidate_principal().
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User, UserRole
+
+
+class AuthPrincipal:
+    """The fields of a user that authentication and authorization depend on."""
+
+    __slots__ = ("id", "role", "is_active", "is_suspended", "is_verified")
+
+    def __init__(self, id: int, role: UserRole, is_active: bool, is_suspended: bool, is_verified: bool):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+        self.is_suspended = is_suspended
+        self.is_verified = is_verified
+
+    def to_json(self) -> str:
+        return json.dumps(
+            [self.id, self.role.value, self.is_active, self.is_suspended, self.is_verified],
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AuthPrincipal":
+        user_id, role, is_active, is_suspended, is_verified = json.loads(raw)
+        return cls(int(user_id), UserRole(role), bool(is_active), bool(is_suspended), bool(is_verified))
+
+
+_lock = Lock()
+_local: OrderedDict[int, tuple[float, AuthPrincipal]] = OrderedDict()
+# Bumped on every invalidation so a lookup that raced with one does not re-cache
+# stale data. One counter for all users, so there is nothing to evict.
+_invalidations = 0
+_redis = None
+_redis_set_if_current = None
+
+# SET the principal only while the user's version key still holds the value
+# read before loading it; invalidation bumps the version first.
+_SET_IF_CURRENT_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def configure_auth_cache(redis_client) -> None:
+    """Use Redis as the second tier when a client is available."""
+    global _redis, _redis_set_if_current
+    _redis = redis_client
+    _redis_set_if_current = redis_client.register_script(_SET_IF_CURRENT_LUA) if redis_client is not None else None
+
+
+def _redis_key(user_id: int) -> str:
+    return f"{settings.REDIS_AUTH_CACHE_PREFIX}:user:{user_id}"
+
+
+def _redis_version_key(user_id: int) -> str:
+    return f"{settings.REDIS_AUTH_CACHE_PREFIX}:version:{user_id}"
+
+
+def _get_local(user_id: int) -> Optional[AuthPrincipal]:
+    with _lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return None
+        stored_at, principal = entry
+        if time.monotonic() - stored_at > settings.AUTH_CACHE_TTL_SECONDS:
+            del _local[user_id]
+            return None
+        _local.move_to_end(user_id)
+        return principal
+
+
+def _store_local(principal: AuthPrincipal, generation: int) -> None:
+    with _lock:
+        if _invalidations != generation:
+            return
+        _local[principal.id] = (time.monotonic(), principal)
+        _local.move_to_end(principal.id)
+        while len(_local) > settings.AUTH_CACHE_MAX_ENTRIES:
+            _local.popitem(last=False)
+
+
+def _load_from_db(db: Session, user_id: int) -> Optional[AuthPrincipal]:
+    row = (
+        db.query(User.id, User.role, User.is_active, User.is_suspended, User.is_verified)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return AuthPrincipal(int(row.id), row.role, bool(row.is_active), bool(row.is_suspended), bool(row.is_verified))
+
+
+async def get_principal(db: Session, user_id: int) -> Optional[AuthPrincipal]:
+    """Return the cached principal for user_id, loading it on a miss; None if the user does not exist."""
+    if not settings.AUTH_CACHE_ENABLED:
+        return _load_from_db(db, user_id)
+
+    principal = _get_local(user_id)
+    if principal is not None:
+        return principal
+
+    with _lock:
+        generation = _invalidations
+
+    version = None
+    if _redis is not None:
+        try:
+            raw, version = await _redis.mget(_redis_key(user_id), _redis_version_key(user_id))
+            if raw:
+                principal = AuthPrincipal.from_json(raw)
+        except Exception:
+            principal = None
+
+    if principal is None:
+        principal = _load_from_db(db, user_id)
+        if principal is None:
+            return None
+        if _redis_set_if_current is not None:
+            try:
+                await _redis_set_if_current(
+                    keys=[_redis_key(user_id), _redis_version_key(user_id)],
+                    args=[version or "0", principal.to_json(), settings.AUTH_CACHE_REDIS_TTL_SECONDS],
+                )
+            except Exception:
+                pass
+
+    _store_local(principal, generation)
+    return principal
+
+
+async def invalidate_principal(user_id: int) -> None:
+    """Drop a user's cached principal after their role or account flags change."""
+    global _invalidations
+    with _lock:
+        _invalidations += 1
+        _local.pop(user_id, None)
+    if _redis is not None:
+        try:
+            version_key = _redis_version_key(user_id)
+            async with _redis.pipeline(transaction=True) as pipe:
+                # The version outlives any lookup in flight; the entry itself is dropped.
+                pipe.incr(version_key)
+                pipe.expire(version_key, max(settings.AUTH_CACHE_REDIS_TTL_SECONDS, 3600))
+                pipe.delete(_redis_key(user_id))
+                await pipe.execute()
+        except Exception:
+            return None
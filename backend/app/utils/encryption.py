@@ -1,14 +1,77 @@
 """
-File encryption and decryption utilities using Fernet
+File encryption and decryption utilities.
+
+New resumes use a segmented AES-256-GCM container ("aesgcm-stream-v1") so
+files can be encrypted and decrypted in fixed-size pieces:
+
+    header  = MAGIC | version (1) | segment size (4) | salt (16) | nonce prefix (7)
+    segment = AES-GCM(plaintext[:segment size]) with a 16-byte tag
+
+Each file gets its own key, derived with HKDF-SHA256 from the master key and
+the header salt. Segment nonces are the prefix, a 32-bit counter and a final-
+segment flag, and the header is authenticated with every segment, so
+reordered, truncated or extended files fail to decrypt. Legacy files are a
+single Fernet token.
+
+Master keys work like MultiFernet: ENCRYPTION_KEY encrypts, and it plus
+ENCRYPTION_SECONDARY_KEYS decrypt. rewrap_file() re-encrypts a file under the
+primary key so a retired key can eventually be dropped.
 """
+import base64
+import functools
+import hashlib
 import os
-from cryptography.fernet import Fernet
+import struct
+from typing import BinaryIO, Iterable, Iterator, Optional
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from app.config import settings
 
+FERNET_ENCRYPTION_METHOD = "fernet"
+STREAM_ENCRYPTION_METHOD = "aesgcm-stream-v1"
+STREAM_SEGMENT_SIZE = 64 * 1024
+
+_STREAM_MAGIC = b"CBSE"
+_STREAM_VERSION = 1
+_HEADER_FORMAT = ">4sBI16s7s"
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+_TAG_SIZE = 16
+_MAX_SEGMENTS = 2 ** 32
+
+
+class _KeyRing:
+    """Parsed master keys, primary first, with their ciphers."""
+
+    __slots__ = ("key_ids", "master_keys", "fernets", "fernet")
+
+    def __init__(self, keys: tuple[str, ...]):
+        self.key_ids = [hashlib.sha256(key.encode()).hexdigest()[:16] for key in keys]
+        self.master_keys = [base64.urlsafe_b64decode(key.encode()) for key in keys]
+        self.fernets = [Fernet(key.encode()) for key in keys]
+        self.fernet = MultiFernet(self.fernets)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_key_ring(keys: tuple[str, ...]) -> _KeyRing:
+    return _KeyRing(keys)
+
+
+def _key_ring() -> _KeyRing:
+    # Cached per key configuration, so changed settings take effect immediately.
+    keys = (settings.ENCRYPTION_KEY, *settings.encryption_secondary_keys_list)
+    return _build_key_ring(tuple(dict.fromkeys(keys)))
+
+
+def get_fernet_cipher() -> MultiFernet:
+    """Get the cached cipher: encrypts with the primary key, decrypts with any."""
+    return _key_ring().fernet
 
-def get_fernet_cipher():
-    """Get Fernet cipher instance from encryption key"""
-    return Fernet(settings.ENCRYPTION_KEY.encode())
+
+def primary_key_id() -> str:
+    return _key_ring().key_ids[0]
 
 
 def encrypt_file(file_content: bytes) -> bytes:
@@ -39,6 +102,233 @@ def decrypt_file(encrypted_content: bytes) -> bytes:
     return cipher.decrypt(encrypted_content)
 
 
+def _derive_stream_key(master_key: bytes, salt: bytes) -> bytes:
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=b"careerbridge-resume-" + STREAM_ENCRYPTION_METHOD.encode(),
+    ).derive(master_key)
+
+
+def _segment_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    if index >= _MAX_SEGMENTS:
+        raise ValueError("File has too many segments")
+    return prefix + struct.pack(">IB", index, 1 if final else 0)
+
+
+class StreamEncryptor:
+    """
+    Incremental encryptor for the segmented AES-GCM format.
+
+    Feed plaintext with update() and finish with finalize(); the header is
+    emitted with the first output. One full segment is held back until the
+    next byte arrives so the final segment can be flagged.
+    """
+
+    def __init__(self, segment_size: int = STREAM_SEGMENT_SIZE):
+        salt = os.urandom(16)
+        self._nonce_prefix = os.urandom(7)
+        self._segment_size = segment_size
+        self._header = struct.pack(_HEADER_FORMAT, _STREAM_MAGIC, _STREAM_VERSION, segment_size, salt, self._nonce_prefix)
+        self._cipher = AESGCM(_derive_stream_key(_key_ring().master_keys[0], salt))
+        self._buffer = bytearray()
+        self._index = 0
+        self._header_sent = False
+        self._finalized = False
+
+    def _take_header(self) -> bytes:
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self._header
+
+    def _seal(self, plaintext: bytes, final: bool) -> bytes:
+        nonce = _segment_nonce(self._nonce_prefix, self._index, final)
+        self._index += 1
+        return self._cipher.encrypt(nonce, plaintext, self._header)
+
+    def update(self, data: bytes) -> bytes:
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._buffer.extend(data)
+        output = [self._take_header()]
+        while len(self._buffer) > self._segment_size:
+            segment = bytes(self._buffer[: self._segment_size])
+            del self._buffer[: self._segment_size]
+            output.append(self._seal(segment, final=False))
+        return b"".join(output)
+
+    def finalize(self) -> bytes:
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._finalized = True
+        output = self._take_header() + self._seal(bytes(self._buffer), final=True)
+        self._buffer.clear()
+        return output
+
+
+def decrypt_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Decrypt a segmented AES-GCM stream, yielding plaintext one segment at a time.
+
+    Raises ValueError if the header is invalid or any segment fails
+    authentication, including truncation after a non-final segment.
+    """
+    buffer = bytearray()
+    source = iter(chunks)
+    exhausted = False
+
+    def fill(size: int) -> None:
+        nonlocal exhausted
+        while len(buffer) < size and not exhausted:
+            chunk = next(source, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer.extend(chunk)
+
+    fill(_HEADER_SIZE)
+    if len(buffer) < _HEADER_SIZE:
+        raise ValueError("Encrypted stream is too short")
+    header = bytes(buffer[:_HEADER_SIZE])
+    del buffer[:_HEADER_SIZE]
+    magic, version, segment_size, salt, nonce_prefix = struct.unpack(_HEADER_FORMAT, header)
+    if magic != _STREAM_MAGIC or version != _STREAM_VERSION or segment_size <= 0:
+        raise ValueError("Unsupported encrypted stream header")
+
+    key_ring = _key_ring()
+    cipher: Optional[AESGCM] = None
+    sealed_size = segment_size + _TAG_SIZE
+    index = 0
+    while True:
+        # Read one byte past a full segment to learn whether this one is the last.
+        fill(sealed_size + 1)
+        final = len(buffer) <= sealed_size
+        sealed = bytes(buffer[:sealed_size])
+        del buffer[:sealed_size]
+        if len(sealed) < _TAG_SIZE:
+            raise ValueError("Encrypted stream is truncated")
+        nonce = _segment_nonce(nonce_prefix, index, final)
+        if cipher is None:
+            # The first segment identifies the master key; later ones reuse it.
+            cipher, plaintext = _open_first_segment(key_ring, salt, nonce, sealed, header)
+        else:
+            try:
+                plaintext = cipher.decrypt(nonce, sealed, header)
+            except InvalidTag as exc:
+                raise ValueError("Encrypted stream failed authentication") from exc
+        index += 1
+        if plaintext:
+            yield plaintext
+        if final:
+            return
+
+
+def _open_first_segment(
+    key_ring: _KeyRing, salt: bytes, nonce: bytes, sealed: bytes, header: bytes
+) -> tuple[AESGCM, bytes]:
+    for master_key in key_ring.master_keys:
+        cipher = AESGCM(_derive_stream_key(master_key, salt))
+        try:
+            return cipher, cipher.decrypt(nonce, sealed, header)
+        except InvalidTag:
+            continue
+    raise ValueError("Encrypted stream failed authentication")
+
+
+def iter_file_chunks(file_obj: BinaryIO, chunk_size: int = STREAM_SEGMENT_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_stream_encrypted(prefix: bytes) -> bool:
+    return prefix[: len(_STREAM_MAGIC)] == _STREAM_MAGIC
+
+
+def iter_decrypted_file(file_path: str) -> Iterator[bytes]:
+    """
+    Yield the plaintext of an encrypted file on disk.
+
+    The format is detected from the file itself, so files converted by the
+    migration tool are read correctly even before their row is updated.
+    Legacy Fernet files are decrypted in one piece.
+    """
+    with open(file_path, "rb") as file_stream:
+        prefix = file_stream.read(len(_STREAM_MAGIC))
+        if is_stream_encrypted(prefix):
+            file_stream.seek(0)
+            yield from decrypt_stream(iter_file_chunks(file_stream))
+            return
+        yield decrypt_file(prefix + file_stream.read())
+
+
+def file_key_id(file_path: str) -> Optional[str]:
+    """ID of the configured master key that decrypts the file, or None."""
+    key_ring = _key_ring()
+    with open(file_path, "rb") as file_stream:
+        header = file_stream.read(_HEADER_SIZE)
+        if is_stream_encrypted(header):
+            if len(header) < _HEADER_SIZE:
+                return None
+            _, _, segment_size, salt, nonce_prefix = struct.unpack(_HEADER_FORMAT, header)
+            sealed = file_stream.read(segment_size + _TAG_SIZE)
+            final = not file_stream.read(1)
+            nonce = _segment_nonce(nonce_prefix, 0, final)
+            for key_id, master_key in zip(key_ring.key_ids, key_ring.master_keys):
+                try:
+                    AESGCM(_derive_stream_key(master_key, salt)).decrypt(nonce, sealed, header)
+                    return key_id
+                except InvalidTag:
+                    continue
+            return None
+
+        token = header + file_stream.read()
+    for key_id, fernet in zip(key_ring.key_ids, key_ring.fernets):
+        try:
+            fernet.decrypt(token)
+            return key_id
+        except InvalidToken:
+            continue
+    return None
+
+
+def rewrap_file(file_path: str) -> bool:
+    """
+    Re-encrypt a file under the primary key, keeping its format.
+
+    Returns False if it already uses the primary key. The new file is written
+    beside the old one and swapped in atomically. Raises ValueError if no
+    configured key decrypts the file.
+    """
+    key_id = file_key_id(file_path)
+    if key_id is None:
+        raise ValueError("No configured encryption key decrypts this file")
+    if key_id == primary_key_id():
+        return False
+
+    partial_path = f"{file_path}.rewrap"
+    try:
+        with open(file_path, "rb") as source, open(partial_path, "wb") as target:
+            if is_stream_encrypted(source.read(len(_STREAM_MAGIC))):
+                source.seek(0)
+                encryptor = StreamEncryptor()
+                for plaintext in decrypt_stream(iter_file_chunks(source)):
+                    target.write(encryptor.update(plaintext))
+                target.write(encryptor.finalize())
+            else:
+                source.seek(0)
+                target.write(get_fernet_cipher().rotate(source.read()))
+        os.replace(partial_path, file_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return True
+
+
 def generate_unique_filename(original_filename: str, user_id: int) -> str:
     """
     Generate a unique filename for storage
@@ -0,0 +1,125 @@
+"""
+Bounded executors for CPU-bound work called from async endpoints.
+
+Argon2, AES/Fernet, RSA and SHA-256 release the GIL inside their C
+implementations, so they run on a shared thread pool. Pure-Python work (QR
+code rendering) can use an optional process pool (CPU_PROCESS_POOL_SIZE > 0);
+without one it falls back to the thread pool. Each pool admits at most
+CPU_EXECUTOR_MAX_PENDING submissions at a time; further callers wait
+without blocking the event loop.
+
+Per-operation latency and queue wait are recorded in app.utils.metrics
+under ``executor.<pool>.<operation>``, with queue depth as gauges.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import settings
+from app.utils.metrics import adjust_gauge, observe_latency
+
+T = TypeVar("T")
+
+_lock = Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_admission: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=settings.CPU_THREAD_POOL_SIZE,
+                thread_name_prefix="cpu-worker",
+            )
+        return _thread_pool
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _process_pool
+    if settings.CPU_PROCESS_POOL_SIZE <= 0:
+        return None
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=settings.CPU_PROCESS_POOL_SIZE)
+        return _process_pool
+
+
+def _admission_semaphore(pool_name: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        semaphores = _admission.setdefault(loop, {})
+        semaphore = semaphores.get(pool_name)
+        if semaphore is None:
+            semaphore = semaphores[pool_name] = asyncio.Semaphore(settings.CPU_EXECUTOR_MAX_PENDING)
+        return semaphore
+
+
+def _timed_call(fn: Callable[..., T], args: tuple, kwargs: dict, submitted_at: float) -> tuple[T, float, float]:
+    started_at = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, started_at - submitted_at, time.perf_counter() - started_at
+
+
+async def _submit(pool_name: str, pool: Executor, operation: str, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    metric = f"executor.{pool_name}.{operation}"
+    adjust_gauge(f"executor.{pool_name}.waiting", 1)
+    async with _admission_semaphore(pool_name):
+        adjust_gauge(f"executor.{pool_name}.waiting", -1)
+        adjust_gauge(f"executor.{pool_name}.in_flight", 1)
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            if isinstance(pool, ProcessPoolExecutor):
+                # Timing wrappers would have to be pickled; measure end to end instead.
+                result = await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+                observe_latency(metric, time.perf_counter() - submitted_at)
+                return result
+
+            result, queued_for, ran_for = await loop.run_in_executor(
+                pool, _timed_call, fn, args, kwargs, submitted_at
+            )
+            observe_latency(f"{metric}.queue_wait", queued_for)
+            observe_latency(metric, ran_for)
+            return result
+        finally:
+            adjust_gauge(f"executor.{pool_name}.in_flight", -1)
+
+
+async def run_in_thread(operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a GIL-releasing blocking call on the bounded CPU thread pool."""
+    return await _submit("thread", _get_thread_pool(), operation, fn, args, kwargs)
+
+
+async def run_in_process(operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run pure-Python CPU work on the process pool when one is configured.
+
+    fn and its arguments must be picklable. Falls back to the thread pool.
+    """
+    pool = _get_process_pool()
+    if pool is None:
+        return await run_in_thread(operation, fn, *args, **kwargs)
+    return await _submit("process", pool, operation, fn, args, kwargs)
+
+
+def shutdown_executors() -> None:
+    global _thread_pool, _process_pool
+    with _lock:
+        thread_pool, process_pool = _thread_pool, _process_pool
+        _thread_pool = None
+        _process_pool = None
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=True)
+    if process_pool is not None:
+        process_pool.shutdown(wait=True)
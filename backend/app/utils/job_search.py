@@ -0,0 +1,336 @@
+"""
+Job search with relevance ranking, keyset pagination and facet counts.
+
+Keyword matches are ranked by the search index (tsvector rank on PostgreSQL,
+the in-process inverted index elsewhere), weighting title over skills over
+description. Without a keyword, or with sort="recent", jobs are ordered
+newest first. Skill filters use the normalized skill links (app.utils.skills).
+Facet counts are grouped in the database: one GROUPING SETS query on
+PostgreSQL, one GROUP BY per facet elsewhere.
+"""
+from __future__ import annotations
+
+import enum
+from collections import Counter
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import case, false, func, literal_column, null, or_
+from sqlalchemy.orm import Query, Session
+
+from app.models.networking import Company, EmploymentType, JobPosting, WorkMode
+from app.utils.pagination import encode_cursor, fetch_size, keyset_filter
+from app.utils.search_index import job_rank_clause, job_relevance_scores
+from app.utils.skills import jobs_with_skills, skill_filter_ids
+
+# Lower bounds of the salary facet buckets; the last bucket is open-ended.
+SALARY_BUCKETS = (0, 300_000, 600_000, 1_000_000, 2_000_000)
+FACET_LIMIT = 10
+
+
+class JobSearchFilters:
+    __slots__ = (
+        "keyword",
+        "company_id",
+        "company",
+        "location",
+        "skill",
+        "remote",
+        "employment_type",
+        "salary_min",
+        "salary_max",
+        "active_only",
+        "skill_ids",
+    )
+
+    def __init__(
+        self,
+        keyword: Optional[str] = None,
+        company_id: Optional[int] = None,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        skill: Optional[str] = None,
+        remote: Optional[bool] = None,
+        employment_type: Optional[EmploymentType] = None,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        active_only: bool = True,
+    ):
+        self.keyword = (keyword or "").strip() or None
+        self.company_id = company_id
+        self.company = company
+        self.location = location
+        self.skill = skill
+        self.remote = remote
+        self.employment_type = employment_type
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+        self.active_only = active_only
+        # Resolved from skill by _resolve_skills; None means a requested skill is unknown.
+        self.skill_ids: Optional[list[int]] = None
+
+
+class JobSearchPage:
+    __slots__ = ("items", "next_cursor", "total", "facets")
+
+    def __init__(
+        self,
+        items: list[JobPosting],
+        next_cursor: Optional[str],
+        total: Optional[int] = None,
+        facets: Optional[dict[str, list[dict[str, Any]]]] = None,
+    ):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.facets = facets
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _resolve_skills(db: Session, filters: JobSearchFilters) -> None:
+    if filters.skill:
+        filters.skill_ids = skill_filter_ids(db, filters.skill)
+
+
+def _filtered(query: Query, filters: JobSearchFilters, keyword_match=None) -> Query:
+    query = query.join(Company, Company.id == JobPosting.company_id)
+
+    if filters.active_only:
+        query = query.filter(JobPosting.is_active == True)
+
+    if keyword_match is not None:
+        # search_vector covers title, skills and description; OR-ing in ILIKE
+        # clauses would rule out its GIN index and scan every posting.
+        query = query.filter(keyword_match)
+    elif filters.keyword:
+        like_query = f"%{filters.keyword}%"
+        query = query.filter(or_(
+            JobPosting.title.ilike(like_query),
+            JobPosting.description.ilike(like_query),
+            JobPosting.required_skills.ilike(like_query),
+        ))
+
+    if filters.company_id is not None:
+        query = query.filter(JobPosting.company_id == filters.company_id)
+    if filters.company:
+        query = query.filter(Company.name.ilike(f"%{filters.company}%"))
+    if filters.location:
+        query = query.filter(JobPosting.location.ilike(f"%{filters.location}%"))
+    if filters.skill:
+        # Every listed skill must be linked to the job.
+        if filters.skill_ids is None:
+            query = query.filter(false())
+        elif filters.skill_ids:
+            query = query.filter(JobPosting.id.in_(jobs_with_skills(filters.skill_ids)))
+    if filters.remote is not None:
+        query = query.filter(JobPosting.work_mode == (WorkMode.REMOTE if filters.remote else WorkMode.ONSITE))
+    if filters.employment_type is not None:
+        query = query.filter(JobPosting.employment_type == filters.employment_type)
+
+    # Salary ranges overlap the requested range; jobs without a salary are excluded.
+    if filters.salary_min is not None:
+        query = query.filter(func.coalesce(JobPosting.salary_max, JobPosting.salary_min) >= filters.salary_min)
+    if filters.salary_max is not None:
+        query = query.filter(func.coalesce(JobPosting.salary_min, JobPosting.salary_max) <= filters.salary_max)
+    return query
+
+
+def _keyword_match(db: Session, filters: JobSearchFilters):
+    """The full-text match for filters.keyword on PostgreSQL, else None."""
+    if not filters.keyword or not _is_postgres(db):
+        return None
+    rank_clause = job_rank_clause(filters.keyword)
+    return rank_clause[0] if rank_clause else None
+
+
+def _salary_bucket_column():
+    """The salary facet bucket of each job (by salary_max, else salary_min), or NULL."""
+    salary = func.coalesce(JobPosting.salary_max, JobPosting.salary_min)
+    # Bounds are inlined rather than bound so the expression in SELECT and
+    # GROUP BY renders identically, which PostgreSQL requires.
+    whens = [(salary.is_(None), null())]
+    for lower, upper in zip(SALARY_BUCKETS, SALARY_BUCKETS[1:]):
+        whens.append((salary < literal_column(str(upper)), literal_column(f"'{lower}-{upper}'")))
+    return case(*whens, else_=literal_column(f"'{SALARY_BUCKETS[-1]}+'"))
+
+
+def _salary_bucket_values() -> list[str]:
+    values = [f"{lower}-{upper}" for lower, upper in zip(SALARY_BUCKETS, SALARY_BUCKETS[1:])]
+    return values + [f"{SALARY_BUCKETS[-1]}+"]
+
+
+def _top(counter: Counter, labels: dict[str, str]) -> list[dict[str, Any]]:
+    ranked = sorted(counter.items(), key=lambda item: (-item[1], labels.get(item[0], item[0]).lower()))
+    return [
+        {"value": value, "label": labels.get(value), "count": count}
+        for value, count in ranked[:FACET_LIMIT]
+    ]
+
+
+def _facet_groups(db: Session, filters: JobSearchFilters, keyword_match) -> Iterator[tuple[str, Any, Any, int]]:
+    """(facet, value, label, count) for each group of the matching rows."""
+    location_label = func.min(func.trim(JobPosting.location))
+    company_label = func.min(Company.name)
+    facets = [
+        ("work_mode", JobPosting.work_mode, None),
+        ("employment_type", JobPosting.employment_type, None),
+        ("location", func.lower(func.trim(JobPosting.location)), location_label),
+        ("company", JobPosting.company_id, company_label),
+        ("salary", _salary_bucket_column(), None),
+    ]
+
+    if _is_postgres(db):
+        keys = [key for _, key, _ in facets]
+        query = _filtered(
+            db.query(*keys, location_label, company_label, func.count(), *(func.grouping(key) for key in keys)),
+            filters,
+            keyword_match,
+        ).group_by(func.grouping_sets(*keys))
+        for row in query:
+            # GROUPING(key) is 0 only for the set grouped by that key.
+            index = list(row[-len(keys):]).index(0)
+            name = facets[index][0]
+            label = row[len(keys)] if name == "location" else row[len(keys) + 1] if name == "company" else None
+            yield name, row[index], label, int(row[len(keys) + 2])
+        return
+
+    for name, key, label in facets:
+        columns = [key, label if label is not None else null(), func.count()]
+        for value, value_label, count in _filtered(db.query(*columns), filters, keyword_match).group_by(key):
+            yield name, value, value_label, int(count)
+
+
+def job_search_facets(db: Session, filters: JobSearchFilters) -> tuple[int, dict[str, list[dict[str, Any]]]]:
+    """Total matches and facet counts, grouped in the database."""
+    _resolve_skills(db, filters)
+    keyword_match = _keyword_match(db, filters)
+
+    total = 0
+    counts: dict[str, Counter] = {
+        name: Counter() for name in ("work_mode", "employment_type", "location", "company", "salary")
+    }
+    labels: dict[str, dict[str, str]] = {"location": {}, "company": {}}
+    for name, value, label, count in _facet_groups(db, filters, keyword_match):
+        if name == "work_mode":
+            # Every matching row falls in exactly one work_mode group.
+            total += count
+        if value is None or value == "":
+            continue
+        key = value.value if isinstance(value, enum.Enum) else str(value)
+        counts[name][key] += count
+        if name in labels and label is not None:
+            labels[name].setdefault(key, label)
+
+    facets = {
+        "work_mode": [{"value": mode.value, "count": counts["work_mode"][mode.value]} for mode in WorkMode],
+        "employment_type": [
+            {"value": kind.value, "count": counts["employment_type"][kind.value]} for kind in EmploymentType
+        ],
+        "location": _top(counts["location"], labels["location"]),
+        "company": _top(counts["company"], labels["company"]),
+        "salary": [{"value": value, "count": counts["salary"][value]} for value in _salary_bucket_values()],
+    }
+    return total, facets
+
+
+def _recent_page(
+    db: Session,
+    filters: JobSearchFilters,
+    limit: Optional[int],
+    position: Optional[tuple],
+) -> JobSearchPage:
+    query = _filtered(db.query(JobPosting), filters, _keyword_match(db, filters))
+    if position:
+        query = query.filter(keyset_filter(JobPosting.created_at, JobPosting.id, *position))
+    rows = query.order_by(JobPosting.created_at.desc(), JobPosting.id.desc()).limit(fetch_size(limit)).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, int(rows[-1].id))
+    return JobSearchPage(rows, next_cursor)
+
+
+def _ranked_page_postgres(
+    db: Session,
+    filters: JobSearchFilters,
+    limit: Optional[int],
+    position: Optional[tuple],
+) -> JobSearchPage:
+    rank_clause = job_rank_clause(filters.keyword or "")
+    if rank_clause is None:
+        return _recent_page(db, filters, limit, None)
+    match, rank = rank_clause
+    query = _filtered(db.query(JobPosting, rank.label("rank")), filters, match)
+    if position:
+        query = query.filter(keyset_filter(rank, JobPosting.id, *position))
+    rows = query.order_by(rank.desc(), JobPosting.id.desc()).limit(fetch_size(limit)).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(float(rows[-1].rank), int(rows[-1][0].id))
+    return JobSearchPage([job for job, _ in rows], next_cursor)
+
+
+def _ranked_page_fallback(
+    db: Session,
+    filters: JobSearchFilters,
+    limit: Optional[int],
+    position: Optional[tuple],
+) -> JobSearchPage:
+    scores = job_relevance_scores(db, filters.keyword or "")
+    ranked = sorted(
+        ((scores.get(job_id, 0.0), job_id) for (job_id,) in _filtered(db.query(JobPosting.id), filters)),
+        key=lambda item: (-item[0], -item[1]),
+    )
+    if position:
+        score, last_id = position
+        ranked = [item for item in ranked if item[0] < score or (item[0] == score and item[1] < last_id)]
+
+    page = ranked[: fetch_size(limit)]
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1][0], page[-1][1])
+
+    ids = [job_id for _, job_id in page]
+    rows = db.query(JobPosting).filter(JobPosting.id.in_(ids)).all() if ids else []
+    row_map = {row.id: row for row in rows}
+    return JobSearchPage([row_map[job_id] for job_id in ids if job_id in row_map], next_cursor)
+
+
+def search_jobs(
+    db: Session,
+    filters: JobSearchFilters,
+    limit: Optional[int],
+    position: Optional[tuple] = None,
+    sort: str = "relevance",
+    with_facets: bool = False,
+) -> JobSearchPage:
+    """
+    One page of matching jobs.
+
+    position is a decoded cursor from a previous page of the same search; a
+    limit of None returns every match. Raises ValueError when the cursor does
+    not belong to the requested ordering.
+    """
+    _resolve_skills(db, filters)
+    ranked = sort == "relevance" and filters.keyword is not None
+    if position is not None:
+        value = position[0]
+        if ranked and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError("Cursor does not match the search ordering")
+        if not ranked and not hasattr(value, "isoformat"):
+            raise ValueError("Cursor does not match the search ordering")
+
+    if not ranked:
+        page = _recent_page(db, filters, limit, position)
+    elif _is_postgres(db):
+        page = _ranked_page_postgres(db, filters, limit, position)
+    else:
+        page = _ranked_page_fallback(db, filters, limit, position)
+
+    if with_facets:
+        page.total, page.facets = job_search_facets(db, filters)
+    return page
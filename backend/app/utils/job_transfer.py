@@ -0,0 +1,218 @@
+"""
+Streaming formats for bulk job import and export.
+
+Uploads are parsed as they arrive, one line at a time, so an import never
+holds the whole file. NDJSON has one JSON object per line. CSV has a header
+row naming JobCreate fields; empty cells are left out so schema defaults
+apply, and quoted cells may span lines.
+
+Exports read the company's rows in id-ordered batches, each in a short
+session of its own, and encode them as NDJSON or CSV. Leading =, +, - and @
+in CSV text cells are quoted with an apostrophe so spreadsheet tools do not
+evaluate them as formulas.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.networking import JobApplication, JobPosting
+from app.models.user import User
+
+EXPORT_BATCH_SIZE = 500
+
+JOB_EXPORT_FIELDS = (
+    "id",
+    "company_id",
+    "title",
+    "description",
+    "required_skills",
+    "location",
+    "work_mode",
+    "employment_type",
+    "salary_min",
+    "salary_max",
+    "application_deadline",
+    "is_active",
+    "created_at",
+)
+APPLICATION_EXPORT_FIELDS = (
+    "id",
+    "job_id",
+    "job_title",
+    "candidate_id",
+    "candidate_name",
+    "candidate_email",
+    "resume_id",
+    "status",
+    "is_shortlisted",
+    "cover_note",
+    "recruiter_notes",
+    "created_at",
+    "updated_at",
+)
+
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# (row number, parsed record or None, error or None)
+ImportRecord = tuple[int, Optional[Any], Optional[str]]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decoded lines of a UTF-8 byte stream, without line endings. Raises ValueError on bad UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    row = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line), None
+        except json.JSONDecodeError as exc:
+            yield row, None, f"Invalid JSON: {exc.msg}"
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    header: Optional[list[str]] = None
+    row = 0
+    buffered: list[str] = []
+    quotes = 0
+    async for line in _lines(chunks):
+        buffered.append(line)
+        quotes += line.count('"')
+        # Quotes inside cells are doubled, so an odd count means a quoted cell continues.
+        if quotes % 2:
+            continue
+        text = "\n".join(buffered)
+        buffered = []
+        quotes = 0
+        if not text.strip():
+            continue
+
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+        except csv.Error as exc:
+            if header is None:
+                raise ValueError(f"Invalid CSV header: {exc}") from exc
+            row += 1
+            yield row, None, f"Invalid CSV: {exc}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if buffered:
+        yield row + 1, None, "Unterminated quoted cell"
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _job_records(db: Session, company_id: int, last_id: int, limit: int) -> list[dict[str, Any]]:
+    jobs = (
+        db.query(JobPosting)
+        .filter(JobPosting.company_id == company_id, JobPosting.id > last_id)
+        .order_by(JobPosting.id.asc())
+        .limit(limit)
+        .all()
+    )
+    return [{field: _plain(getattr(job, field)) for field in JOB_EXPORT_FIELDS} for job in jobs]
+
+
+def _application_records(db: Session, company_id: int, last_id: int, limit: int) -> list[dict[str, Any]]:
+    rows = (
+        db.query(JobApplication, JobPosting.title, User.full_name, User.email)
+        .join(JobPosting, JobPosting.id == JobApplication.job_id)
+        .join(User, User.id == JobApplication.candidate_id)
+        .filter(JobPosting.company_id == company_id, JobApplication.id > last_id)
+        .order_by(JobApplication.id.asc())
+        .limit(limit)
+        .all()
+    )
+    records = []
+    for application, job_title, candidate_name, candidate_email in rows:
+        record = {field: _plain(getattr(application, field, None)) for field in APPLICATION_EXPORT_FIELDS}
+        record.update(job_title=job_title, candidate_name=candidate_name, candidate_email=candidate_email)
+        records.append(record)
+    return records
+
+
+def iter_export_records(
+    session_factory: Callable[[], Session],
+    company_id: int,
+    resource: str,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """A company's jobs or applications (resource "jobs" or "applications") in id order."""
+    load = _job_records if resource == "jobs" else _application_records
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            records = load(db, company_id, last_id, batch_size)
+        finally:
+            db.close()
+        if not records:
+            return
+        last_id = int(records[-1]["id"])
+        yield from records
+
+
+def export_fields(resource: str) -> tuple[str, ...]:
+    return JOB_EXPORT_FIELDS if resource == "jobs" else APPLICATION_EXPORT_FIELDS
+
+
+def encode_ndjson(records: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_csv(records: Iterable[dict[str, Any]], fields: tuple[str, ...]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for record in records:
+        writer.writerow([_csv_cell(record.get(field)) for field in fields])
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
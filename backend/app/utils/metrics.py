@@ -0,0 +1,86 @@
+"""
+Lightweight in-process metrics: latency summaries and gauges.
+
+Values are per worker process and reset on restart; they are exposed through
+the admin metrics endpoint rather than an external metrics backend.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from threading import Lock
+from typing import Any
+
+_SAMPLE_WINDOW = 1024
+
+
+class _LatencySummary:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def percentile(fraction: float) -> float | None:
+            if not ordered:
+                return None
+            index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+            return round(ordered[index] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+_lock = Lock()
+_latencies: dict[str, _LatencySummary] = {}
+_gauges: dict[str, float] = {}
+_counters: dict[str, int] = {}
+
+
+def observe_latency(name: str, seconds: float) -> None:
+    with _lock:
+        summary = _latencies.get(name)
+        if summary is None:
+            summary = _latencies[name] = _LatencySummary()
+        summary.observe(seconds)
+
+
+def adjust_gauge(name: str, delta: float) -> None:
+    with _lock:
+        _gauges[name] = _gauges.get(name, 0) + delta
+
+
+def set_gauge(name: str, value: float) -> None:
+    with _lock:
+        _gauges[name] = value
+
+
+def increment_counter(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def metrics_snapshot() -> dict[str, Any]:
+    with _lock:
+        return {
+            "latency": {name: summary.snapshot() for name, summary in sorted(_latencies.items())},
+            "gauges": dict(sorted(_gauges.items())),
+            "counters": dict(sorted(_counters.items())),
+        }
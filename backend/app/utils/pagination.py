@@ -0,0 +1,45 @@
+"""
+Opaque keyset cursors for paginated endpoints.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a (sort value, id) keyset position as an opaque URL-safe token."""
+    if isinstance(sort_value, datetime):
+        payload = ["dt", sort_value.isoformat(), int(row_id)]
+    else:
+        payload = ["v", sort_value, int(row_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if kind == "dt":
+            value = datetime.fromisoformat(value)
+        elif kind != "v":
+            raise ValueError("unknown cursor kind")
+        return value, int(row_id)
+    except (TypeError, ValueError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+
+def fetch_size(limit: Optional[int]) -> Optional[int]:
+    """Rows to fetch for a page of limit: one extra to detect a next page, or all when unpaged."""
+    return None if limit is None else limit + 1
+
+
+def keyset_filter(sort_column, id_column, sort_value: Any, row_id: int, descending: bool = True):
+    """Filter for rows strictly after (sort_value, row_id) in the given direction."""
+    if descending:
+        return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id))
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > row_id))
@@ -1,96 +1,289 @@
 """
 PKI helper utilities for signing and verification.
+
+Keys are parsed once and cached by a KeyManager. The key files are re-checked
+at most every PKI_KEY_RELOAD_INTERVAL_SECONDS and reloaded when their mtime
+changes, so a rotated key is picked up without a restart.
+
+Every key is identified by a key ID (a truncated SHA-256 of its public key).
+On rotation the outgoing public key is kept in PKI_RETIRED_KEYS_DIR, so
+signatures made with it still verify when the caller passes the stored key ID.
 """
 from __future__ import annotations
 
-import os
 import base64
+import glob
+import hashlib
+import os
+import time
+from threading import Lock
+from typing import Optional
+
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
 from app.config import settings
+from app.utils.executor import run_in_thread
 
 
-def _ensure_keypair() -> None:
-    private_path = settings.PKI_PRIVATE_KEY_PATH
-    public_path = settings.PKI_PUBLIC_KEY_PATH
-
-    if os.path.exists(private_path) and os.path.exists(public_path):
-        return
+_PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH,
+)
 
-    os.makedirs(os.path.dirname(private_path), exist_ok=True)
-    os.makedirs(os.path.dirname(public_path), exist_ok=True)
 
+def _generate_keypair() -> tuple[bytes, bytes]:
     private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    public_key = private_key.public_key()
-
     private_bytes = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PrivateFormat.PKCS8,
         encryption_algorithm=serialization.NoEncryption(),
     )
-    public_bytes = public_key.public_bytes(
+    public_bytes = private_key.public_key().public_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PublicFormat.SubjectPublicKeyInfo,
     )
+    return private_bytes, public_bytes
 
-    with open(private_path, "wb") as private_file:
-        private_file.write(private_bytes)
-
-    with open(public_path, "wb") as public_file:
-        public_file.write(public_bytes)
 
+def _write_atomic(path: str, data: bytes, mode: int = 0o644) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial_path = f"{path}.tmp"
+    with open(partial_path, "wb") as handle:
+        handle.write(data)
+    os.chmod(partial_path, mode)
+    os.replace(partial_path, path)
 
-def _load_private_key():
-    _ensure_keypair()
-    with open(settings.PKI_PRIVATE_KEY_PATH, "rb") as private_file:
-        key = serialization.load_pem_private_key(private_file.read(), password=None)
-        if not isinstance(key, RSAPrivateKey):
-            raise ValueError("Configured private key is not RSA")
-        return key
 
+def _ensure_keypair(private_path: str, public_path: str) -> None:
+    if os.path.exists(private_path) and os.path.exists(public_path):
+        return
 
-def _load_public_key():
-    _ensure_keypair()
-    with open(settings.PKI_PUBLIC_KEY_PATH, "rb") as public_file:
-        key = serialization.load_pem_public_key(public_file.read())
-        if not isinstance(key, RSAPublicKey):
-            raise ValueError("Configured public key is not RSA")
-        return key
+    private_bytes, public_bytes = _generate_keypair()
+    _write_atomic(private_path, private_bytes, 0o600)
+    _write_atomic(public_path, public_bytes)
 
 
-def sign_bytes(payload: bytes) -> str:
-    private_key = _load_private_key()
-    signature = private_key.sign(
-        payload,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH,
-        ),
-        hashes.SHA256(),
+def _key_id(public_key: RSAPublicKey) -> str:
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
     )
-    return base64.b64encode(signature).decode("utf-8")
-
-
-def verify_signature(payload: bytes, signature_b64: str) -> bool:
-    try:
-        signature = base64.b64decode(signature_b64)
-        public_key = _load_public_key()
-        public_key.verify(
-            signature,
-            payload,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH,
-            ),
-            hashes.SHA256(),
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def _load_public_pem(pem: bytes) -> RSAPublicKey:
+    key = serialization.load_pem_public_key(pem)
+    if not isinstance(key, RSAPublicKey):
+        raise ValueError("Configured public key is not RSA")
+    return key
+
+
+class _KeySet:
+    """An immutable snapshot of the signing key and all verification keys."""
+
+    __slots__ = ("private_key", "key_id", "public_pem", "public_keys", "file_state")
+
+    def __init__(
+        self,
+        private_key: RSAPrivateKey,
+        key_id: str,
+        public_pem: str,
+        public_keys: dict[str, tuple[RSAPublicKey, str]],
+        file_state: tuple,
+    ):
+        self.private_key = private_key
+        self.key_id = key_id
+        self.public_pem = public_pem
+        self.public_keys = public_keys
+        self.file_state = file_state
+
+
+class KeyManager:
+    """Caches parsed PKI keys and reloads them when the key files change."""
+
+    def __init__(self, private_path: str, public_path: str, retired_dir: str, reload_interval: float):
+        self.private_path = private_path
+        self.public_path = public_path
+        self.retired_dir = retired_dir
+        self.reload_interval = reload_interval
+        self._lock = Lock()
+        self._keyset: Optional[_KeySet] = None
+        self._next_check = 0.0
+
+    def _file_state(self) -> tuple:
+        def stat(path: str) -> Optional[tuple[int, int]]:
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                return None
+            return info.st_mtime_ns, info.st_size
+
+        retired = tuple(
+            (path, stat(path)) for path in sorted(glob.glob(os.path.join(self.retired_dir, "*.pem")))
         )
-        return True
-    except Exception:
+        return stat(self.private_path), stat(self.public_path), retired
+
+    def _load(self, file_state: tuple) -> Optional[_KeySet]:
+        with open(self.private_path, "rb") as private_file:
+            private_key = serialization.load_pem_private_key(private_file.read(), password=None)
+        if not isinstance(private_key, RSAPrivateKey):
+            raise ValueError("Configured private key is not RSA")
+        with open(self.public_path, "rb") as public_file:
+            public_pem = public_file.read()
+        public_key = _load_public_pem(public_pem)
+
+        key_id = _key_id(public_key)
+        if key_id != _key_id(private_key.public_key()):
+            # The pair is mid-rotation on disk; keep the previous keys for now.
+            return None
+
+        public_keys: dict[str, tuple[RSAPublicKey, str]] = {}
+        for path, _ in file_state[2]:
+            try:
+                with open(path, "rb") as retired_file:
+                    retired_pem = retired_file.read()
+                retired_key = _load_public_pem(retired_pem)
+            except (OSError, ValueError):
+                continue
+            public_keys[_key_id(retired_key)] = (retired_key, retired_pem.decode("utf-8"))
+        public_keys[key_id] = (public_key, public_pem.decode("utf-8"))
+
+        return _KeySet(private_key, key_id, public_pem.decode("utf-8"), public_keys, file_state)
+
+    def _current(self) -> _KeySet:
+        keyset = self._keyset
+        if keyset is not None and time.monotonic() < self._next_check:
+            return keyset
+
+        with self._lock:
+            keyset = self._keyset
+            now = time.monotonic()
+            if keyset is not None and now < self._next_check:
+                return keyset
+
+            file_state = self._file_state()
+            if keyset is None and (file_state[0] is None or file_state[1] is None):
+                _ensure_keypair(self.private_path, self.public_path)
+                file_state = self._file_state()
+
+            if keyset is None or file_state != keyset.file_state:
+                loaded = self._load(file_state)
+                if loaded is not None:
+                    keyset = self._keyset = loaded
+                elif keyset is None:
+                    raise ValueError("Configured private and public keys do not match")
+
+            self._next_check = now + self.reload_interval
+            return keyset
+
+    @property
+    def key_id(self) -> str:
+        return self._current().key_id
+
+    def sign(self, payload: bytes) -> tuple[str, str]:
+        keyset = self._current()
+        signature = keyset.private_key.sign(payload, _PSS_PADDING, hashes.SHA256())
+        return base64.b64encode(signature).decode("utf-8"), keyset.key_id
+
+    def verify(self, payload: bytes, signature_b64: str, key_id: Optional[str] = None) -> bool:
+        try:
+            signature = base64.b64decode(signature_b64)
+            keyset = self._current()
+        except Exception:
+            return False
+
+        if key_id is not None:
+            entry = keyset.public_keys.get(key_id)
+            candidates = [entry[0]] if entry else []
+        else:
+            # Signatures made before key IDs were recorded: try the current key first.
+            candidates = [keyset.public_keys[keyset.key_id][0]] + [
+                public_key for kid, (public_key, _) in keyset.public_keys.items() if kid != keyset.key_id
+            ]
+
+        for public_key in candidates:
+            try:
+                public_key.verify(signature, payload, _PSS_PADDING, hashes.SHA256())
+                return True
+            except Exception:
+                continue
         return False
 
+    def public_key_pem(self, key_id: Optional[str] = None) -> Optional[str]:
+        keyset = self._current()
+        if key_id is None:
+            return keyset.public_pem
+        entry = keyset.public_keys.get(key_id)
+        return entry[1] if entry else None
+
+    def rotate(self) -> str:
+        """Retire the current public key and install a freshly generated keypair."""
+        keyset = self._current()
+        with self._lock:
+            _write_atomic(
+                os.path.join(self.retired_dir, f"{keyset.key_id}.pem"),
+                keyset.public_pem.encode("utf-8"),
+            )
+            private_bytes, public_bytes = _generate_keypair()
+            _write_atomic(self.private_path, private_bytes, 0o600)
+            _write_atomic(self.public_path, public_bytes)
+            self._next_check = 0.0
+        return self.key_id
+
+
+_manager: Optional[KeyManager] = None
+_manager_lock = Lock()
+
+
+def get_key_manager() -> KeyManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = KeyManager(
+                    private_path=settings.PKI_PRIVATE_KEY_PATH,
+                    public_path=settings.PKI_PUBLIC_KEY_PATH,
+                    retired_dir=settings.PKI_RETIRED_KEYS_DIR
+                    or os.path.join(os.path.dirname(settings.PKI_PUBLIC_KEY_PATH), "retired"),
+                    reload_interval=settings.PKI_KEY_RELOAD_INTERVAL_SECONDS,
+                )
+    return _manager
+
+
+def current_key_id() -> str:
+    return get_key_manager().key_id
+
+
+def sign_bytes(payload: bytes) -> str:
+    return get_key_manager().sign(payload)[0]
+
+
+def sign_with_key_id(payload: bytes) -> tuple[str, str]:
+    """Sign payload and return (signature, key_id) of the key that signed it."""
+    return get_key_manager().sign(payload)
+
+
+def verify_signature(payload: bytes, signature_b64: str, key_id: Optional[str] = None) -> bool:
+    return get_key_manager().verify(payload, signature_b64, key_id)
+
+
+async def sign_bytes_async(payload: bytes) -> str:
+    return await run_in_thread("rsa_sign", sign_bytes, payload)
+
+
+async def sign_with_key_id_async(payload: bytes) -> tuple[str, str]:
+    return await run_in_thread("rsa_sign", sign_with_key_id, payload)
+
+
+async def verify_signature_async(payload: bytes, signature_b64: str, key_id: Optional[str] = None) -> bool:
+    return await run_in_thread("rsa_verify", verify_signature, payload, signature_b64, key_id)
+
+
+def get_public_key_pem(key_id: Optional[str] = None) -> Optional[str]:
+    """PEM of the current public key, or of a retired key by ID (None if unknown)."""
+    return get_key_manager().public_key_pem(key_id)
+
 
-def get_public_key_pem() -> str:
-    _ensure_keypair()
-    with open(settings.PKI_PUBLIC_KEY_PATH, "rb") as public_file:
-        return public_file.read().decode("utf-8")
+def rotate_signing_key() -> str:
+    return get_key_manager().rotate()
@@ -0,0 +1,215 @@
+"""
+Sliding-window rate limiting, in Redis or in process.
+
+The Redis limiter runs the whole check-and-record step as one Lua script
+(sent with EVALSHA, falling back to EVAL once after a SCRIPT FLUSH), so
+concurrent workers cannot both pass the check for the last free slot. It uses
+its own connection pool, sized by RATE_LIMIT_REDIS_MAX_CONNECTIONS, so a burst
+of requests does not starve the feed and messaging clients.
+
+When Redis is unavailable, LocalRateLimiter keeps approximate per-key counters
+in fixed-size arrays, so scanning traffic cannot grow memory without bound.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import time
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from app.config import settings
+from app.utils.metrics import increment_counter, set_gauge
+
+try:
+    import redis.asyncio as redis
+except Exception:  # pragma: no cover
+    redis = None
+
+
+# KEYS[1] = log key; ARGV = now (ms), window (ms), limit, unique member.
+# Returns {allowed (1/0), retry_after (ms)}.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    end
+    return {0, retry_after}
+end
+
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('PEXPIRE', key, window + 5000)
+return {1, 0}
+"""
+
+_member_sequence = itertools.count()
+
+
+class RedisRateLimiter:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._script = redis_client.register_script(SLIDING_WINDOW_LUA)
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> tuple[bool, int]:
+        """Record a request under key if it fits; returns (allowed, retry_after_seconds)."""
+        now_ms = time.time_ns() // 1_000_000
+        member = f"{now_ms}:{os.getpid()}:{next(_member_sequence)}"
+        allowed, retry_after_ms = await self._script(
+            keys=[key],
+            args=[now_ms, int(window_seconds * 1000), limit, member],
+        )
+        if allowed:
+            return True, 0
+        return False, max(1, math.ceil(int(retry_after_ms) / 1000))
+
+    async def close(self) -> None:
+        close_method = getattr(self.redis, "aclose", None)
+        if close_method is not None:
+            await close_method()
+        else:
+            await self.redis.close()
+
+
+def create_rate_limit_client():
+    """A Redis client on a dedicated pool configured by the RATE_LIMIT_REDIS_* settings."""
+    if redis is None:
+        return None
+    return redis.from_url(
+        settings.RATE_LIMIT_REDIS_URL or settings.REDIS_URL,
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=settings.RATE_LIMIT_REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.RATE_LIMIT_REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.RATE_LIMIT_REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
+
+
+async def connect_rate_limiter() -> Optional[RedisRateLimiter]:
+    """Connect the Redis limiter, or return None so the in-process limiter is used."""
+    redis_client = create_rate_limit_client()
+    if redis_client is None:
+        return None
+    limiter = RedisRateLimiter(redis_client)
+    try:
+        await redis_client.ping()
+    except Exception:
+        await limiter.close()
+        return None
+    return limiter
+
+
+def _retry_after(previous: int, current: int, elapsed: float, window: float, limit: int) -> int:
+    """Seconds until the sliding estimate drops below limit, assuming no further hits."""
+    if limit <= 0:
+        return max(1, math.ceil(window))
+    if current < limit:
+        # The previous window's share decays within this window.
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        # This window's count has to decay through the next one.
+        wait = (window - elapsed) + window * (1 - limit / current)
+    return max(1, math.ceil(wait))
+
+
+class LocalRateLimiter:
+    """
+    Fixed-capacity sliding-window counters for a single process.
+
+    Each key owns a slot in three parallel arrays: the window number it was
+    last counted in, and its counts for that window and the one before. The
+    estimate weights the previous count by how much of it still overlaps the
+    sliding window. Keys are kept in LRU order; the least recently used key
+    gives up its slot when all max_keys are taken, and keys idle for two
+    windows are swept every sweep_interval seconds.
+    """
+
+    def __init__(self, window_seconds: float, max_keys: int, sweep_interval: float):
+        self.window_seconds = window_seconds
+        self.max_keys = max(1, max_keys)
+        self.sweep_interval = sweep_interval
+        self._slots: OrderedDict[str, int] = OrderedDict()
+        self._free = list(range(self.max_keys - 1, -1, -1))
+        self._window = array("q", [0]) * self.max_keys
+        self._current = array("l", [0]) * self.max_keys
+        self._previous = array("l", [0]) * self.max_keys
+        self._lock = Lock()
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _roll(self, slot: int, window_number: int) -> None:
+        last_window = self._window[slot]
+        if last_window == window_number:
+            return
+        self._previous[slot] = self._current[slot] if last_window == window_number - 1 else 0
+        self._current[slot] = 0
+        self._window[slot] = window_number
+
+    def _allocate(self, key: str, window_number: int) -> int:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            _, slot = self._slots.popitem(last=False)
+            increment_counter("rate_limit.local.evictions")
+        self._slots[key] = slot
+        self._window[slot] = window_number
+        self._current[slot] = 0
+        self._previous[slot] = 0
+        return slot
+
+    def _sweep(self, window_number: int) -> None:
+        swept = 0
+        # LRU order means idle keys are at the front.
+        while self._slots:
+            key, slot = next(iter(self._slots.items()))
+            if self._window[slot] >= window_number - 1:
+                break
+            del self._slots[key]
+            self._free.append(slot)
+            swept += 1
+        if swept:
+            increment_counter("rate_limit.local.swept", swept)
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> tuple[bool, int]:
+        """Count a request under key if it fits; returns (allowed, retry_after_seconds)."""
+        now = time.monotonic() if now is None else now
+        window = self.window_seconds
+        window_number = int(now // window)
+        elapsed = now - window_number * window
+
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(window_number)
+                self._next_sweep = now + self.sweep_interval
+
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key, window_number)
+            else:
+                self._slots.move_to_end(key)
+                self._roll(slot, window_number)
+
+            current = self._current[slot]
+            previous = self._previous[slot]
+            allowed = previous * (1 - elapsed / window) + current < limit
+            if allowed:
+                self._current[slot] = current + 1
+            key_count = len(self._slots)
+
+        set_gauge("rate_limit.local.keys", key_count)
+        if allowed:
+            return True, 0
+        increment_counter("rate_limit.local.rejected")
+        return False, _retry_after(previous, current, elapsed, window, limit)
@@ -0,0 +1,66 @@
+"""
+Read-your-writes stickiness for replica routing.
+
+Replicas lag the primary, so after a user writes, their reads are served from
+the primary for READ_YOUR_WRITES_SECONDS. Writes are remembered in-process and,
+when Redis is reachable, in Redis so that every worker sees them.
+"""
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Optional
+
+from app.config import settings
+
+_lock = Lock()
+_recent_writes: dict[int, float] = {}
+_redis = None
+
+
+def configure_read_routing(redis_client) -> None:
+    """Share recent writes across workers through Redis when a client is available."""
+    global _redis
+    _redis = redis_client
+
+
+def _redis_key(user_id: int) -> str:
+    return f"{settings.REDIS_READ_ROUTING_PREFIX}:wrote:{user_id}"
+
+
+def _prune(now: float) -> None:
+    expired = [user_id for user_id, until in _recent_writes.items() if until <= now]
+    for user_id in expired:
+        del _recent_writes[user_id]
+
+
+async def note_write(user_id: int) -> None:
+    """Pin user_id's reads to the primary for the stickiness window."""
+    window = settings.READ_YOUR_WRITES_SECONDS
+    if window <= 0:
+        return
+    now = time.monotonic()
+    with _lock:
+        if len(_recent_writes) > 10000:
+            _prune(now)
+        _recent_writes[user_id] = now + window
+    if _redis is not None:
+        try:
+            await _redis.set(_redis_key(user_id), "1", px=max(1, int(window * 1000)))
+        except Exception:
+            return None
+
+
+async def recently_wrote(user_id: Optional[int]) -> bool:
+    if user_id is None or settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    with _lock:
+        until = _recent_writes.get(user_id)
+    if until is not None and until > time.monotonic():
+        return True
+    if _redis is not None:
+        try:
+            return bool(await _redis.exists(_redis_key(user_id)))
+        except Exception:
+            return False
+    return False
@@ -0,0 +1,211 @@
+"""
+Per-user pub/sub channels for real-time messaging events.
+
+Each connected WebSocket subscribes to its user's channel and receives JSON
+events (new messages, read cursors, typing). Single-node deployments deliver
+through in-process asyncio queues; when Redis is reachable, events are
+published on Redis channels and one listener per process fans them out to the
+local subscribers, so every worker sees every event. A channel subscription
+that Redis rejects is retried by the listener until it succeeds.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Iterable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between retries of channel subscriptions that Redis rejected.
+SUBSCRIBE_RETRY_SECONDS = 1.0
+
+
+class Subscription:
+    """A bounded event queue for one WebSocket connection."""
+
+    def __init__(self, broker: "InMemoryBroker", user_id: int, max_size: int):
+        self.user_id = user_id
+        self._broker = broker
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_size)
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        # A slow client loses its oldest pending events rather than blocking publishers.
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(event)
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
+
+    async def close(self) -> None:
+        await self._broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """Delivers events to subscriptions held by this process."""
+
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = {}
+
+    async def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self, user_id, self._queue_size)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if not subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return bool(self._subscriptions.get(user_id))
+
+    def deliver(self, user_id: int, event: dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions.get(user_id, ())):
+            subscription.deliver(event)
+
+    async def publish(self, user_ids: Iterable[int], event: dict[str, Any]) -> None:
+        for user_id in set(user_ids):
+            self.deliver(user_id, event)
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisBroker(InMemoryBroker):
+    """Publishes through Redis channels and relays them to local subscriptions."""
+
+    def __init__(self, redis_client, prefix: str, queue_size: int):
+        super().__init__(queue_size)
+        self._redis = redis_client
+        self._prefix = prefix
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Users with local subscribers whose Redis channel subscription failed.
+        self._unsubscribed: set[int] = set()
+
+    def _channel(self, user_id: int) -> str:
+        return f"{self._prefix}:user:{user_id}"
+
+    async def _subscribe_channel(self, user_id: int) -> None:
+        try:
+            await self._pubsub.subscribe(self._channel(user_id))
+        except Exception:
+            logger.warning("Redis subscribe failed for realtime user %s; retrying", user_id)
+            self._unsubscribed.add(user_id)
+        else:
+            self._unsubscribed.discard(user_id)
+
+    async def subscribe(self, user_id: int) -> Subscription:
+        async with self._lock:
+            first = not self.has_subscribers(user_id)
+            subscription = await super().subscribe(user_id)
+            if first:
+                await self._subscribe_channel(user_id)
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+            return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        async with self._lock:
+            await super().unsubscribe(subscription)
+            if not self.has_subscribers(subscription.user_id):
+                self._unsubscribed.discard(subscription.user_id)
+                try:
+                    await self._pubsub.unsubscribe(self._channel(subscription.user_id))
+                except Exception:
+                    return None
+
+    async def _retry_subscriptions(self) -> None:
+        async with self._lock:
+            for user_id in list(self._unsubscribed):
+                await self._subscribe_channel(user_id)
+
+    async def _listen(self) -> None:
+        prefix = f"{self._prefix}:user:"
+        loop = asyncio.get_running_loop()
+        next_retry = 0.0
+        while True:
+            if self._unsubscribed and loop.time() >= next_retry:
+                await self._retry_subscriptions()
+                next_retry = loop.time() + SUBSCRIBE_RETRY_SECONDS
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(1.0)
+                continue
+            if not message or message.get("type") != "message":
+                continue
+            channel = str(message.get("channel", ""))
+            if not channel.startswith(prefix):
+                continue
+            try:
+                user_id = int(channel[len(prefix):])
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            self.deliver(user_id, event)
+
+    async def publish(self, user_ids: Iterable[int], event: dict[str, Any]) -> None:
+        recipients = set(user_ids)
+        payload = json.dumps(event, separators=(",", ":"), default=str)
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            for user_id in recipients:
+                pipeline.publish(self._channel(user_id), payload)
+            await pipeline.execute()
+        except Exception:
+            # Redis is unavailable: at least reach the subscribers on this node.
+            await super().publish(recipients, event)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        try:
+            await self._pubsub.aclose()
+        except Exception:
+            return None
+
+
+_broker: InMemoryBroker = InMemoryBroker(queue_size=settings.REALTIME_QUEUE_SIZE)
+
+
+def configure_realtime_broker(redis_client) -> None:
+    """Use Redis pub/sub when a client is available, else keep the in-process broker."""
+    global _broker
+    if redis_client is not None:
+        _broker = RedisBroker(
+            redis_client,
+            prefix=settings.REDIS_REALTIME_PREFIX,
+            queue_size=settings.REALTIME_QUEUE_SIZE,
+        )
+
+
+def get_broker() -> InMemoryBroker:
+    return _broker
+
+
+async def publish_to_users(user_ids: Iterable[int], event: dict[str, Any]) -> None:
+    await _broker.publish(user_ids, event)
+
+
+async def close_realtime_broker() -> None:
+    await _broker.close()
@@ -0,0 +1,570 @@
+"""
+Candidate-to-job recommendations from precomputed match scores.
+
+A profile's fit for a job adds up three parts:
+
+- skills: the share of the job's skill weight (IDF over active jobs) that the
+  profile is linked to, from the skill taxonomy in app.utils.skills;
+- text: cosine similarity of TF-IDF vectors of the profile's headline,
+  experience and skills against the job's title, description and skills;
+- location: full marks for remote jobs or the same city, half when either
+  side gives no location.
+
+Active jobs are kept as one sparse job-by-feature matrix, rebuilt when
+job_postings changes, so scoring a profile against every job is a single
+sparse matrix-vector product (NumPy when installed, column-wise in Python
+otherwise). Each user's best RECOMMENDATIONS_TOP_K jobs are stored in
+job_recommendations. A profile change recomputes that user's list; a job
+change only rescores that job for users who share one of its skills or
+already hold it.
+
+Every writer locks the affected profile rows (SELECT ... FOR UPDATE) before
+replacing their stored rows, so refreshes of the same user run one after
+the other instead of colliding on the (user_id, job_id) key.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from collections import Counter
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Iterable, Optional, Union
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.networking import JobApplication, JobPosting, WorkMode
+from app.models.recommendation import JobRecommendation
+from app.models.skills import JobSkill, ProfileSkill
+from app.models.user import Profile
+from app.utils.search_index import tokenize
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SKILL_WEIGHT = 0.55
+TEXT_WEIGHT = 0.30
+LOCATION_WEIGHT = 0.15
+PROFILE_BATCH_SIZE = 500
+
+# Skill ids (int) and text tokens (str) share one feature space.
+Feature = Union[int, str]
+Vector = dict[Feature, float]
+
+
+def _token_counts(*values: Optional[str]) -> Counter:
+    counts: Counter = Counter()
+    for value in values:
+        counts.update(token for token in tokenize(value) if len(token) > 1)
+    return counts
+
+
+def _location_key(location: Optional[str]) -> Optional[str]:
+    """The city part of a free-text location, lower-cased."""
+    if not location:
+        return None
+    return location.split(",")[0].strip().lower() or None
+
+
+def _location_score(job_remote: bool, job_key: Optional[str], profile_key: Optional[str]) -> float:
+    if job_remote:
+        return 1.0
+    if job_key is None or profile_key is None:
+        return 0.5
+    return 1.0 if job_key == profile_key else 0.0
+
+
+def _tfidf(counts: Counter, idf: dict[Feature, float], default_idf: Optional[float]) -> Vector:
+    """L2-normalized TF-IDF weights; tokens without an idf are dropped when default_idf is None."""
+    weights: Vector = {}
+    for token, count in counts.items():
+        token_idf = idf.get(token, default_idf)
+        if token_idf is None:
+            continue
+        weights[token] = (1 + math.log(count)) * token_idf
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    if not norm:
+        return {}
+    return {token: weight / norm for token, weight in weights.items()}
+
+
+def _job_vector(idf: dict[Feature, float], default_idf: float, skill_ids: Iterable[int], counts: Counter) -> Vector:
+    """Job features, pre-multiplied by the part weights so a dot product gives the content score."""
+    vector: Vector = {}
+    skill_idf = {skill_id: idf.get(skill_id, default_idf) for skill_id in skill_ids}
+    total = sum(skill_idf.values())
+    for skill_id, weight in skill_idf.items():
+        vector[skill_id] = SKILL_WEIGHT * weight / total
+    for token, weight in _tfidf(counts, idf, default_idf).items():
+        vector[token] = TEXT_WEIGHT * weight
+    return vector
+
+
+def _profile_vector(idf: dict[Feature, float], skill_ids: Iterable[int], counts: Counter) -> Vector:
+    vector: Vector = {skill_id: 1.0 for skill_id in skill_ids}
+    vector.update(_tfidf(counts, idf, None))
+    return vector
+
+
+def _dot(job_vector: Vector, profile_vector: Vector) -> float:
+    return sum(weight * profile_vector.get(feature, 0.0) for feature, weight in job_vector.items())
+
+
+class JobMatrix:
+    """Active jobs as sparse rows over skill and token features."""
+
+    def __init__(
+        self,
+        job_ids: list[int],
+        vectors: list[Vector],
+        remote: list[bool],
+        location_keys: list[Optional[str]],
+        idf: dict[Feature, float],
+    ):
+        self.job_ids = job_ids
+        self.idf = idf
+        self.default_idf = math.log(1 + max(1, len(job_ids)))
+        self._rows = {job_id: row for row, job_id in enumerate(job_ids)}
+        self._vectors = vectors
+        self._remote = remote
+        self._location_keys = location_keys
+
+        self._columns: dict[Feature, int] = {}
+        row_of: list[int] = []
+        indices: list[int] = []
+        data: list[float] = []
+        for row, vector in enumerate(vectors):
+            for feature, weight in vector.items():
+                row_of.append(row)
+                indices.append(self._columns.setdefault(feature, len(self._columns)))
+                data.append(weight)
+
+        self._vectorized = np is not None
+        if self._vectorized:
+            # Coordinate arrays; the product is a bincount over the row of each stored value.
+            self._row_of = np.asarray(row_of, dtype=np.int64)
+            self._indices = np.asarray(indices, dtype=np.int64)
+            self._data = np.asarray(data, dtype=np.float64)
+            self._job_id_array = np.asarray(job_ids, dtype=np.int64)
+            self._remote_array = np.asarray(remote, dtype=bool)
+            self._location_codes: dict[str, int] = {}
+            self._location_array = np.asarray(
+                [self._location_codes.setdefault(key, len(self._location_codes)) if key else -1 for key in location_keys],
+                dtype=np.int64,
+            )
+        else:
+            # Column postings, so only the profile's own features are visited.
+            self._postings: list[list[tuple[int, float]]] = [[] for _ in self._columns]
+            for row, column, weight in zip(row_of, indices, data):
+                self._postings[column].append((row, weight))
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def vector(self, job_id: int) -> Optional[Vector]:
+        row = self._rows.get(job_id)
+        return None if row is None else self._vectors[row]
+
+    def score(self, job_id: int, profile_vector: Vector, profile_location: Optional[str]) -> float:
+        """Match score of one active job; 0 when nothing but the location matches."""
+        row = self._rows.get(job_id)
+        if row is None:
+            return 0.0
+        content = _dot(self._vectors[row], profile_vector)
+        if content <= 0:
+            return 0.0
+        location = _location_score(self._remote[row], self._location_keys[row], profile_location)
+        return content + LOCATION_WEIGHT * location
+
+    def top_jobs(self, profile_vector: Vector, profile_location: Optional[str], k: int) -> list[tuple[int, float]]:
+        """The k best (job_id, score) pairs, best first; jobs matching only on location are left out."""
+        if not self.job_ids or k <= 0:
+            return []
+        if self._vectorized:
+            ranked = self._top_rows_numpy(profile_vector, profile_location, k)
+        else:
+            ranked = self._top_rows_python(profile_vector, profile_location, k)
+        return [(self.job_ids[row], score) for row, score in ranked]
+
+    def _top_rows_numpy(self, profile_vector: Vector, profile_location: Optional[str], k: int) -> list[tuple[int, float]]:
+        dense = np.zeros(len(self._columns))
+        for feature, value in profile_vector.items():
+            column = self._columns.get(feature)
+            if column is not None:
+                dense[column] = value
+        content = np.bincount(self._row_of, weights=self._data * dense[self._indices], minlength=len(self.job_ids))
+
+        if profile_location is None:
+            location = np.where(self._remote_array, 1.0, 0.5)
+        else:
+            same_city = self._location_array == self._location_codes.get(profile_location, -2)
+            location = np.where(
+                self._remote_array | same_city,
+                1.0,
+                np.where(self._location_array == -1, 0.5, 0.0),
+            )
+        total = content + LOCATION_WEIGHT * location
+
+        matched = np.flatnonzero(content > 0)
+        if len(matched) > k:
+            # Match heapq.nlargest over (score, job_id): among jobs tied at the
+            # k-th score, the highest job ids are kept.
+            cutoff = -np.partition(-total[matched], k - 1)[k - 1]
+            above = matched[total[matched] > cutoff]
+            tied = matched[total[matched] == cutoff]
+            tied = tied[np.argsort(-self._job_id_array[tied], kind="stable")[: k - len(above)]]
+            matched = np.concatenate([above, tied])
+        ranked = [(int(row), float(total[row])) for row in matched]
+        ranked.sort(key=lambda item: (-item[1], -self.job_ids[item[0]]))
+        return ranked
+
+    def _top_rows_python(self, profile_vector: Vector, profile_location: Optional[str], k: int) -> list[tuple[int, float]]:
+        content: dict[int, float] = {}
+        for feature, value in profile_vector.items():
+            column = self._columns.get(feature)
+            if column is None:
+                continue
+            for row, weight in self._postings[column]:
+                content[row] = content.get(row, 0.0) + weight * value
+
+        scored = (
+            (
+                score + LOCATION_WEIGHT * _location_score(self._remote[row], self._location_keys[row], profile_location),
+                self.job_ids[row],
+                row,
+            )
+            for row, score in content.items()
+            if score > 0
+        )
+        return [(row, total) for total, _, row in heapq.nlargest(k, scored)]
+
+
+def _build_job_matrix(db: Session) -> JobMatrix:
+    rows = (
+        db.query(
+            JobPosting.id,
+            JobPosting.title,
+            JobPosting.description,
+            JobPosting.required_skills,
+            JobPosting.location,
+            JobPosting.work_mode,
+        )
+        .filter(JobPosting.is_active == True)
+        .order_by(JobPosting.id.asc())
+        .all()
+    )
+    skills_by_job: dict[int, list[int]] = {}
+    skill_links = (
+        db.query(JobSkill.job_id, JobSkill.skill_id)
+        .join(JobPosting, JobPosting.id == JobSkill.job_id)
+        .filter(JobPosting.is_active == True)
+    )
+    for job_id, skill_id in skill_links.yield_per(5000):
+        skills_by_job.setdefault(job_id, []).append(skill_id)
+
+    document_frequency: Counter = Counter()
+    token_counts: list[Counter] = []
+    for job_id, title, description, required_skills, _, _ in rows:
+        counts = _token_counts(title, description, required_skills)
+        token_counts.append(counts)
+        document_frequency.update(counts.keys())
+        document_frequency.update(skills_by_job.get(job_id, ()))
+
+    job_count = len(rows)
+    idf: dict[Feature, float] = {
+        feature: math.log(1 + job_count / frequency) for feature, frequency in document_frequency.items()
+    }
+    default_idf = math.log(1 + max(1, job_count))
+    vectors = [
+        _job_vector(idf, default_idf, skills_by_job.get(row[0], ()), counts)
+        for row, counts in zip(rows, token_counts)
+    ]
+    return JobMatrix(
+        job_ids=[row[0] for row in rows],
+        vectors=vectors,
+        remote=[row[5] == WorkMode.REMOTE for row in rows],
+        location_keys=[_location_key(row[4]) for row in rows],
+        idf=idf,
+    )
+
+
+_matrix_lock = Lock()
+_cached_matrix: Optional[tuple[tuple, JobMatrix]] = None
+
+
+def _matrix_signature(db: Session) -> tuple:
+    # Skill links only change together with required_skills, which bumps updated_at.
+    row = db.query(func.count(JobPosting.id), func.max(JobPosting.id), func.max(JobPosting.updated_at)).one()
+    return tuple(row)
+
+
+def job_matrix(db: Session) -> JobMatrix:
+    """The active-job matrix, rebuilt when job_postings has changed since the last build."""
+    global _cached_matrix
+    signature = _matrix_signature(db)
+    with _matrix_lock:
+        if _cached_matrix is not None and _cached_matrix[0] == signature:
+            return _cached_matrix[1]
+        matrix = _build_job_matrix(db)
+        _cached_matrix = (signature, matrix)
+        return matrix
+
+
+def _profile_vectors(
+    db: Session,
+    matrix: JobMatrix,
+    profiles: list[Profile],
+) -> dict[int, tuple[Vector, Optional[str]]]:
+    """(feature vector, location key) per user id."""
+    skills_by_profile: dict[int, list[int]] = {}
+    profile_ids = [profile.id for profile in profiles]
+    if profile_ids:
+        links = db.query(ProfileSkill.profile_id, ProfileSkill.skill_id).filter(ProfileSkill.profile_id.in_(profile_ids))
+        for profile_id, skill_id in links:
+            skills_by_profile.setdefault(profile_id, []).append(skill_id)
+    return {
+        int(profile.user_id): (
+            _profile_vector(
+                matrix.idf,
+                skills_by_profile.get(profile.id, ()),
+                _token_counts(profile.headline, profile.experience, profile.skills),
+            ),
+            _location_key(profile.location),
+        )
+        for profile in profiles
+    }
+
+
+def refresh_profile_recommendations(db: Session, user_id: int) -> list[tuple[int, float]]:
+    """Recompute and store a user's best jobs; the caller commits."""
+    matrix = job_matrix(db)
+    profile = db.query(Profile).filter(Profile.user_id == user_id).with_for_update().first()
+    ranked: list[tuple[int, float]] = []
+    if profile is not None:
+        vector, location = _profile_vectors(db, matrix, [profile])[user_id]
+        ranked = matrix.top_jobs(vector, location, settings.RECOMMENDATIONS_TOP_K)
+
+    db.query(JobRecommendation).filter(JobRecommendation.user_id == user_id).delete(synchronize_session=False)
+    computed_at = datetime.utcnow()
+    db.add_all(
+        JobRecommendation(user_id=user_id, job_id=job_id, score=score, computed_at=computed_at)
+        for job_id, score in ranked
+    )
+    return ranked
+
+
+def refresh_job_recommendations(db: Session, job_id: int) -> int:
+    """
+    Rescore one job for the users it can affect and update their stored
+    lists; returns the number of users whose list changed. The caller commits.
+
+    Users who share none of the job's skills only pick it up on their next
+    profile refresh; users without a computed list are left for their first
+    read.
+    """
+    matrix = job_matrix(db)
+    job_vector = matrix.vector(job_id)
+    if job_vector is None:
+        # Closed or deleted.
+        return db.query(JobRecommendation).filter(JobRecommendation.job_id == job_id).delete(synchronize_session=False)
+
+    holders = select(JobRecommendation.user_id).where(JobRecommendation.job_id == job_id)
+    candidates = Profile.user_id.in_(holders)
+    skill_ids = [feature for feature in job_vector if isinstance(feature, int)]
+    if skill_ids:
+        sharing = select(ProfileSkill.profile_id).where(ProfileSkill.skill_id.in_(skill_ids))
+        candidates = or_(candidates, Profile.id.in_(sharing))
+
+    top_k = settings.RECOMMENDATIONS_TOP_K
+    computed_at = datetime.utcnow()
+    changed = 0
+    last_id = 0
+    while True:
+        profiles = (
+            db.query(Profile)
+            .filter(candidates, Profile.id > last_id)
+            .order_by(Profile.id.asc())
+            .limit(PROFILE_BATCH_SIZE)
+            .with_for_update()
+            .all()
+        )
+        if not profiles:
+            break
+        last_id = int(profiles[-1].id)
+
+        vectors = _profile_vectors(db, matrix, profiles)
+        stored: dict[int, list[JobRecommendation]] = {}
+        for recommendation in db.query(JobRecommendation).filter(JobRecommendation.user_id.in_(list(vectors))):
+            stored.setdefault(int(recommendation.user_id), []).append(recommendation)
+
+        for user_id, (vector, location) in vectors.items():
+            score = matrix.score(job_id, vector, location)
+            current = stored.get(user_id, [])
+            existing = next((item for item in current if item.job_id == job_id), None)
+            if existing is not None:
+                if score <= 0:
+                    db.delete(existing)
+                else:
+                    existing.score = score
+                    existing.computed_at = computed_at
+                changed += 1
+                continue
+            if score <= 0 or not current:
+                # Without stored rows the list was never computed; a partial
+                # one would pass for it, so the first read computes it in full.
+                continue
+            if len(current) >= top_k:
+                lowest = min(current, key=lambda item: (item.score, -item.job_id))
+                if score <= lowest.score:
+                    continue
+                db.delete(lowest)
+            db.add(JobRecommendation(user_id=user_id, job_id=job_id, score=score, computed_at=computed_at))
+            changed += 1
+        db.flush()
+    return changed
+
+
+def _run_refresh(refresh: Callable[[Session, int], object], target_id: int) -> None:
+    db = SessionLocal()
+    try:
+        refresh(db, target_id)
+        db.commit()
+    except IntegrityError:
+        # A concurrent refresh stored the same rows first; its result stands.
+        db.rollback()
+        logger.info("Recommendation refresh superseded (%s %s)", refresh.__name__, target_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Recommendation refresh failed (%s %s)", refresh.__name__, target_id)
+    finally:
+        db.close()
+
+
+def refresh_for_profile(user_id: int) -> None:
+    """Background task: refresh a user's recommendations in a session of its own."""
+    _run_refresh(refresh_profile_recommendations, user_id)
+
+
+def refresh_for_job(job_id: int) -> None:
+    """Background task: push a created or changed job into the affected users' recommendations."""
+    _run_refresh(refresh_job_recommendations, job_id)
+
+
+def refresh_for_jobs(job_ids: list[int]) -> None:
+    """Background task for bulk imports; the job matrix is built once for the whole batch."""
+    for job_id in job_ids:
+        _run_refresh(refresh_job_recommendations, job_id)
+
+
+def recommended_jobs(db: Session, user_id: int, limit: int) -> list[tuple[JobPosting, float]]:
+    """
+    The user's stored best jobs that are still open and not yet applied to.
+    Lists are computed on first use for users without any stored rows.
+    """
+    has_rows = db.query(JobRecommendation.job_id).filter(JobRecommendation.user_id == user_id).first() is not None
+    if not has_rows:
+        try:
+            if not refresh_profile_recommendations(db, user_id):
+                db.rollback()
+                return []
+            db.commit()
+        except IntegrityError:
+            # A concurrent first request stored the list; read theirs.
+            db.rollback()
+
+    now = datetime.utcnow()
+    applied = select(JobApplication.job_id).where(JobApplication.candidate_id == user_id)
+    rows = (
+        db.query(JobPosting, JobRecommendation.score)
+        .join(JobRecommendation, JobRecommendation.job_id == JobPosting.id)
+        .filter(
+            JobRecommendation.user_id == user_id,
+            JobPosting.is_active == True,
+            or_(JobPosting.application_deadline.is_(None), JobPosting.application_deadline > now),
+            ~JobPosting.id.in_(applied),
+        )
+        .order_by(JobRecommendation.score.desc(), JobPosting.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [(job, float(score)) for job, score in rows]
+
+
+def applicant_match_scores(db: Session, job: JobPosting, user_ids: Iterable[int]) -> dict[int, float]:
+    """Match score of each applicant for job, computed fresh; 0 for users without a profile."""
+    user_ids = list(user_ids)
+    scores = {user_id: 0.0 for user_id in user_ids}
+    if not user_ids:
+        return scores
+
+    matrix = job_matrix(db)
+    job_vector = matrix.vector(int(job.id))
+    if job_vector is None:
+        # Closed jobs are not in the matrix; vectorize against its idf.
+        skill_ids = [skill_id for (skill_id,) in db.query(JobSkill.skill_id).filter(JobSkill.job_id == job.id)]
+        job_vector = _job_vector(
+            matrix.idf,
+            matrix.default_idf,
+            skill_ids,
+            _token_counts(job.title, job.description, job.required_skills),
+        )
+
+    job_remote = job.work_mode == WorkMode.REMOTE
+    job_location = _location_key(job.location)
+    profiles = db.query(Profile).filter(Profile.user_id.in_(user_ids)).all()
+    for user_id, (vector, location) in _profile_vectors(db, matrix, profiles).items():
+        content = _dot(job_vector, vector)
+        if content > 0:
+            scores[user_id] = content + LOCATION_WEIGHT * _location_score(job_remote, job_location, location)
+    return scores
+
+
+def refresh_all_recommendations(
+    session_factory: Callable[[], Session],
+    batch_size: int = PROFILE_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Recompute every user's stored recommendations; returns the number of profiles."""
+    refreshed = 0
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            matrix = job_matrix(db)
+            profiles = (
+                db.query(Profile)
+                .filter(Profile.id > last_id)
+                .order_by(Profile.id.asc())
+                .limit(batch_size)
+                .with_for_update()
+                .all()
+            )
+            if not profiles:
+                break
+            user_ids = [int(profile.user_id) for profile in profiles]
+            db.query(JobRecommendation).filter(JobRecommendation.user_id.in_(user_ids)).delete(
+                synchronize_session=False
+            )
+            computed_at = datetime.utcnow()
+            for user_id, (vector, location) in _profile_vectors(db, matrix, profiles).items():
+                db.add_all(
+                    JobRecommendation(user_id=user_id, job_id=job_id, score=score, computed_at=computed_at)
+                    for job_id, score in matrix.top_jobs(vector, location, settings.RECOMMENDATIONS_TOP_K)
+                )
+            db.commit()
+            last_id = int(profiles[-1].id)
+            refreshed += len(profiles)
+        finally:
+            db.close()
+        if progress is not None:
+            progress(refreshed)
+    return refreshed
@@ -0,0 +1,73 @@
+"""
+Helpers for resolving connection status between a viewer and other users.
+"""
+from typing import Iterable
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.networking import ConnectionRequest, ConnectionRequestStatus
+
+
+def resolve_relationship_statuses(db: Session, viewer_id: int, other_user_ids: Iterable[int]) -> dict[int, str]:
+    """
+    Resolve the connection status of the viewer with many users in one query.
+
+    Returns a map of user_id to one of 'connected', 'pending_sent',
+    'pending_received' or 'none'. The most recently updated request between
+    two users decides the status.
+    """
+    candidate_ids = {int(user_id) for user_id in other_user_ids if int(user_id) != viewer_id}
+    statuses = {user_id: "none" for user_id in candidate_ids}
+    if not candidate_ids:
+        return statuses
+
+    rows = (
+        db.query(
+            ConnectionRequest.requester_id,
+            ConnectionRequest.recipient_id,
+            ConnectionRequest.status,
+        )
+        .filter(
+            or_(
+                and_(ConnectionRequest.requester_id == viewer_id, ConnectionRequest.recipient_id.in_(candidate_ids)),
+                and_(ConnectionRequest.recipient_id == viewer_id, ConnectionRequest.requester_id.in_(candidate_ids)),
+            )
+        )
+        .order_by(ConnectionRequest.updated_at.desc(), ConnectionRequest.id.desc())
+        .all()
+    )
+
+    resolved: set[int] = set()
+    for requester_id, recipient_id, request_status in rows:
+        other_id = recipient_id if requester_id == viewer_id else requester_id
+        if other_id in resolved:
+            continue
+        resolved.add(other_id)
+
+        if request_status == ConnectionRequestStatus.ACCEPTED:
+            statuses[other_id] = "connected"
+        elif request_status == ConnectionRequestStatus.PENDING:
+            statuses[other_id] = "pending_sent" if requester_id == viewer_id else "pending_received"
+
+    return statuses
+
+
+
+def get_connected_user_ids(db: Session, user_id: int) -> set[int]:
+    """Return the user's accepted connections, including the user themselves."""
+    rows = (
+        db.query(ConnectionRequest.requester_id, ConnectionRequest.recipient_id)
+        .filter(
+            ConnectionRequest.status == ConnectionRequestStatus.ACCEPTED,
+            or_(
+                ConnectionRequest.requester_id == user_id,
+                ConnectionRequest.recipient_id == user_id,
+            ),
+        )
+        .all()
+    )
+    user_ids = {user_id}
+    for requester_id, recipient_id in rows:
+        user_ids.add(int(recipient_id) if int(requester_id) == user_id else int(requester_id))
+    return user_ids
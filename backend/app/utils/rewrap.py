@@ -0,0 +1,192 @@
+"""
+Background re-encryption of stored resume files under the primary key.
+
+Files in UPLOAD_DIR are rewrapped in parallel on a thread pool (AES and
+Fernet release the GIL). Finished files are appended to a journal named after
+the primary key, so an interrupted run resumes where it stopped. Files that
+already use the primary key are detected and skipped as well. A lock file in
+UPLOAD_DIR admits one run at a time among processes on the same host; file
+locks are not reliable over network filesystems, so when several hosts share
+UPLOAD_DIR start rewraps from only one of them.
+"""
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock, Thread
+from typing import Any, Callable, Iterator, Optional
+
+from app.config import settings
+from app.utils.encryption import primary_key_id, rewrap_file
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_JOURNAL_PREFIX = ".rewrap-"
+_LOCK_NAME = ".rewrap.lock"
+
+
+class RewrapInProgressError(RuntimeError):
+    pass
+
+
+@contextmanager
+def _exclusive_run(upload_dir: str) -> Iterator[None]:
+    """Hold the upload directory's rewrap lock; raises RewrapInProgressError if another run has it."""
+    fd = os.open(os.path.join(upload_dir, _LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError as exc:
+            raise RewrapInProgressError("Another resume rewrap is already running") from exc
+        # The lock is released when the descriptor is closed, also if the process dies.
+        yield
+    finally:
+        os.close(fd)
+
+
+def _journal_path(upload_dir: str, key_id: str) -> str:
+    return os.path.join(upload_dir, f"{_JOURNAL_PREFIX}{key_id}.done")
+
+
+def _pending_files(upload_dir: str, done: set[str]) -> list[str]:
+    return [
+        name
+        for name in sorted(os.listdir(upload_dir))
+        if name.endswith(".enc") and name not in done and os.path.isfile(os.path.join(upload_dir, name))
+    ]
+
+
+def rewrap_upload_dir(
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict[str, int]:
+    """
+    Rewrap every stored file not yet under the primary key; returns counts.
+
+    Raises RewrapInProgressError while another run holds the lock.
+    """
+    upload_dir = settings.UPLOAD_DIR
+    with _exclusive_run(upload_dir):
+        return _rewrap_locked(upload_dir, workers, progress)
+
+
+def _rewrap_locked(
+    upload_dir: str,
+    workers: Optional[int],
+    progress: Optional[Callable[[int, int], None]],
+) -> dict[str, int]:
+    key_id = primary_key_id()
+    journal_path = _journal_path(upload_dir, key_id)
+
+    # Leftovers from an interrupted run: partial files and journals for older keys.
+    for stale in glob.glob(os.path.join(upload_dir, "*.rewrap")):
+        os.remove(stale)
+    for journal in glob.glob(os.path.join(upload_dir, f"{_JOURNAL_PREFIX}*.done")):
+        if journal != journal_path:
+            os.remove(journal)
+
+    done: set[str] = set()
+    if os.path.exists(journal_path):
+        with open(journal_path, "r", encoding="utf-8") as journal_file:
+            done = {line.strip() for line in journal_file if line.strip()}
+
+    pending = _pending_files(upload_dir, done)
+    counts = {"rewrapped": 0, "already_current": 0, "failed": 0, "total": len(pending)}
+    journal_lock = Lock()
+
+    with open(journal_path, "a", encoding="utf-8") as journal_file, ThreadPoolExecutor(
+        max_workers=workers or settings.ENCRYPTION_REWRAP_WORKERS, thread_name_prefix="rewrap"
+    ) as pool:
+        futures = {pool.submit(rewrap_file, os.path.join(upload_dir, name)): name for name in pending}
+        for processed, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                rewritten = future.result()
+            except Exception:
+                logger.exception("Failed to rewrap %s", name)
+                counts["failed"] += 1
+            else:
+                counts["rewrapped" if rewritten else "already_current"] += 1
+                with journal_lock:
+                    journal_file.write(name + "\n")
+                    journal_file.flush()
+            if progress is not None:
+                progress(processed, len(pending))
+    return counts
+
+
+class RewrapJob:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "running"
+        self.processed = 0
+        self.total = 0
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[dict[str, int]] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "processed_files": self.processed,
+            "total_files": self.total,
+            "progress": round(self.processed / self.total, 4) if self.total else float(self.status != "running"),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_jobs_lock = Lock()
+_rewrap_jobs: dict[str, RewrapJob] = {}
+
+
+def _run_rewrap(job: RewrapJob) -> None:
+    def report(processed: int, total: int) -> None:
+        job.processed = processed
+        job.total = total
+
+    try:
+        job.result = rewrap_upload_dir(progress=report)
+        job.total = job.result["total"]
+        job.status = "completed"
+    except Exception as exc:
+        logger.exception("Resume file rewrap failed")
+        job.error = str(exc)
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow()
+
+
+def start_rewrap_job() -> RewrapJob:
+    """Start a background rewrap of UPLOAD_DIR, or return the one already running."""
+    with _jobs_lock:
+        for job in _rewrap_jobs.values():
+            if job.status == "running":
+                return job
+
+        job = RewrapJob(uuid.uuid4().hex)
+        _rewrap_jobs[job.job_id] = job
+        Thread(target=_run_rewrap, args=(job,), name="resume-rewrap", daemon=True).start()
+        return job
+
+
+def get_rewrap_job(job_id: str) -> Optional[RewrapJob]:
+    return _rewrap_jobs.get(job_id)
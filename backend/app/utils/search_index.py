@@ -0,0 +1,348 @@
+"""
+Full-text search helpers for people, companies, and job postings.
+
+PostgreSQL uses generated ``tsvector`` columns with GIN indexes plus ``pg_trgm``
+indexes for partial-name matching. Other dialects (SQLite in local runs) fall
+back to an in-process inverted index. It is rebuilt when its version in
+search_index_versions changes; a flush bumps the version only when it
+inserts, deletes or edits a column the index is built from, so logins and
+other unrelated updates leave the indexes alone.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import re
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import event, func, insert, inspect, literal_column, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.networking import Company, JobPosting
+from app.models.search import SearchIndexVersion
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_TS_CONFIG = "simple"
+
+# Each entry: (generated tsvector expression, GIN index name, trigram index definitions)
+_POSTGRES_SEARCH_COLUMNS: dict[str, tuple[str, str, list[tuple[str, str]]]] = {
+    "users": (
+        "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+        "setweight(to_tsvector('simple', regexp_replace(coalesce(email, ''), '[@._+-]', ' ', 'g')), 'B')",
+        "ix_users_search_vector",
+        [("ix_users_full_name_trgm", "full_name"), ("ix_users_email_trgm", "email")],
+    ),
+    "companies": (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+        "ix_companies_search_vector",
+        [("ix_companies_name_trgm", "name")],
+    ),
+    "job_postings": (
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(required_skills, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(location, '')), 'C') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'D')",
+        "ix_job_postings_search_vector",
+        [("ix_job_postings_title_trgm", "title")],
+    ),
+}
+
+
+def tokenize(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return _TOKEN_RE.findall(value.lower())
+
+
+def _is_postgres(db: Session) -> bool:
+    bind = db.get_bind()
+    return bind.dialect.name == "postgresql"
+
+
+def _prefix_tsquery(term: str) -> Optional[str]:
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def ensure_search_indexes(connection) -> None:
+    """Create tsvector columns, GIN indexes, and trigram indexes (PostgreSQL only)."""
+    if connection.dialect.name != "postgresql":
+        return
+
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table_name, (vector_expression, vector_index, trigram_indexes) in _POSTGRES_SEARCH_COLUMNS.items():
+        connection.execute(text(
+            f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector_expression}) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {vector_index} ON {table_name} USING GIN (search_vector)"
+        ))
+        for index_name, column_name in trigram_indexes:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING GIN ({column_name} gin_trgm_ops)"
+            ))
+
+
+class InvertedIndex:
+    """Small weighted inverted index with prefix matching and TF-IDF style ranking."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[int, float]] = {}
+        self._sorted_tokens: list[str] = []
+        self._doc_count = 0
+
+    def add(self, doc_id: int, weighted_fields: Iterable[tuple[str | None, float]]) -> None:
+        self._doc_count += 1
+        for value, weight in weighted_fields:
+            for token in tokenize(value):
+                postings = self._postings.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0.0) + weight
+
+    def freeze(self) -> None:
+        self._sorted_tokens = sorted(self._postings)
+
+    def _matching_tokens(self, prefix: str) -> list[str]:
+        start = bisect_left(self._sorted_tokens, prefix)
+        matches = []
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, query: str, exclude: Optional[set[int]] = None) -> list[tuple[int, float]]:
+        """Return (doc_id, score) pairs matching every query token, best first."""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        scores: Optional[dict[int, float]] = None
+        for query_token in query_tokens:
+            token_scores: dict[int, float] = {}
+            for token in self._matching_tokens(query_token):
+                postings = self._postings[token]
+                idf = math.log(1 + self._doc_count / len(postings))
+                exact_bonus = 1.5 if token == query_token else 1.0
+                for doc_id, weight in postings.items():
+                    score = weight * idf * exact_bonus
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: scores[doc_id] + value for doc_id, value in token_scores.items() if doc_id in scores}
+            if not scores:
+                return []
+
+        ranked = [
+            (doc_id, score)
+            for doc_id, score in (scores or {}).items()
+            if not exclude or doc_id not in exclude
+        ]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+
+
+_fallback_lock = Lock()
+_fallback_indexes: dict[str, tuple[Any, InvertedIndex]] = {}
+
+
+# Columns each fallback index is built from, per model and index name.
+_INDEXED_COLUMNS: dict[type, dict[str, tuple[str, ...]]] = {
+    User: {"users": ("full_name", "email")},
+    Company: {"companies": ("name", "location", "description"), "job_postings": ("name",)},
+    JobPosting: {"job_postings": ("title", "required_skills", "location", "description", "company_id")},
+}
+
+
+def _changed_indexes(session: Session) -> set[str]:
+    changed: set[str] = set()
+    for instance in itertools.chain(session.new, session.deleted):
+        changed.update(_INDEXED_COLUMNS.get(type(instance), ()))
+    for instance in session.dirty:
+        attributes = inspect(instance).attrs
+        for name, columns in _INDEXED_COLUMNS.get(type(instance), {}).items():
+            if name not in changed and any(attributes[column].history.has_changes() for column in columns):
+                changed.add(name)
+    return changed
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_index_versions(session: Session, flush_context) -> None:
+    """Bump the versions of fallback indexes whose source columns this flush changed."""
+    changed = _changed_indexes(session)
+    if not changed:
+        return
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        # Searches use the generated tsvector columns; no fallback index to invalidate.
+        return
+
+    table = SearchIndexVersion.__table__
+    bumped = connection.execute(
+        update(table).where(table.c.name.in_(changed)).values(version=table.c.version + 1)
+    ).rowcount
+    if bumped < len(changed):
+        existing = set(connection.execute(select(table.c.name).where(table.c.name.in_(changed))).scalars())
+        connection.execute(insert(table), [{"name": name, "version": 1} for name in sorted(changed - existing)])
+
+
+def _index_version(db: Session, name: str) -> int:
+    version = db.query(SearchIndexVersion.version).filter(SearchIndexVersion.name == name).scalar()
+    return int(version or 0)
+
+
+def _get_fallback_index(
+    db: Session,
+    name: str,
+    build: Callable[[InvertedIndex], None],
+) -> InvertedIndex:
+    version = _index_version(db, name)
+    with _fallback_lock:
+        cached = _fallback_indexes.get(name)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        index = InvertedIndex()
+        build(index)
+        index.freeze()
+        _fallback_indexes[name] = (version, index)
+        return index
+
+
+def _load_ranked(db: Session, model, ranked: list[tuple[int, float]], limit: int) -> list:
+    ranked_ids = [doc_id for doc_id, _ in ranked[:limit]]
+    if not ranked_ids:
+        return []
+    rows = db.query(model).filter(model.id.in_(ranked_ids)).all()
+    row_map = {row.id: row for row in rows}
+    return [row_map[doc_id] for doc_id in ranked_ids if doc_id in row_map]
+
+
+def search_people(db: Session, term: str, limit: int, exclude_user_id: Optional[int] = None) -> list[User]:
+    if _is_postgres(db):
+        tsquery_text = _prefix_tsquery(term)
+        if not tsquery_text:
+            return []
+        vector = literal_column("users.search_vector")
+        tsquery = func.to_tsquery(_TS_CONFIG, tsquery_text)
+        rank = func.ts_rank_cd(vector, tsquery) + func.similarity(func.coalesce(User.full_name, ""), term)
+        query = db.query(User).filter(
+            or_(vector.op("@@")(tsquery), User.full_name.ilike(f"%{term}%"), User.email.ilike(f"%{term}%"))
+        )
+        if exclude_user_id is not None:
+            query = query.filter(User.id != exclude_user_id)
+        return query.order_by(rank.desc(), User.id.asc()).limit(limit).all()
+
+    def build(index: InvertedIndex) -> None:
+        for user_id, full_name, email in db.query(User.id, User.full_name, User.email).yield_per(1000):
+            index.add(user_id, [(full_name, 3.0), (email, 1.0)])
+
+    index = _get_fallback_index(db, "users", build)
+    exclude = {exclude_user_id} if exclude_user_id is not None else None
+    return _load_ranked(db, User, index.search(term, exclude=exclude), limit)
+
+
+def search_companies(db: Session, term: str, limit: int) -> list[Company]:
+    if _is_postgres(db):
+        tsquery_text = _prefix_tsquery(term)
+        if not tsquery_text:
+            return []
+        vector = literal_column("companies.search_vector")
+        tsquery = func.to_tsquery(_TS_CONFIG, tsquery_text)
+        rank = func.ts_rank_cd(vector, tsquery) + func.similarity(Company.name, term)
+        return (
+            db.query(Company)
+            .filter(or_(vector.op("@@")(tsquery), Company.name.ilike(f"%{term}%")))
+            .order_by(rank.desc(), Company.id.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def build(index: InvertedIndex) -> None:
+        rows = db.query(Company.id, Company.name, Company.location, Company.description).yield_per(1000)
+        for company_id, name, location, description in rows:
+            index.add(company_id, [(name, 3.0), (location, 1.5), (description, 1.0)])
+
+    index = _get_fallback_index(db, "companies", build)
+    return _load_ranked(db, Company, index.search(term), limit)
+
+
+def _job_fallback_index(db: Session) -> InvertedIndex:
+    def build(index: InvertedIndex) -> None:
+        rows = (
+            db.query(
+                JobPosting.id,
+                JobPosting.title,
+                JobPosting.required_skills,
+                JobPosting.location,
+                JobPosting.description,
+                Company.name,
+            )
+            .join(Company, Company.id == JobPosting.company_id)
+            .yield_per(1000)
+        )
+        for job_id, title, skills, location, description, company_name in rows:
+            index.add(
+                job_id,
+                [(title, 3.0), (skills, 2.0), (company_name, 1.5), (location, 1.5), (description, 1.0)],
+            )
+
+    return _get_fallback_index(db, "job_postings", build)
+
+
+def search_job_postings(db: Session, term: str, limit: int) -> list[JobPosting]:
+    if _is_postgres(db):
+        tsquery_text = _prefix_tsquery(term)
+        if not tsquery_text:
+            return []
+        job_vector = literal_column("job_postings.search_vector")
+        company_vector = literal_column("companies.search_vector")
+        tsquery = func.to_tsquery(_TS_CONFIG, tsquery_text)
+        rank = (
+            func.ts_rank_cd(job_vector, tsquery)
+            + 0.5 * func.ts_rank_cd(company_vector, tsquery)
+            + func.similarity(JobPosting.title, term)
+        )
+        return (
+            db.query(JobPosting)
+            .join(Company, Company.id == JobPosting.company_id)
+            .filter(
+                or_(
+                    job_vector.op("@@")(tsquery),
+                    company_vector.op("@@")(tsquery),
+                    JobPosting.title.ilike(f"%{term}%"),
+                )
+            )
+            .order_by(rank.desc(), JobPosting.id.asc())
+            .limit(limit)
+            .all()
+        )
+
+    index = _job_fallback_index(db)
+    return _load_ranked(db, JobPosting, index.search(term), limit)
+
+
+def job_rank_clause(term: str):
+    """(match clause, rank expression) for job postings on PostgreSQL; None if term has no tokens."""
+    tsquery_text = _prefix_tsquery(term)
+    if not tsquery_text:
+        return None
+    job_vector = literal_column("job_postings.search_vector")
+    tsquery = func.to_tsquery(_TS_CONFIG, tsquery_text)
+    rank = func.ts_rank_cd(job_vector, tsquery) + func.similarity(JobPosting.title, term)
+    return job_vector.op("@@")(tsquery), rank
+
+
+def job_relevance_scores(db: Session, term: str) -> dict[int, float]:
+    """Relevance of every job posting matching term, from the in-process index (non-PostgreSQL)."""
+    return dict(_job_fallback_index(db).search(term))
@@ -7,6 +7,7 @@ from jose import JWTError, jwt
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 from app.config import settings
+from app.utils.executor import run_in_thread
 
 # Password hasher using Argon2
 ph = PasswordHasher()
@@ -43,6 +44,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+async def hash_password_async(password: str) -> str:
+    """Argon2 hash on the CPU thread pool so the event loop keeps serving requests."""
+    return await run_in_thread("argon2_hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Argon2 verify on the CPU thread pool."""
+    return await run_in_thread("argon2_verify", verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -0,0 +1,183 @@
+"""
+Skill taxonomy: canonicalization and the skill links of jobs and profiles.
+
+Free-text skill lists ("Python, NodeJS; k8s") are split and each entry is
+lower-cased, whitespace-normalized and mapped through SKILL_ALIASES to a
+canonical slug. Jobs and profiles are linked to Skill rows through the
+job_skills and profile_skills tables. Skill filters are then set
+intersections on the skill-first indexes of those tables, instead of ILIKE
+scans that also let "java" match "javascript".
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.networking import JobPosting
+from app.models.skills import JobSkill, ProfileSkill, Skill
+from app.models.user import Profile
+
+_SPLIT_RE = re.compile(r"[,;|\n]+")
+_SPACE_RE = re.compile(r"\s+")
+MAX_SKILL_LENGTH = 100
+
+# Common spellings mapped to one canonical slug.
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "cpp": "c++",
+    "c plus plus": "c++",
+    "csharp": "c#",
+    "c sharp": "c#",
+    "dotnet": ".net",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "sklearn": "scikit-learn",
+}
+
+
+def canonical_skill(raw: str) -> Optional[str]:
+    """The canonical slug for one skill entry, or None if it is empty."""
+    slug = _SPACE_RE.sub(" ", raw.strip().lower()).rstrip(".").strip()
+    if not slug:
+        return None
+    slug = SKILL_ALIASES.get(slug, slug)
+    return slug[:MAX_SKILL_LENGTH]
+
+
+def parse_skills(text: Optional[str]) -> list[tuple[str, str]]:
+    """(slug, display name) for each distinct skill in a free-text list, in order."""
+    skills: dict[str, str] = {}
+    for entry in _SPLIT_RE.split(text or ""):
+        slug = canonical_skill(entry)
+        if slug is None or slug in skills:
+            continue
+        display = _SPACE_RE.sub(" ", entry.strip())
+        skills[slug] = display if display.lower() == slug else slug
+    return list(skills.items())
+
+
+def resolve_skill_ids(db: Session, text: Optional[str], create: bool = True) -> list[int]:
+    """Skill ids for a free-text list; unknown skills are created unless create is False."""
+    parsed = parse_skills(text)
+    if not parsed:
+        return []
+
+    slugs = [slug for slug, _ in parsed]
+    known = {slug: skill_id for slug, skill_id in db.query(Skill.slug, Skill.id).filter(Skill.slug.in_(slugs))}
+    if create:
+        for slug, name in parsed:
+            if slug in known:
+                continue
+            try:
+                with db.begin_nested():
+                    skill = Skill(slug=slug, name=name[:MAX_SKILL_LENGTH])
+                    db.add(skill)
+                known[slug] = int(skill.id)
+            except IntegrityError:
+                # Created concurrently by another request.
+                known[slug] = db.query(Skill.id).filter(Skill.slug == slug).scalar()
+    return [known[slug] for slug in slugs if slug in known]
+
+
+def _sync_links(db: Session, link_model, owner_column, owner_id: int, text: Optional[str]) -> None:
+    wanted = set(resolve_skill_ids(db, text))
+    current = {skill_id for (skill_id,) in db.query(link_model.skill_id).filter(owner_column == owner_id)}
+    stale = current - wanted
+    if stale:
+        db.query(link_model).filter(owner_column == owner_id, link_model.skill_id.in_(stale)).delete(
+            synchronize_session=False
+        )
+    for skill_id in wanted - current:
+        db.add(link_model(**{owner_column.key: owner_id, "skill_id": skill_id}))
+
+
+def sync_job_skills(db: Session, job: JobPosting) -> None:
+    """Link job to the skills in its required_skills text; the caller commits."""
+    _sync_links(db, JobSkill, JobSkill.job_id, int(job.id), job.required_skills)
+
+
+def sync_profile_skills(db: Session, profile: Profile) -> None:
+    """Link profile to the skills in its skills text; the caller commits."""
+    _sync_links(db, ProfileSkill, ProfileSkill.profile_id, int(profile.id), profile.skills)
+
+
+def skill_filter_ids(db: Session, text: Optional[str]) -> Optional[list[int]]:
+    """
+    Skill ids to filter on, or None when a requested skill is unknown and
+    nothing can match.
+    """
+    requested = parse_skills(text)
+    skill_ids = resolve_skill_ids(db, text, create=False)
+    if len(skill_ids) < len(requested):
+        return None
+    return skill_ids
+
+
+def jobs_with_skills(skill_ids: list[int]):
+    """Subquery of job ids linked to every one of skill_ids."""
+    return (
+        select(JobSkill.job_id)
+        .where(JobSkill.skill_id.in_(skill_ids))
+        .group_by(JobSkill.job_id)
+        .having(func.count(JobSkill.skill_id) == len(skill_ids))
+    )
+
+
+def profiles_with_skills(skill_ids: list[int]):
+    """Subquery of profile ids linked to every one of skill_ids."""
+    return (
+        select(ProfileSkill.profile_id)
+        .where(ProfileSkill.skill_id.in_(skill_ids))
+        .group_by(ProfileSkill.profile_id)
+        .having(func.count(ProfileSkill.skill_id) == len(skill_ids))
+    )
+
+
+def backfill_skills(
+    session_factory: Callable[[], Session],
+    batch_size: int = 500,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> dict[str, int]:
+    """Link every existing job and profile to its skills; safe to run again."""
+    counts = {"jobs": 0, "profiles": 0}
+    for kind, model, sync in (("jobs", JobPosting, sync_job_skills), ("profiles", Profile, sync_profile_skills)):
+        last_id = 0
+        while True:
+            db = session_factory()
+            try:
+                rows = db.query(model).filter(model.id > last_id).order_by(model.id.asc()).limit(batch_size).all()
+                if not rows:
+                    break
+                for row in rows:
+                    sync(db, row)
+                db.commit()
+                last_id = int(rows[-1].id)
+                counts[kind] += len(rows)
+            finally:
+                db.close()
+            if progress is not None:
+                progress(kind, counts[kind])
+    return counts
@@ -0,0 +1,295 @@
+"""
+Precomputed per-user home feed timelines (fan-out on write).
+
+Each timeline holds the newest post IDs visible to a user, capped at
+FEED_TIMELINE_MAX_ENTRIES. Post IDs are used as scores because they grow with
+creation time, which keeps the ordering identical to (created_at, id).
+Timelines live in Redis sorted sets when Redis is reachable and in an
+in-process LRU otherwise; the in-process copy expires quickly so that
+multi-worker deployments without Redis only serve briefly stale timelines.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional, TypeVar, Union
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncDB, async_db_session
+from app.models.networking import UserPost
+from app.utils.relationships import get_connected_user_ids
+
+_PUSH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+local ttl = tonumber(ARGV[#ARGV])
+for i = 2, #ARGV - 1 do
+    redis.call('ZADD', KEYS[1], ARGV[i], ARGV[i])
+end
+local removed = redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+if removed > 0 then
+    redis.call('SET', KEYS[2], 'partial')
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+return 1
+"""
+
+
+class TimelinePage:
+    def __init__(self, post_ids: list[int], truncated: bool):
+        self.post_ids = post_ids
+        self.truncated = truncated
+
+
+class InMemoryTimelineStore:
+    """Process-local timelines with an LRU cap on users and a short max age."""
+
+    def __init__(self, max_entries: int, max_users: int, max_age_seconds: float):
+        self._max_entries = max_entries
+        self._max_users = max_users
+        self._max_age_seconds = max_age_seconds
+        self._timelines: OrderedDict[int, tuple[float, list[int], bool]] = OrderedDict()
+        self._lock = Lock()
+
+    def _get(self, user_id: int) -> Optional[tuple[float, list[int], bool]]:
+        entry = self._timelines.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self._max_age_seconds:
+            del self._timelines[user_id]
+            return None
+        self._timelines.move_to_end(user_id)
+        return entry
+
+    async def replace(self, user_id: int, post_ids: list[int], truncated: bool) -> None:
+        with self._lock:
+            self._timelines[user_id] = (time.monotonic(), sorted(post_ids)[-self._max_entries:], truncated)
+            self._timelines.move_to_end(user_id)
+            while len(self._timelines) > self._max_users:
+                self._timelines.popitem(last=False)
+
+    async def add(self, user_ids: Iterable[int], post_ids: list[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._get(user_id)
+                if entry is None:
+                    continue
+                built_at, timeline, truncated = entry
+                for post_id in post_ids:
+                    index = bisect_left(timeline, post_id)
+                    if index == len(timeline) or timeline[index] != post_id:
+                        insort(timeline, post_id)
+                if len(timeline) > self._max_entries:
+                    del timeline[: len(timeline) - self._max_entries]
+                    truncated = True
+                self._timelines[user_id] = (built_at, timeline, truncated)
+
+    async def remove(self, user_ids: Iterable[int], post_ids: list[int]) -> None:
+        removed = set(post_ids)
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._get(user_id)
+                if entry is None:
+                    continue
+                built_at, timeline, truncated = entry
+                self._timelines[user_id] = (built_at, [post_id for post_id in timeline if post_id not in removed], truncated)
+
+    async def page(self, user_id: int, before_id: Optional[int], count: int) -> Optional[TimelinePage]:
+        with self._lock:
+            entry = self._get(user_id)
+            if entry is None:
+                return None
+            _, timeline, truncated = entry
+            end = bisect_left(timeline, before_id) if before_id is not None else len(timeline)
+            start = max(end - count, 0)
+            return TimelinePage(list(reversed(timeline[start:end])), truncated)
+
+
+class RedisTimelineStore:
+    """Timelines kept in Redis sorted sets, with a metadata key marking built timelines."""
+
+    def __init__(self, redis_client, prefix: str, max_entries: int, ttl_seconds: int):
+        self._redis = redis_client
+        self._prefix = prefix
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._push_script = redis_client.register_script(_PUSH_SCRIPT)
+
+    def _keys(self, user_id: int) -> tuple[str, str]:
+        return f"{self._prefix}:{user_id}", f"{self._prefix}:{user_id}:meta"
+
+    async def replace(self, user_id: int, post_ids: list[int], truncated: bool) -> None:
+        timeline_key, meta_key = self._keys(user_id)
+        try:
+            pipeline = self._redis.pipeline(transaction=True)
+            pipeline.delete(timeline_key)
+            if post_ids:
+                pipeline.zadd(timeline_key, {str(post_id): post_id for post_id in post_ids})
+                pipeline.zremrangebyrank(timeline_key, 0, -(self._max_entries + 1))
+            pipeline.set(meta_key, "partial" if truncated else "complete", ex=self._ttl_seconds)
+            pipeline.expire(timeline_key, self._ttl_seconds)
+            await pipeline.execute()
+        except Exception:
+            return None
+
+    async def add(self, user_ids: Iterable[int], post_ids: list[int]) -> None:
+        if not post_ids:
+            return None
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                await self._push_script(
+                    keys=list(self._keys(user_id)),
+                    args=[self._max_entries, *post_ids, self._ttl_seconds],
+                    client=pipeline,
+                )
+            await pipeline.execute()
+        except Exception:
+            await self._invalidate(user_ids)
+
+    async def remove(self, user_ids: Iterable[int], post_ids: list[int]) -> None:
+        if not post_ids:
+            return None
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipeline.zrem(self._keys(user_id)[0], *[str(post_id) for post_id in post_ids])
+            await pipeline.execute()
+        except Exception:
+            await self._invalidate(user_ids)
+
+    async def _invalidate(self, user_ids: Iterable[int]) -> None:
+        try:
+            keys = [key for user_id in user_ids for key in self._keys(user_id)]
+            if keys:
+                await self._redis.delete(*keys)
+        except Exception:
+            return None
+
+    async def page(self, user_id: int, before_id: Optional[int], count: int) -> Optional[TimelinePage]:
+        timeline_key, meta_key = self._keys(user_id)
+        max_score = f"({before_id}" if before_id is not None else "+inf"
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.get(meta_key)
+            pipeline.zrevrangebyscore(timeline_key, max_score, "-inf", start=0, num=count)
+            meta, members = await pipeline.execute()
+        except Exception:
+            return None
+        if meta is None:
+            return None
+        return TimelinePage([int(member) for member in members], meta == "partial")
+
+
+_store: InMemoryTimelineStore | RedisTimelineStore = InMemoryTimelineStore(
+    max_entries=settings.FEED_TIMELINE_MAX_ENTRIES,
+    max_users=settings.FEED_TIMELINE_LOCAL_MAX_USERS,
+    max_age_seconds=settings.FEED_TIMELINE_LOCAL_TTL_SECONDS,
+)
+
+
+def configure_timeline_store(redis_client) -> None:
+    """Use Redis for timelines when a client is available, else keep the in-process store."""
+    global _store
+    if redis_client is not None:
+        _store = RedisTimelineStore(
+            redis_client,
+            prefix=settings.REDIS_FEED_TIMELINE_PREFIX,
+            max_entries=settings.FEED_TIMELINE_MAX_ENTRIES,
+            ttl_seconds=settings.FEED_TIMELINE_TTL_SECONDS,
+        )
+
+
+T = TypeVar("T")
+DB = Union[Session, AsyncDB]
+
+
+async def _query(db: DB, fn: Callable[..., T], *args: Any) -> T:
+    # Hot routers pass an AsyncDB so the lookup runs off the event loop.
+    if isinstance(db, AsyncDB):
+        return await db.run(fn, *args)
+    return fn(db, *args)
+
+
+def _timeline_seed(db: Session, user_id: int, after_id: int = 0) -> list[int]:
+    return _recent_post_ids(db, get_connected_user_ids(db, user_id), after_id)
+
+
+def _recent_post_ids(db: Session, author_ids: Iterable[int], after_id: int = 0) -> list[int]:
+    query = db.query(UserPost.id).filter(UserPost.author_id.in_(list(author_ids)))
+    if after_id:
+        query = query.filter(UserPost.id > after_id)
+    rows = (
+        query
+        .order_by(UserPost.id.desc())
+        .limit(settings.FEED_TIMELINE_MAX_ENTRIES)
+        .all()
+    )
+    return [int(row[0]) for row in rows]
+
+
+async def read_timeline(user_id: int, before_id: Optional[int], count: int) -> Optional[list[int]]:
+    """
+    Return up to `count` post IDs older than before_id, newest first.
+
+    Builds the timeline on first use from the primary, never a replica, so a
+    lagging replica cannot store a timeline missing recent posts. Returns None when the request reaches
+    past the end of a truncated timeline and must be served from the database.
+
+    Fan-out skips users without a stored timeline, so a post fanned out
+    between the seed read and the replace would be missing until the
+    timeline expires; posts newer than the seed are re-read and merged once
+    the timeline exists.
+    """
+    if not settings.FEED_TIMELINE_ENABLED:
+        return None
+
+    page = await _store.page(user_id, before_id, count)
+    if page is None:
+        async with async_db_session() as primary:
+            post_ids = await primary.run(_timeline_seed, user_id)
+            truncated = len(post_ids) >= settings.FEED_TIMELINE_MAX_ENTRIES
+            await _store.replace(user_id, post_ids, truncated)
+            missed = await primary.run(_timeline_seed, user_id, post_ids[0] if post_ids else 0)
+        if missed:
+            await _store.add([user_id], missed)
+            post_ids = sorted(set(post_ids).union(missed), reverse=True)[: settings.FEED_TIMELINE_MAX_ENTRIES]
+        if before_id is not None:
+            post_ids = [post_id for post_id in post_ids if post_id < before_id]
+        page = TimelinePage(post_ids[:count], truncated)
+
+    if len(page.post_ids) < count and page.truncated:
+        return None
+    return page.post_ids
+
+
+async def fan_out_post(db: DB, author_id: int, post_id: int) -> None:
+    if settings.FEED_TIMELINE_ENABLED:
+        await _store.add(await _query(db, get_connected_user_ids, author_id), [post_id])
+
+
+async def retract_post(db: DB, author_id: int, post_id: int) -> None:
+    if settings.FEED_TIMELINE_ENABLED:
+        await _store.remove(await _query(db, get_connected_user_ids, author_id), [post_id])
+
+
+async def backfill_connection(db: Session, user_a: int, user_b: int) -> None:
+    """Merge each user's recent posts into the other's timeline after connecting."""
+    if not settings.FEED_TIMELINE_ENABLED:
+        return None
+    await _store.add([user_a], _recent_post_ids(db, [user_b]))
+    await _store.add([user_b], _recent_post_ids(db, [user_a]))
+
+
+async def purge_connection(db: Session, user_a: int, user_b: int) -> None:
+    """Remove each user's posts from the other's timeline after disconnecting."""
+    if not settings.FEED_TIMELINE_ENABLED:
+        return None
+    await _store.remove([user_a], _recent_post_ids(db, [user_b]))
+    await _store.remove([user_b], _recent_post_ids(db, [user_a]))
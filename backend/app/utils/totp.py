@@ -6,6 +6,7 @@ import qrcode
 import io
 import base64
 from typing import Tuple
+from app.utils.executor import run_in_process
 
 
 def generate_totp_secret() -> str:
@@ -64,6 +65,11 @@ def generate_qr_code(data: str) -> str:
     return f"data:image/png;base64,{img_base64}"
 
 
+async def generate_qr_code_async(data: str) -> str:
+    """Render the QR code off the event loop (pure Python, so the process pool if enabled)."""
+    return await run_in_process("qr_code", generate_qr_code, data)
+
+
 def verify_totp(secret: str, token: str) -> bool:
     """
     Verify a TOTP token
@@ -1,22 +1,58 @@
+import csv
+import hashlib
+import io
+import json
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import cast
+import anyio
 from cryptography.fernet import Fernet
 
 # Configure isolated test environment before importing app settings
 os.environ["SECRET_KEY"] = "smoke-test-secret-key-with-at-least-32-chars"
 os.environ["DATABASE_URL"] = "sqlite:///./smoke_march.db"
+# The smoke database starts empty, so startup creates the schema.
+os.environ["DB_MIGRATE_ON_STARTUP"] = "True"
+# The same file doubles as a read replica so replica routing is exercised.
+os.environ["DATABASE_READ_URLS"] = "sqlite:///./smoke_march.db"
 os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
 os.environ["DEBUG"] = "False"
 os.environ["CORS_ORIGINS"] = '["http://localhost:5174"]'
 os.environ["ALLOWED_HOSTS"] = '["localhost", "127.0.0.1", "testserver"]'
+os.environ["UPLOAD_DIR"] = tempfile.mkdtemp(prefix="smoke_uploads_")
+_smoke_keys_dir = tempfile.mkdtemp(prefix="smoke_keys_")
+os.environ["PKI_PRIVATE_KEY_PATH"] = os.path.join(_smoke_keys_dir, "signing_private.pem")
+os.environ["PKI_PUBLIC_KEY_PATH"] = os.path.join(_smoke_keys_dir, "signing_public.pem")
 
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
 
-from app.main import app
-from app.database import SessionLocal
+from app.config import settings
+from app.main import _route_template, app
+from app.database import ReplicaSet, SessionLocal, engine
+from app.migrations import MIGRATIONS, apply_migrations, current_revision, head_revision
+from app.models.networking import AuditLog, UserPost
+from app.models.recommendation import JobRecommendation
+from app.models.resume import Resume
+from app.models.search import SearchIndexVersion
 from app.models.user import User, Profile, UserRole
+from app.tools.migrate_resume_encryption import migrate as migrate_resume_encryption
+from app.utils.audit import _writer as audit_writer, flush_audit_events, log_audit_event
+from app.utils.encryption import STREAM_ENCRYPTION_METHOD, encrypt_file
+from app.utils.rate_limit import LocalRateLimiter
+from app.utils.read_routing import recently_wrote
+from app.utils import audit as audit_module, recommendations, timeline
+from app.utils.recommendations import JobMatrix, refresh_all_recommendations
+from app.utils.pki import current_key_id, get_public_key_pem, rotate_signing_key
+from app.utils.rewrap import RewrapInProgressError, _exclusive_run, rewrap_upload_dir
+from app.utils.skills import backfill_skills
 from app.utils.security import hash_password, create_access_token
+from app.utils.timeline import InMemoryTimelineStore, TimelinePage
 
 
 def create_user(db, email: str, mobile: str, full_name: str, role: UserRole) -> tuple[int, str]:
@@ -46,6 +82,23 @@ def auth_headers(user_id: int, email: str) -> dict:
     return {"Authorization": f"Bearer {token}"}
 
 
+@contextmanager
+def count_queries():
+    counter = {"count": 0, "statements": []}
+
+    def _count(_conn, _cursor, statement, *_args, **_kwargs):
+        # Background audit appends are not part of the request being measured.
+        if threading.current_thread().name != "audit-writer":
+            counter["count"] += 1
+            counter["statements"].append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
 def run_smoke() -> None:
     db_file = Path("smoke_march.db")
     if db_file.exists():
@@ -151,6 +204,136 @@ def run_smoke() -> None:
         )
         assert accept_response.status_code == 200, accept_response.text
 
+        # 6b) People search resolves relationship status with a constant number of queries
+        db = SessionLocal()
+        try:
+            for index in range(5):
+                create_user(
+                    db,
+                    email=f"searchable{index}.smoke@example.com",
+                    mobile=f"+1555000010{index}",
+                    full_name=f"Searchable Person{index}",
+                    role=UserRole.USER,
+                )
+        finally:
+            db.close()
+
+        people_search_endpoints = [
+            ("/search", {"limit": 20}),
+            ("/connections/search", {"limit": 20}),
+        ]
+        for path, params in people_search_endpoints:
+            client.get(path, headers=candidate_headers, params={**params, "query": "Searchable"})
+            query_counts = []
+            for search_query in ("Searchable Person0", "Searchable"):
+                with count_queries() as counter:
+                    people_response = client.get(path, headers=candidate_headers, params={**params, "query": search_query})
+                assert people_response.status_code == 200, people_response.text
+                query_counts.append(counter["count"])
+            assert query_counts[0] == query_counts[1], f"{path} issues per-row queries: {query_counts}"
+
+        # The fallback people index is rebuilt only when a searchable column changes
+        def users_index_version() -> int:
+            with SessionLocal() as version_db:
+                return version_db.query(SearchIndexVersion.version).filter(SearchIndexVersion.name == "users").scalar()
+
+        version_before = users_index_version()
+        with SessionLocal() as touch_db:
+            touched = touch_db.query(User).filter(User.email == "searchable0.smoke@example.com").one()
+            touched.totp_enabled = False
+            touched.is_mobile_verified = True
+            touch_db.commit()
+        assert users_index_version() == version_before, "non-indexed update rebuilt the people index"
+        with SessionLocal() as touch_db:
+            touched = touch_db.query(User).filter(User.email == "searchable0.smoke@example.com").one()
+            touched.full_name = "Searchable Renamed"
+            touch_db.commit()
+        assert users_index_version() == version_before + 1
+        renamed = client.get("/search", headers=candidate_headers, params={"query": "Renamed", "limit": 20}).json()
+        assert "Searchable Renamed" in json.dumps(renamed), renamed
+
+        # 6c) Home feed pages friend posts with keyset cursors; the first read
+        # builds the timeline so later posts arrive through fan-out on write
+        warm_response = client.get("/feed/home", headers=candidate_headers)
+        assert warm_response.status_code == 200, warm_response.text
+
+        for index in range(3):
+            post_response = client.post("/feed/posts", headers=recruiter_headers, data={"content": f"Smoke post {index}"})
+            assert post_response.status_code == 201, post_response.text
+
+        seen_post_ids: list[int] = []
+        feed_params: dict = {"limit": 2}
+        for _ in range(3):
+            feed_response = client.get("/feed/home", headers=candidate_headers, params=feed_params)
+            assert feed_response.status_code == 200, feed_response.text
+            feed_page = feed_response.json()
+            seen_post_ids.extend(post["id"] for post in feed_page["friend_posts"])
+            if not feed_page["has_more_posts"]:
+                break
+            feed_params = {"limit": 2, "post_cursor": feed_page["next_post_cursor"]}
+        assert len(seen_post_ids) == 3 and len(set(seen_post_ids)) == 3, f"Feed pagination mismatch: {seen_post_ids}"
+
+        delete_response = client.delete(f"/feed/posts/{seen_post_ids[0]}", headers=recruiter_headers)
+        assert delete_response.status_code == 200, delete_response.text
+        feed_response = client.get("/feed/home", headers=candidate_headers)
+        assert seen_post_ids[0] not in {post["id"] for post in feed_response.json()["friend_posts"]}, "Deleted post still in feed"
+
+        # A post fanned out while the timeline is being seeded, when there is
+        # no timeline to land in yet, still shows up once the seed is stored
+        timeline_store = cast(InMemoryTimelineStore, timeline._store)
+        timeline_store._timelines.pop(candidate_id, None)
+        original_replace = timeline_store.replace
+        raced_post_ids: list[int] = []
+
+        async def racing_replace(user_id, post_ids, truncated):
+            if not raced_post_ids:
+                with SessionLocal() as race_db:
+                    raced_post = UserPost(author_id=recruiter_id, content="Smoke raced post")
+                    race_db.add(raced_post)
+                    race_db.commit()
+                    raced_post_ids.append(int(raced_post.id))
+                    await timeline.fan_out_post(race_db, recruiter_id, raced_post_ids[0])
+            await original_replace(user_id, post_ids, truncated)
+
+        setattr(timeline_store, "replace", racing_replace)
+        try:
+            raced_feed = client.get("/feed/home", headers=candidate_headers).json()["friend_posts"]
+        finally:
+            del timeline_store.replace
+        assert raced_post_ids[0] in {post["id"] for post in raced_feed}, "Post raced with the seed read is missing"
+        assert raced_post_ids[0] in cast(TimelinePage, anyio.run(timeline_store.page, candidate_id, None, 5)).post_ids
+
+        # 6d) Feed posts carry comment counts with a bounded preview; the rest
+        # of the thread is paged through the comments endpoint
+        commented_post_id = seen_post_ids[1]
+        for index in range(5):
+            comment_response = client.post(
+                f"/feed/posts/{commented_post_id}/comments",
+                headers=candidate_headers,
+                json={"content": f"Smoke comment {index}"},
+            )
+            assert comment_response.status_code == 200, comment_response.text
+        feed_posts = client.get("/feed/home", headers=candidate_headers).json()["friend_posts"]
+        commented_post = next(post for post in feed_posts if post["id"] == commented_post_id)
+        assert commented_post["comment_count"] == 5, commented_post
+        assert [comment["content"] for comment in commented_post["comments"]] == [
+            f"Smoke comment {index}" for index in range(2, 5)
+        ], commented_post["comments"]
+
+        thread: list[str] = []
+        comment_params: dict = {"limit": 2}
+        while True:
+            comments_response = client.get(
+                f"/feed/posts/{commented_post_id}/comments", headers=candidate_headers, params=comment_params
+            )
+            assert comments_response.status_code == 200, comments_response.text
+            comments_page = comments_response.json()
+            thread = [comment["content"] for comment in comments_page["comments"]] + thread
+            if not comments_page["has_more"]:
+                break
+            comment_params = {"limit": 2, "cursor": comments_page["next_cursor"]}
+        assert thread == [f"Smoke comment {index}" for index in range(5)], thread
+
         # 7) Create conversation and send encrypted message (ciphertext only)
         conversation_response = client.post(
             "/messages/conversations",
@@ -167,6 +350,104 @@ def run_smoke() -> None:
         )
         assert message_response.status_code == 201, message_response.text
 
+        # 7b) Conversation list is batched and paged by recent activity
+        for index in range(2):
+            group_response = client.post(
+                "/messages/conversations",
+                headers=candidate_headers,
+                json={"participant_ids": [recruiter_id], "is_group": True, "name": f"Smoke group {index}"},
+            )
+            assert group_response.status_code == 201, group_response.text
+        client.post(
+            f"/messages/conversations/{conversation_id}/messages",
+            headers=candidate_headers,
+            json={"ciphertext": "ZW5jcnlwdGVkLWFnYWlu", "message_type": "e2ee"},
+        )
+
+        inbox_query_counts = []
+        for page_size in (1, 3):
+            with count_queries() as counter:
+                inbox_response = client.get(
+                    "/messages/conversations", headers=candidate_headers, params={"limit": page_size}
+                )
+            assert inbox_response.status_code == 200, inbox_response.text
+            inbox_query_counts.append(counter["count"])
+        assert inbox_query_counts[0] == inbox_query_counts[1], f"Conversation list is not batched: {inbox_query_counts}"
+
+        inbox: list[dict] = []
+        inbox_params: dict = {"limit": 2}
+        while True:
+            inbox_response = client.get("/messages/conversations", headers=candidate_headers, params=inbox_params)
+            assert inbox_response.status_code == 200, inbox_response.text
+            inbox.extend(inbox_response.json())
+            next_cursor = inbox_response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                break
+            inbox_params = {"limit": 2, "cursor": next_cursor}
+        assert len(inbox) == 3 and inbox[0]["id"] == conversation_id, inbox
+        assert inbox[0]["last_message_sender_id"] == candidate_id, inbox[0]
+
+        # 7c) Message history pages backwards with cursors and polls forward by id
+        for index in range(3):
+            client.post(
+                f"/messages/conversations/{conversation_id}/messages",
+                headers=recruiter_headers,
+                json={"ciphertext": f"c21va2Ut{index}", "message_type": "e2ee"},
+            )
+        history_url = f"/messages/conversations/{conversation_id}/messages"
+        latest_response = client.get(history_url, headers=candidate_headers, params={"limit": 2})
+        assert latest_response.status_code == 200, latest_response.text
+        latest_page = latest_response.json()
+        assert [message["ciphertext"] for message in latest_page] == ["c21va2Ut1", "c21va2Ut2"], latest_page
+
+        history = list(latest_page)
+        older_cursor = latest_response.headers.get("X-Next-Cursor")
+        while older_cursor:
+            older_response = client.get(history_url, headers=candidate_headers, params={"limit": 2, "before": older_cursor})
+            assert older_response.status_code == 200, older_response.text
+            history = older_response.json() + history
+            older_cursor = older_response.headers.get("X-Next-Cursor")
+        assert len(history) == 5 and [message["id"] for message in history] == sorted(message["id"] for message in history)
+
+        newer_response = client.get(history_url, headers=candidate_headers, params={"since_id": history[2]["id"]})
+        assert [message["id"] for message in newer_response.json()] == [message["id"] for message in history[3:]]
+
+        # 7d) WebSocket delivers new messages, read cursors and typing events
+        def ws_url(headers: dict) -> str:
+            return f"/messages/ws?token={headers['Authorization'].split(' ', 1)[1]}"
+
+        with client.websocket_connect(ws_url(candidate_headers)) as candidate_ws, client.websocket_connect(
+            ws_url(recruiter_headers)
+        ) as recruiter_ws:
+            candidate_ws.send_json({"type": "ping"})
+            assert candidate_ws.receive_json() == {"type": "pong"}
+
+            live_response = client.post(
+                f"/messages/conversations/{conversation_id}/messages",
+                headers=recruiter_headers,
+                json={"ciphertext": "bGl2ZQ==", "message_type": "e2ee"},
+            )
+            assert live_response.status_code == 201, live_response.text
+            live_event = candidate_ws.receive_json()
+            assert live_event["type"] == "message" and live_event["message"]["ciphertext"] == "bGl2ZQ==", live_event
+            assert recruiter_ws.receive_json()["type"] == "message"
+
+            candidate_ws.send_json({"type": "typing", "conversation_id": conversation_id})
+            typing_event = recruiter_ws.receive_json()
+            assert typing_event == {"type": "typing", "conversation_id": conversation_id, "user_id": candidate_id}
+
+            candidate_ws.send_json(
+                {"type": "read", "conversation_id": conversation_id, "message_id": live_event["message"]["id"]}
+            )
+            read_event = recruiter_ws.receive_json()
+            assert read_event["type"] == "read" and read_event["user_id"] == candidate_id, read_event
+
+        inbox_entry = next(
+            item for item in client.get("/messages/conversations", headers=recruiter_headers).json()
+            if item["id"] == conversation_id
+        )
+        assert inbox_entry["read_cursors"].get(str(candidate_id)) == live_event["message"]["id"], inbox_entry
+
         # 8) Admin reads audit logs
         audit_response = client.get("/admin/audit-logs", headers=admin_headers)
         assert audit_response.status_code == 200, audit_response.text
@@ -183,6 +464,571 @@ def run_smoke() -> None:
         missing = required_actions - found_actions
         assert not missing, f"Missing audit actions: {missing}"
 
+        verify_response = client.get("/admin/audit-logs/verify", headers=admin_headers)
+        assert verify_response.status_code == 200, verify_response.text
+        assert verify_response.json()["valid"] is True, verify_response.json()
+        assert verify_response.json()["checkpoint_id"] is not None, verify_response.json()
+
+        # 8b) A second verification starts from the signed checkpoint; a full
+        # re-verify runs in the background and reports progress
+        incremental = client.get("/admin/audit-logs/verify", headers=admin_headers).json()
+        assert incremental["valid"] is True and incremental["from_checkpoint_id"] is not None, incremental
+        assert incremental["verified_entries"] < incremental["total_entries"], incremental
+
+        job_response = client.post("/admin/audit-logs/verify/full", headers=admin_headers)
+        assert job_response.status_code == 202, job_response.text
+        verification_job_id = job_response.json()["job_id"]
+        for _ in range(100):
+            verification_job = client.get(
+                f"/admin/audit-logs/verify/jobs/{verification_job_id}", headers=admin_headers
+            ).json()
+            if verification_job["status"] != "running":
+                break
+            time.sleep(0.05)
+        assert verification_job["status"] == "completed", verification_job
+        assert verification_job["result"]["valid"] is True, verification_job
+
+        # 9) Resumes are encrypted in streamed segments and decrypted on the fly;
+        # the migration tool converts legacy Fernet files
+        resume_bytes = os.urandom(200_000)
+        upload_response = client.post(
+            "/resume/upload",
+            headers=candidate_headers,
+            params={"is_public": True},
+            files={"file": ("cv.pdf", resume_bytes, "application/pdf")},
+        )
+        assert upload_response.status_code == 201, upload_response.text
+        uploaded_resume = upload_response.json()
+        assert uploaded_resume["encryption_method"] == STREAM_ENCRYPTION_METHOD, uploaded_resume
+        download_response = client.get(f"/resume/download/{uploaded_resume['id']}")
+        assert download_response.status_code == 200, download_response.text
+        assert download_response.content == resume_bytes, "Streamed resume content mismatch"
+
+        legacy_bytes = b"%PDF-legacy " + os.urandom(5000)
+        legacy_filename = f"{candidate_id}_legacy.pdf.enc"
+        Path(os.environ["UPLOAD_DIR"], legacy_filename).write_bytes(encrypt_file(legacy_bytes))
+        db = SessionLocal()
+        try:
+            legacy_resume = Resume(
+                user_id=candidate_id,
+                original_filename="legacy.pdf",
+                encrypted_filename=legacy_filename,
+                file_size=len(legacy_bytes),
+                file_type="application/pdf",
+                encryption_method="fernet",
+                file_hash_sha256=hashlib.sha256(legacy_bytes).hexdigest(),
+                is_public=True,
+            )
+            db.add(legacy_resume)
+            db.commit()
+            legacy_resume_id = cast(int, legacy_resume.id)
+        finally:
+            db.close()
+        assert client.get(f"/resume/download/{legacy_resume_id}").content == legacy_bytes
+        # A single-segment file is hash-checked before the response starts
+        with SessionLocal() as tamper_db:
+            tamper_db.query(Resume).filter(Resume.id == legacy_resume_id).update({"file_hash_sha256": "0" * 64})
+            tamper_db.commit()
+        tampered = client.get(f"/resume/download/{legacy_resume_id}")
+        assert tampered.status_code == 500 and "hash mismatch" in tampered.json()["detail"], tampered.text
+        with SessionLocal() as tamper_db:
+            tamper_db.query(Resume).filter(Resume.id == legacy_resume_id).update(
+                {"file_hash_sha256": hashlib.sha256(legacy_bytes).hexdigest()}
+            )
+            tamper_db.commit()
+        assert migrate_resume_encryption() == {"converted": 1, "already_converted": 0, "missing": 0, "failed": 0}
+        assert client.get(f"/resume/download/{legacy_resume_id}").content == legacy_bytes
+        integrity = client.get(f"/resume/{legacy_resume_id}/integrity", headers=candidate_headers).json()
+        assert integrity["hash_matches"] is True, integrity
+
+        # 9b) Rotating the signing key keeps old signatures verifiable by key ID
+        stream_resume_id = uploaded_resume["id"]
+        old_key_id = client.get(f"/resume/{stream_resume_id}/integrity", headers=candidate_headers).json()["integrity_key_id"]
+        assert old_key_id == current_key_id(), old_key_id
+        assert rotate_signing_key() != old_key_id
+        assert client.get(f"/resume/download/{stream_resume_id}").content == resume_bytes
+        rotated_integrity = client.get(f"/resume/{stream_resume_id}/integrity", headers=candidate_headers).json()
+        assert rotated_integrity["signature_valid"] is True and rotated_integrity["integrity_key_id"] == old_key_id, rotated_integrity
+        assert rotated_integrity["signer_public_key"] != get_public_key_pem()
+        rotated_verify = client.get("/admin/audit-logs/verify", headers=admin_headers).json()
+        assert rotated_verify["valid"] is True and rotated_verify["signer_key_id"] == current_key_id(), rotated_verify
+
+        # 9c) Crypto ran on the bounded executor and is visible in the metrics
+        runtime_metrics = client.get("/admin/metrics", headers=admin_headers)
+        assert runtime_metrics.status_code == 200, runtime_metrics.text
+        latency = runtime_metrics.json()["latency"]
+        for operation in ("rsa_sign", "resume_encrypt", "resume_decrypt", "resume_hash"):
+            assert latency.get(f"executor.thread.{operation}", {}).get("count"), (operation, latency)
+        assert runtime_metrics.json()["gauges"].get("executor.thread.in_flight") == 0
+
+        # 9d) Rotating the encryption key: the old key stays readable as a
+        # secondary key until the background rewrap moves every file over
+        old_encryption_key = settings.ENCRYPTION_KEY
+        settings.ENCRYPTION_KEY = Fernet.generate_key().decode()
+        settings.ENCRYPTION_SECONDARY_KEYS = old_encryption_key
+        assert client.get(f"/resume/download/{stream_resume_id}").content == resume_bytes
+        rewrap_response = client.post("/admin/encryption/rewrap", headers=admin_headers)
+        assert rewrap_response.status_code == 202, rewrap_response.text
+        rewrap_job_id = rewrap_response.json()["job_id"]
+        for _ in range(100):
+            rewrap_job = client.get(f"/admin/encryption/rewrap/jobs/{rewrap_job_id}", headers=admin_headers).json()
+            if rewrap_job["status"] != "running":
+                break
+            time.sleep(0.05)
+        assert rewrap_job["status"] == "completed", rewrap_job
+        assert rewrap_job["result"]["rewrapped"] == 2 and rewrap_job["result"]["failed"] == 0, rewrap_job
+        assert rewrap_upload_dir()["total"] == 0, "Journal should skip already rewrapped files"
+        # A second concurrent run is refused before it touches another run's temp files
+        in_flight = Path(os.environ["UPLOAD_DIR"], "in_flight.pdf.enc.rewrap")
+        in_flight.write_bytes(b"partial")
+        with _exclusive_run(os.environ["UPLOAD_DIR"]):
+            try:
+                rewrap_upload_dir()
+                raise AssertionError("concurrent rewrap was not refused")
+            except RewrapInProgressError:
+                pass
+        assert in_flight.exists()
+        in_flight.unlink()
+        settings.ENCRYPTION_SECONDARY_KEYS = ""
+        assert client.get(f"/resume/download/{stream_resume_id}").content == resume_bytes
+        assert client.get(f"/resume/download/{legacy_resume_id}").content == legacy_bytes
+
+        # 10) Authentication is served from the principal cache, and admin
+        # suspension/activation takes effect immediately
+        db = SessionLocal()
+        try:
+            cached_id, cached_email = create_user(
+                db,
+                email="cached.user@example.com",
+                mobile="+919000000099",
+                full_name="Cached User",
+                role=UserRole.USER,
+            )
+        finally:
+            db.close()
+        cached_headers = auth_headers(cached_id, cached_email)
+        assert client.get("/resume/list", headers=cached_headers).status_code == 200
+        with count_queries() as counter:
+            assert client.get("/resume/list", headers=cached_headers).status_code == 200
+        assert not [sql for sql in counter["statements"] if "FROM users" in sql], counter["statements"]
+
+        suspend_response = client.post(
+            f"/admin/users/{cached_id}/suspend", headers=admin_headers, json={"reason": "Smoke test suspension"}
+        )
+        assert suspend_response.status_code == 200, suspend_response.text
+        assert client.get("/resume/list", headers=cached_headers).status_code == 403
+        assert client.post(f"/admin/users/{cached_id}/activate", headers=admin_headers).status_code == 200
+        assert client.get("/resume/list", headers=cached_headers).status_code == 200
+        assert client.get("/auth/me", headers=cached_headers).json()["email"] == cached_email
+
+        # 11) Connection pool checkouts are timed and exposed with the runtime metrics
+        pool_metrics = client.get("/admin/metrics", headers=admin_headers).json()
+        assert pool_metrics["latency"].get("db.pool.checkout_wait", {}).get("count"), pool_metrics["latency"]
+        assert "db.pool.sync.checked_out" in pool_metrics["gauges"], pool_metrics["gauges"]
+
+        # 12) Reads go to the replica, except right after the user wrote; a dead
+        # replica is skipped
+        assert anyio.run(recently_wrote, cached_id) is False
+        assert client.get("/jobs/search", headers=cached_headers).status_code == 200
+        assert client.post(f"/jobs/{job_id}/apply", headers=cached_headers, json={}).status_code in (201, 400)
+        assert anyio.run(recently_wrote, cached_id) is True
+        assert client.get(f"/jobs/{job_id}", headers=cached_headers).status_code == 200
+        dead_replicas = ReplicaSet(["sqlite:////nonexistent-dir/replica.db"])
+        original_interval = settings.DATABASE_READ_HEALTH_CHECK_SECONDS
+        settings.DATABASE_READ_HEALTH_CHECK_SECONDS = 0
+        try:
+            assert dead_replicas.choose() is None
+        finally:
+            settings.DATABASE_READ_HEALTH_CHECK_SECONDS = original_interval
+            dead_replicas.dispose()
+
+        # 13) Startup found the schema at the newest migration; migrations are
+        # idempotent and bring pre-migration databases up to date
+        with engine.connect() as connection:
+            assert current_revision(connection) == head_revision(MIGRATIONS)
+        legacy_path = os.path.join(tempfile.mkdtemp(prefix="smoke_legacy_db_"), "legacy.db")
+        legacy_engine = create_engine(f"sqlite:///{legacy_path}")
+        try:
+            with legacy_engine.begin() as connection:
+                connection.execute(text("CREATE TABLE profiles (id INTEGER PRIMARY KEY, user_id INTEGER)"))
+            assert apply_migrations(legacy_engine, MIGRATIONS) == [migration.version for migration in MIGRATIONS]
+            assert apply_migrations(legacy_engine, MIGRATIONS) == []
+            assert "privacy_skills" in {column["name"] for column in inspect(legacy_engine).get_columns("profiles")}
+        finally:
+            legacy_engine.dispose()
+
+        # 14) The middleware honours the shared limiter's verdict and Retry-After
+        class DenyingLimiter:
+            async def hit(self, key, limit, window_seconds):
+                return False, 7
+
+        original_limiter = app.state.rate_limiter
+        app.state.rate_limiter = DenyingLimiter()
+        try:
+            limited = client.get("/jobs/search", headers=cached_headers)
+            assert limited.status_code == 429 and limited.headers["Retry-After"] == "7", limited.text
+        finally:
+            app.state.rate_limiter = original_limiter
+
+        # 15) The fallback limiter keys on route templates and keeps a bounded
+        # number of counters
+        assert _route_template("GET", f"/jobs/{job_id}") == "/jobs/{job_id}"
+        assert _route_template("GET", "/jobs/search") == "/jobs/search"
+        assert _route_template("GET", "/no/such/path") == "unmatched"
+        bounded = LocalRateLimiter(60.0, max_keys=2, sweep_interval=30.0)
+        assert [bounded.hit("scanner", 2, now=1.0)[0] for _ in range(3)] == [True, True, False]
+        for index in range(10):
+            bounded.hit(f"10.0.0.{index}:/jobs/{{job_id}}", 2, now=2.0)
+        assert len(bounded) == 2
+        assert client.get("/admin/metrics", headers=admin_headers).json()["counters"]["rate_limit.local.evictions"] >= 9
+
+        # 16) Job search ranks title matches first, pages with cursors, filters
+        # by salary range and reports facet counts
+        for title, skills, location, salary in [
+            ("Data Engineer", "python,spark", "Bengaluru", (800000, 1200000)),
+            ("Frontend Developer", "react,python", "Pune", (400000, 500000)),
+            ("Python Intern", "python", "Bengaluru", (100000, 200000)),
+        ]:
+            created = client.post(
+                "/jobs",
+                headers=recruiter_headers,
+                json={
+                    "company_id": company_id,
+                    "title": title,
+                    "description": "Work on the careers platform",
+                    "required_skills": skills,
+                    "location": location,
+                    "work_mode": "on-site",
+                    "employment_type": "internship" if "Intern" in title else "full-time",
+                    "salary_min": salary[0],
+                    "salary_max": salary[1],
+                },
+            )
+            assert created.status_code == 201, created.text
+
+        ranked = client.get("/jobs/search", params={"keyword": "python", "limit": 2})
+        assert ranked.status_code == 200, ranked.text
+        assert ranked.json()[0]["title"] == "Python Intern", ranked.json()
+        assert ranked.headers.get("X-Next-Cursor")
+        rest = client.get(
+            "/jobs/search", params={"keyword": "python", "limit": 2, "cursor": ranked.headers["X-Next-Cursor"]}
+        ).json()
+        seen = [job["id"] for job in ranked.json()] + [job["id"] for job in rest]
+        assert len(seen) == len(set(seen)) == 4, seen
+        unpaged = client.get("/jobs/search", params={"keyword": "python"})
+        assert len(unpaged.json()) == 4 and "X-Next-Cursor" not in unpaged.headers, unpaged.json()
+
+        faceted = client.get("/jobs/search/faceted", params={"salary_min": 300000, "limit": 1})
+        assert faceted.status_code == 200, faceted.text
+        faceted_body = faceted.json()
+        assert faceted_body["total"] == 2 and len(faceted_body["items"]) == 1 and faceted_body["next_cursor"]
+        salary_counts = {bucket["value"]: bucket["count"] for bucket in faceted_body["facets"]["salary"]}
+        assert salary_counts["300000-600000"] == 1 and salary_counts["1000000-2000000"] == 1, salary_counts
+        assert {"value": "on-site", "count": 2} in [
+            {"value": mode["value"], "count": mode["count"]} for mode in faceted_body["facets"]["work_mode"]
+        ]
+        assert client.get("/jobs/search", params={"cursor": "not-a-cursor"}).status_code == 400
+
+        # 17) Skill filters match canonical skills, not substrings, for jobs and people
+        java_job = client.post(
+            "/jobs",
+            headers=recruiter_headers,
+            json={
+                "company_id": company_id,
+                "title": "Platform Engineer",
+                "description": "Maintain the JVM services",
+                "required_skills": "Java, Postgres",
+                "location": "Remote",
+                "work_mode": "remote",
+                "employment_type": "full-time",
+            },
+        )
+        assert java_job.status_code == 201, java_job.text
+        js_job = client.post(
+            "/jobs",
+            headers=recruiter_headers,
+            json={
+                "company_id": company_id,
+                "title": "UI Engineer",
+                "description": "Build the web client",
+                "required_skills": "JavaScript; NodeJS",
+                "location": "Remote",
+                "work_mode": "remote",
+                "employment_type": "full-time",
+            },
+        )
+        assert js_job.status_code == 201, js_job.text
+        java_ids = [job["id"] for job in client.get("/jobs/search", params={"skill": "java"}).json()]
+        assert java_ids == [java_job.json()["id"]], java_ids
+        js_ids = [job["id"] for job in client.get("/jobs/search", params={"skill": "js, node.js"}).json()]
+        assert js_ids == [js_job.json()["id"]], js_ids
+        assert client.get("/jobs/search", params={"skill": "java,postgresql"}).json()[0]["id"] == java_job.json()["id"]
+        assert client.get("/jobs/search", params={"skill": "cobol"}).json() == []
+
+        assert client.put("/profile/me", headers=candidate_headers, json={"skills": "Python, k8s"}).status_code == 200
+        people = client.get("/connections/search", headers=recruiter_headers, params={"skills": "kubernetes"}).json()
+        assert [person["id"] for person in people] == [candidate_id], people
+        assert backfill_skills(SessionLocal)["jobs"] >= 6
+
+        # 18) Recommendations rank open jobs by profile fit, follow job changes
+        # and order applicants by match
+        profile_update = client.put(
+            "/profile/me",
+            headers=candidate_headers,
+            json={"headline": "Python developer", "location": "Bengaluru, India", "experience": "Built Python APIs"},
+        )
+        assert profile_update.status_code == 200, profile_update.text
+        # Job refreshes never start a list the user has not computed yet
+        with SessionLocal() as check_db:
+            check_db.query(JobRecommendation).filter(JobRecommendation.user_id == candidate_id).delete()
+            check_db.commit()
+        recommendations.refresh_for_jobs([job["id"] for job in client.get("/jobs/search").json()])
+        with SessionLocal() as check_db:
+            assert check_db.query(JobRecommendation).filter(JobRecommendation.user_id == candidate_id).count() == 0
+        recommended = client.get("/jobs/recommended", headers=candidate_headers)
+        assert recommended.status_code == 200, recommended.text
+        recommended_jobs = recommended.json()
+        assert recommended_jobs[0]["title"] == "Python Intern", recommended_jobs
+        scores = [job["match_score"] for job in recommended_jobs]
+        assert scores == sorted(scores, reverse=True) and scores[-1] > 0, scores
+        assert job_id not in {job["id"] for job in recommended_jobs}
+        assert js_job.json()["id"] not in {job["id"] for job in recommended_jobs}
+
+        js_job_id = js_job.json()["id"]
+        assert client.patch(
+            f"/jobs/{js_job_id}", headers=recruiter_headers, json={"required_skills": "JavaScript, Kubernetes"}
+        ).status_code == 200
+        recommended_ids = [job["id"] for job in client.get("/jobs/recommended", headers=candidate_headers).json()]
+        assert js_job_id in recommended_ids, recommended_ids
+        assert client.patch(f"/jobs/{js_job_id}", headers=recruiter_headers, json={"is_active": False}).status_code == 200
+        with SessionLocal() as check_db:
+            assert check_db.query(JobRecommendation).filter(JobRecommendation.job_id == js_job_id).count() == 0
+
+        applicants = client.get(f"/jobs/{job_id}/applications", headers=recruiter_headers, params={"sort": "match"})
+        assert applicants.status_code == 200, applicants.text
+        applicant_scores = [applicant["match_score"] for applicant in applicants.json()]
+        assert all(score is not None for score in applicant_scores), applicant_scores
+        assert applicant_scores == sorted(applicant_scores, reverse=True), applicant_scores
+        assert client.get(f"/jobs/{job_id}/applications", headers=recruiter_headers).json()[0]["match_score"] is None
+        assert refresh_all_recommendations(SessionLocal) >= 2
+
+        # 19) Recruiters page and filter a job's applicants, see per-status
+        # counts and move several applicants at once with one audit entry
+        pipeline_job = client.post(
+            "/jobs",
+            headers=recruiter_headers,
+            json={
+                "company_id": company_id,
+                "title": "Pipeline Analyst",
+                "description": "Review hiring pipelines",
+                "required_skills": "SQL",
+                "work_mode": "remote",
+                "employment_type": "full-time",
+            },
+        )
+        assert pipeline_job.status_code == 201, pipeline_job.text
+        pipeline_job_id = pipeline_job.json()["id"]
+        applicant_headers = [candidate_headers]
+        db = SessionLocal()
+        try:
+            for index in range(3):
+                applicant_headers.append(auth_headers(*create_user(
+                    db,
+                    email=f"pipeline{index}.smoke@example.com",
+                    mobile=f"+1555000020{index}",
+                    full_name=f"Applicant {index}",
+                    role=UserRole.USER,
+                )))
+        finally:
+            db.close()
+        pipeline_ids = []
+        for headers in applicant_headers:
+            applied = client.post(f"/jobs/{pipeline_job_id}/apply", headers=headers, json={})
+            assert applied.status_code == 201, applied.text
+            pipeline_ids.append(applied.json()["id"])
+
+        for sort in ("recent", "match"):
+            first_page = client.get(
+                f"/jobs/{pipeline_job_id}/applications", headers=recruiter_headers, params={"limit": 3, "sort": sort}
+            )
+            assert first_page.status_code == 200 and len(first_page.json()) == 3, first_page.text
+            next_page = client.get(
+                f"/jobs/{pipeline_job_id}/applications",
+                headers=recruiter_headers,
+                params={"limit": 3, "sort": sort, "cursor": first_page.headers["X-Next-Cursor"]},
+            )
+            assert "X-Next-Cursor" not in next_page.headers
+            paged = [item["id"] for item in first_page.json() + next_page.json()]
+            assert sorted(paged) == sorted(pipeline_ids), paged
+        unpaged = client.get(f"/jobs/{pipeline_job_id}/applications", headers=recruiter_headers)
+        assert len(unpaged.json()) == len(pipeline_ids) and "X-Next-Cursor" not in unpaged.headers, unpaged.json()
+        assert client.get(
+            f"/jobs/{pipeline_job_id}/applications",
+            headers=recruiter_headers,
+            params={"sort": "match", "cursor": first_page.headers["X-Next-Cursor"]},
+        ).status_code == 200
+        assert client.get(
+            f"/jobs/{pipeline_job_id}/applications",
+            headers=recruiter_headers,
+            params={"sort": "recent", "cursor": first_page.headers["X-Next-Cursor"]},
+        ).status_code == 400
+
+        bulk = client.patch(
+            f"/jobs/{pipeline_job_id}/applications/status",
+            headers=recruiter_headers,
+            json={"application_ids": pipeline_ids[:3] + [application_id], "status": "Reviewed", "is_shortlisted": True},
+        )
+        assert bulk.status_code == 200, bulk.text
+        assert bulk.json() == {"updated_ids": sorted(pipeline_ids[:3]), "not_found_ids": [application_id]}, bulk.json()
+        counts = client.get(f"/jobs/{pipeline_job_id}/applications/counts", headers=recruiter_headers).json()
+        assert counts["total"] == 4 and counts["shortlisted"] == 3, counts
+        assert counts["by_status"]["Reviewed"] == 3 and counts["by_status"]["Applied"] == 1, counts
+        reviewed = client.get(
+            f"/jobs/{pipeline_job_id}/applications",
+            headers=recruiter_headers,
+            params={"status": "Reviewed", "is_shortlisted": True},
+        ).json()
+        assert sorted(item["id"] for item in reviewed) == sorted(pipeline_ids[:3]), reviewed
+        assert client.get(
+            f"/jobs/{pipeline_job_id}/applications/counts", headers=candidate_headers
+        ).status_code == 403
+        recent_actions = [entry["action"] for entry in client.get("/admin/audit-logs", headers=admin_headers).json()]
+        assert recent_actions.count("application_status_bulk_updated") == 1, recent_actions
+
+        # 20) Recruiters import jobs in bulk from NDJSON or CSV with a result per
+        # row, and export a company's jobs and applications as a stream
+        ndjson_upload = "\n".join([
+            json.dumps({"company_id": company_id, "title": "Imported Analyst", "description": "Imported from the ATS feed",
+                        "required_skills": "SQL, Python", "work_mode": "remote"}),
+            json.dumps({"company_id": company_id, "description": "Missing a title entirely"}),
+            "{not json",
+            "",
+            json.dumps({"company_id": 999999, "title": "Ghost Job", "description": "Company does not exist"}),
+        ])
+        imported = client.post(
+            "/jobs/import",
+            headers={**recruiter_headers, "Content-Type": "application/x-ndjson"},
+            content=ndjson_upload.encode("utf-8"),
+        )
+        assert imported.status_code == 200, imported.text
+        import_results = [json.loads(line) for line in imported.text.splitlines()]
+        assert [result.get("status") for result in import_results[:4]] == ["created", "error", "error", "error"]
+        assert [result["row"] for result in import_results[:4]] == [1, 2, 3, 4], import_results
+        assert import_results[3]["errors"] == ["Company not found"], import_results
+        assert import_results[-1] == {"created": 1, "failed": 3}, import_results[-1]
+        imported_job = client.get(f"/jobs/{import_results[0]['job_id']}").json()
+        assert imported_job["title"] == "Imported Analyst" and imported_job["work_mode"] == "remote", imported_job
+
+        csv_upload = (
+            "company_id,title,description,salary_min,salary_max\r\n"
+            f'{company_id},CSV Engineer,"Line one of the role,\r\n""quoted"" line two",100,200\r\n'
+            f"{company_id},Backwards Pay,Salary range is inverted,500,100\r\n"
+        )
+        csv_import = client.post(
+            "/jobs/import", headers={**recruiter_headers, "Content-Type": "text/csv"}, content=csv_upload.encode("utf-8")
+        )
+        csv_results = [json.loads(line) for line in csv_import.text.splitlines()]
+        assert csv_results[0]["status"] == "created", csv_results
+        assert csv_results[1]["errors"] == ["salary_min cannot exceed salary_max"], csv_results
+        csv_job = client.get(f"/jobs/{csv_results[0]['job_id']}").json()
+        assert csv_job["description"].endswith('"quoted" line two'), csv_job
+
+        exported = client.get(
+            "/jobs/export", headers=recruiter_headers, params={"company_id": company_id, "format": "ndjson"}
+        )
+        assert exported.status_code == 200, exported.text
+        exported_ids = [json.loads(line)["id"] for line in exported.text.splitlines()]
+        assert exported_ids == sorted(exported_ids) and csv_results[0]["job_id"] in exported_ids, exported_ids
+        exported_csv = client.get(
+            "/jobs/export",
+            headers=recruiter_headers,
+            params={"company_id": company_id, "resource": "applications", "format": "csv"},
+        )
+        assert exported_csv.status_code == 200 and exported_csv.headers["content-type"].startswith("text/csv")
+        application_rows = list(csv.DictReader(io.StringIO(exported_csv.text)))
+        assert {int(row["id"]) for row in application_rows} >= set(pipeline_ids), application_rows
+        assert client.get(
+            "/jobs/export", headers=candidate_headers, params={"company_id": company_id}
+        ).status_code == 403
+
+        # 21) A failing audit write drops only that event and the writer thread
+        # keeps running; a durable event that cannot be written fails its commit,
+        # rolling back the business change, and one from a rolled-back savepoint
+        # is never written
+        original_append = audit_module._append_to_chain
+
+        def poisoned_append(session, events):
+            if any(item.action == "smoke_poisoned" for item in events):
+                raise IntegrityError("INSERT INTO audit_logs", {}, Exception("forced failure"))
+            original_append(session, events)
+
+        audit_module._append_to_chain = poisoned_append
+        try:
+            with SessionLocal() as audit_db:
+                log_audit_event(audit_db, action="smoke_poisoned", target_type="smoke")
+                survivor = log_audit_event(audit_db, action="smoke_survivor", target_type="smoke")
+                audit_db.commit()
+            assert flush_audit_events() and survivor.written
+            with SessionLocal() as audit_db:
+                audit_db.add(SearchIndexVersion(name="smoke_durable", version=1))
+                durable = log_audit_event(audit_db, action="smoke_poisoned", target_type="smoke", sync=True)
+                try:
+                    audit_db.commit()
+                    raise AssertionError("commit succeeded without its durable audit event")
+                except IntegrityError:
+                    audit_db.rollback()
+            assert durable.written is False
+        finally:
+            audit_module._append_to_chain = original_append
+        assert audit_writer.running
+        with SessionLocal() as audit_db:
+            assert audit_db.get(SearchIndexVersion, "smoke_durable") is None
+            try:
+                with audit_db.begin_nested():
+                    rolled_back = log_audit_event(audit_db, action="smoke_savepoint", target_type="smoke", sync=True)
+                    raise RuntimeError("roll back the savepoint")
+            except RuntimeError:
+                pass
+            with audit_db.begin_nested():
+                released = log_audit_event(audit_db, action="smoke_released", target_type="smoke")
+            after_failure = log_audit_event(audit_db, action="smoke_after_failure", target_type="smoke", sync=True)
+            audit_db.commit()
+        assert after_failure.written and not rolled_back.written
+        assert flush_audit_events() and released.written
+        with SessionLocal() as audit_db:
+            assert audit_db.query(AuditLog).filter(AuditLog.action == "smoke_savepoint").count() == 0
+        audit_counters = client.get("/admin/metrics", headers=admin_headers).json()["counters"]
+        assert audit_counters["audit.events_dropped"] == 1
+        assert client.get("/admin/audit-logs/verify", headers=admin_headers).json()["valid"], "chain broken"
+
+        # 22) The NumPy and pure-Python scorers agree, including which of the
+        # jobs tied at the top-k boundary are kept (the highest job ids)
+        if recommendations.np is None:
+            print("skipping NumPy scorer comparison: numpy is not installed")
+        else:
+            tied_vector = {1: 0.4, "python": 0.2}
+            fixture = dict(
+                job_ids=[9, 3, 14, 7, 11, 20, 5, 2],
+                vectors=[tied_vector, tied_vector, {2: 0.5}, tied_vector, tied_vector, {1: 0.5, "python": 0.3}, {}, {"python": 0.1}],
+                remote=[True, True, False, True, True, False, True, False],
+                location_keys=[None, None, "pune", None, None, "bengaluru", None, "delhi"],
+                idf={1: 1.0, 2: 1.0, "python": 1.0},
+            )
+            vectorized = JobMatrix(**fixture)
+            numpy_module, recommendations.np = recommendations.np, None
+            try:
+                plain = JobMatrix(**fixture)
+            finally:
+                recommendations.np = numpy_module
+            profile_vector = {1: 1.0, "python": 0.8, 2: 0.1}
+            for location in (None, "bengaluru", "pune"):
+                for k in (1, 3, 4, 10):
+                    expected = plain.top_jobs(profile_vector, location, k)
+                    actual = vectorized.top_jobs(profile_vector, location, k)
+                    assert [job for job, _ in actual] == [job for job, _ in expected], (location, k, actual, expected)
+                    assert all(abs(a - b) < 1e-9 for (_, a), (_, b) in zip(actual, expected)), (actual, expected)
+            assert [job for job, _ in plain.top_jobs(profile_vector, None, 3)] == [20, 11, 9]
+
         print("SMOKE TEST PASSED")
         print(f"company_id={company_id}, job_id={job_id}, application_id={application_id}, conversation_id={conversation_id}")
         print(f"audit_logs={len(logs)}")
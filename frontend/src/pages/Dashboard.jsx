@@ -9,8 +9,8 @@ const Dashboard = () => {
   const [postImage, setPostImage] = useState(null);
   const [friendPosts, setFriendPosts] = useState([]);
   const [companyJobs, setCompanyJobs] = useState([]);
-  const [postOffset, setPostOffset] = useState(0);
-  const [jobOffset, setJobOffset] = useState(0);
+  const [postCursor, setPostCursor] = useState(null);
+  const [jobCursor, setJobCursor] = useState(null);
   const [hasMorePosts, setHasMorePosts] = useState(true);
   const [hasMoreJobs, setHasMoreJobs] = useState(true);
   const [loadingFeed, setLoadingFeed] = useState(true);
@@ -19,6 +19,7 @@ const Dashboard = () => {
   const [editingPostId, setEditingPostId] = useState(null);
   const [editContent, setEditContent] = useState('');
   const [commentDrafts, setCommentDrafts] = useState({});
+  const [commentCursors, setCommentCursors] = useState({});
   const [error, setError] = useState('');
   const feedAnchorRef = useRef(null);
 
@@ -44,15 +45,19 @@ const Dashboard = () => {
         setLoadingFeed(true);
       }
 
-      const params = append
-        ? { post_offset: postOffset, job_offset: jobOffset, limit: 10 }
-        : { post_offset: 0, job_offset: 0, limit: 10 };
+      const params = { limit: 10 };
+      if (append && postCursor) {
+        params.post_cursor = postCursor;
+      }
+      if (append && jobCursor) {
+        params.job_cursor = jobCursor;
+      }
       const response = await feedAPI.getHomeFeed(params);
       const data = response.data || {
         friend_posts: [],
         company_jobs: [],
-        next_post_offset: 0,
-        next_job_offset: 0,
+        next_post_cursor: null,
+        next_job_cursor: null,
         has_more_posts: false,
         has_more_jobs: false,
       };
@@ -65,8 +70,8 @@ const Dashboard = () => {
         setCompanyJobs(data.company_jobs || []);
       }
 
-      setPostOffset(data.next_post_offset || 0);
-      setJobOffset(data.next_job_offset || 0);
+      setPostCursor(data.next_post_cursor || null);
+      setJobCursor(data.next_job_cursor || null);
       setHasMorePosts(Boolean(data.has_more_posts));
       setHasMoreJobs(Boolean(data.has_more_jobs));
     } catch (err) {
@@ -106,7 +111,7 @@ const Dashboard = () => {
 
     observer.observe(anchor);
     return () => observer.disconnect();
-  }, [loadingFeed, loadingMore, hasMorePosts, hasMoreJobs, postOffset, jobOffset]);
+  }, [loadingFeed, loadingMore, hasMorePosts, hasMoreJobs, postCursor, jobCursor]);
 
   const handleCreatePost = async (event) => {
     event.preventDefault();
@@ -155,6 +160,25 @@ const Dashboard = () => {
     }
   };
 
+  const handleLoadMoreComments = async (post) => {
+    try {
+      setError('');
+      const cursor = commentCursors[post.id];
+      const response = await feedAPI.listPostComments(post.id, cursor ? { cursor } : {});
+      const merged = new Map();
+      [...(response.data.comments || []), ...(post.comments || [])].forEach((comment) => {
+        merged.set(comment.id, comment);
+      });
+      const comments = [...merged.values()].sort(
+        (a, b) => new Date(a.created_at) - new Date(b.created_at) || a.id - b.id
+      );
+      replacePostInState({ ...post, comments });
+      setCommentCursors((previous) => ({ ...previous, [post.id]: response.data.next_cursor }));
+    } catch (err) {
+      setError(err?.response?.data?.detail || 'Failed to load comments');
+    }
+  };
+
   const startEditingPost = (post) => {
     setEditingPostId(post.id);
     setEditContent(post.content || '');
@@ -298,6 +322,15 @@ const Dashboard = () => {
                 </div>
 
                 <div className="mt-3 space-y-2">
+                  {(post.comments || []).length < (post.comment_count || 0) && (
+                    <button
+                      type="button"
+                      className="text-xs font-semibold text-[#0a66c2] hover:underline"
+                      onClick={() => handleLoadMoreComments(post)}
+                    >
+                      View earlier comments
+                    </button>
+                  )}
                   {(post.comments || []).map((comment) => (
                     <div key={comment.id} className="rounded-lg border border-gray-100 bg-gray-50 px-3 py-2">
                       <div className="flex items-center justify-between gap-2">
@@ -138,6 +138,9 @@ const Messages = () => {
   const MESSAGE_POLL_INTERVAL_MS = 1500;
   const SIDEBAR_POLL_INTERVAL_MS = 2500;
   const CONVERSATION_POLL_INTERVAL_MS = 2000;
+  const SOCKET_RECONNECT_DELAY_MS = 5000;
+  const TYPING_SEND_INTERVAL_MS = 2000;
+  const TYPING_DISPLAY_MS = 4000;
 
   const [friends, setFriends] = useState([]);
   const [receivedRequests, setReceivedRequests] = useState([]);
@@ -145,6 +148,12 @@ const Messages = () => {
   const [searchResults, setSearchResults] = useState([]);
   const [conversations, setConversations] = useState([]);
   const [messages, setMessages] = useState([]);
+  const [olderMessagesCursor, setOlderMessagesCursor] = useState(null);
+  const messagesRef = useRef({ conversationId: null, items: [] });
+  const socketRef = useRef(null);
+  const realtimeHandlerRef = useRef(() => {});
+  const lastTypingSentRef = useRef(0);
+  const [typingIndicator, setTypingIndicator] = useState(null);
   const [seenConversationMap, setSeenConversationMap] = useState(() => {
     try {
       if (typeof window === 'undefined') {
@@ -314,6 +323,16 @@ const Messages = () => {
     [conversations, activeConversationId]
   );
 
+  const lastOwnMessageSeen = useMemo(() => {
+    const lastMessage = messages[messages.length - 1];
+    if (!lastMessage || lastMessage.sender_id !== user?.id) {
+      return false;
+    }
+    return Object.entries(activeConversation?.read_cursors || {}).some(
+      ([participantId, messageId]) => Number(participantId) !== user?.id && messageId >= lastMessage.id
+    );
+  }, [messages, activeConversation, user]);
+
   const isActiveGroupAdmin = Boolean(activeConversation?.is_group && activeConversation?.created_by === user?.id);
 
   const availableFriendsForGroup = useMemo(() => {
@@ -401,8 +420,14 @@ const Messages = () => {
   const loadConversations = async (options = {}) => {
     const { silent = false } = options;
     try {
-      const response = await messageAPI.listConversations();
-      setConversations(response.data || []);
+      const loaded = [];
+      let cursor = null;
+      do {
+        const response = await messageAPI.listConversations(cursor ? { cursor } : {});
+        loaded.push(...(response.data || []));
+        cursor = response.headers?.['x-next-cursor'] || null;
+      } while (cursor);
+      setConversations(loaded);
     } catch (err) {
       if (!silent) {
         setError(getApiErrorMessage(err, 'Failed to load conversations'));
@@ -505,12 +530,29 @@ const Messages = () => {
       if (!silent) {
         setLoadingMessages(true);
       }
+      const loaded = messagesRef.current;
+      const lastMessage = loaded.conversationId === conversationId ? loaded.items[loaded.items.length - 1] : null;
+      if (silent && lastMessage) {
+        const response = await messageAPI.listMessages(conversationId, { since_id: lastMessage.id });
+        const newer = response.data || [];
+        if (newer.length > 0 && messagesRef.current.conversationId === conversationId) {
+          const items = [...messagesRef.current.items, ...newer.filter((message) => message.id > lastMessage.id)];
+          messagesRef.current = { conversationId, items };
+          setMessages(items);
+        }
+        return;
+      }
+
       const response = await messageAPI.listMessages(conversationId);
-      setMessages(response.data || []);
+      const items = response.data || [];
+      messagesRef.current = { conversationId, items };
+      setMessages(items);
+      setOlderMessagesCursor(response.headers?.['x-next-cursor'] || null);
     } catch (err) {
       if (!silent) {
         setError(getApiErrorMessage(err, 'Failed to load messages'));
         setMessages([]);
+        messagesRef.current = { conversationId: null, items: [] };
       }
     } finally {
       if (!silent) {
@@ -519,6 +561,108 @@ const Messages = () => {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!activeConversationId || !olderMessagesCursor) {
+      return;
+    }
+
+    try {
+      const conversationId = activeConversationId;
+      const response = await messageAPI.listMessages(conversationId, { before: olderMessagesCursor });
+      if (messagesRef.current.conversationId !== conversationId) {
+        return;
+      }
+      const items = [...(response.data || []), ...messagesRef.current.items];
+      messagesRef.current = { conversationId, items };
+      setMessages(items);
+      setOlderMessagesCursor(response.headers?.['x-next-cursor'] || null);
+    } catch (err) {
+      setError(getApiErrorMessage(err, 'Failed to load earlier messages'));
+    }
+  };
+
+  const isSocketOpen = () => socketRef.current?.readyState === WebSocket.OPEN;
+
+  const sendSocketEvent = (payload) => {
+    if (!isSocketOpen()) {
+      return false;
+    }
+    socketRef.current.send(JSON.stringify(payload));
+    return true;
+  };
+
+  realtimeHandlerRef.current = (payload) => {
+    if (payload.type === 'message') {
+      const loaded = messagesRef.current;
+      const lastMessage = loaded.items[loaded.items.length - 1];
+      if (
+        payload.conversation_id === activeConversationId &&
+        loaded.conversationId === activeConversationId &&
+        (!lastMessage || payload.message.id > lastMessage.id)
+      ) {
+        const items = [...loaded.items, payload.message];
+        messagesRef.current = { conversationId: activeConversationId, items };
+        setMessages(items);
+      }
+      if (payload.message.sender_id === typingIndicator?.userId) {
+        setTypingIndicator(null);
+      }
+      loadConversations({ silent: true });
+    } else if (payload.type === 'typing') {
+      setTypingIndicator({ conversationId: payload.conversation_id, userId: payload.user_id, at: Date.now() });
+    } else if (payload.type === 'read') {
+      setConversations((previous) => previous.map((conversation) => (
+        conversation.id === payload.conversation_id
+          ? {
+            ...conversation,
+            read_cursors: { ...(conversation.read_cursors || {}), [String(payload.user_id)]: payload.message_id },
+          }
+          : conversation
+      )));
+    }
+  };
+
+  useEffect(() => {
+    let closed = false;
+    let retryTimer = null;
+
+    const connect = () => {
+      const socket = new WebSocket(messageAPI.socketUrl());
+      socketRef.current = socket;
+      socket.onmessage = (event) => {
+        try {
+          realtimeHandlerRef.current(JSON.parse(event.data));
+        } catch {
+          // Ignore malformed events
+        }
+      };
+      socket.onclose = () => {
+        if (socketRef.current === socket) {
+          socketRef.current = null;
+        }
+        if (!closed) {
+          retryTimer = setTimeout(connect, SOCKET_RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socketRef.current?.close();
+      socketRef.current = null;
+    };
+  }, []);
+
+  useEffect(() => {
+    if (!typingIndicator) {
+      return;
+    }
+    const timeoutId = setTimeout(() => setTypingIndicator(null), TYPING_DISPLAY_MS);
+    return () => clearTimeout(timeoutId);
+  }, [typingIndicator]);
+
   useEffect(() => {
     if (!activeConversationId) {
       return;
@@ -528,7 +672,8 @@ const Messages = () => {
     let inFlight = false;
 
     const poll = async () => {
-      if (cancelled || inFlight) {
+      // New messages arrive over the socket while it is connected
+      if (cancelled || inFlight || isSocketOpen()) {
         return;
       }
 
@@ -556,6 +701,14 @@ const Messages = () => {
     if (lastMessage?.created_at) {
       markConversationSeen(activeConversationId, lastMessage.created_at);
     }
+
+    const readCursor = activeConversation?.read_cursors?.[String(user?.id)] || 0;
+    if (lastMessage && lastMessage.sender_id !== user?.id && lastMessage.id > readCursor) {
+      const event = { type: 'read', conversation_id: activeConversationId, message_id: lastMessage.id };
+      if (!sendSocketEvent(event)) {
+        messageAPI.markConversationRead(activeConversationId, lastMessage.id).catch(() => {});
+      }
+    }
   }, [activeConversationId, messages]);
 
   const initializeConversationKeyForParticipants = async (conversation) => {
@@ -681,6 +834,7 @@ const Messages = () => {
         setActiveConversationTitle('');
         setActiveConversationSubtitle('');
         setMessages([]);
+        messagesRef.current = { conversationId: null, items: [] };
       }
       setSuccess('Friend removed');
       await loadSidebarData();
@@ -717,6 +871,7 @@ const Messages = () => {
     } catch (err) {
       setError(getApiErrorMessage(err, err?.message || 'Unable to open encrypted chat'));
       setMessages([]);
+      messagesRef.current = { conversationId: null, items: [] };
     }
   };
 
@@ -742,6 +897,7 @@ const Messages = () => {
     } catch (err) {
       setError(getApiErrorMessage(err, err?.message || 'Failed to open encrypted group conversation'));
       setMessages([]);
+      messagesRef.current = { conversationId: null, items: [] };
     }
   };
 
@@ -907,7 +1063,7 @@ const Messages = () => {
         message_type: messageType,
       });
       setMessageInput('');
-      await loadMessages(activeConversationId);
+      await loadMessages(activeConversationId, { silent: true });
     } catch (err) {
       setError(getApiErrorMessage(err, err?.message || 'Failed to send encrypted message'));
     } finally {
@@ -1224,7 +1380,15 @@ const Messages = () => {
             ) : messages.length === 0 ? (
               <div className="text-sm text-gray-500">No messages yet. Say hello 👋</div>
             ) : (
-              messages.map((message) => {
+              <>
+              {olderMessagesCursor && (
+                <div className="flex justify-center">
+                  <button type="button" className="text-xs font-semibold text-[#0a66c2] hover:underline" onClick={loadOlderMessages}>
+                    Load earlier messages
+                  </button>
+                </div>
+              )}
+              {messages.map((message) => {
                 const isMine = message.sender_id === user?.id;
                 const decryptedTextPromise = buildMessagePromise(message);
                 return (
@@ -1234,7 +1398,14 @@ const Messages = () => {
                     </div>
                   </div>
                 );
-              })
+              })}
+              {lastOwnMessageSeen && <p className="text-right text-[11px] text-gray-500">Seen</p>}
+              </>
+            )}
+            {typingIndicator?.conversationId === activeConversationId && (
+              <p className="text-xs italic text-gray-500">
+                {activeConversation?.participant_names?.[String(typingIndicator.userId)] || 'Someone'} is typing...
+              </p>
             )}
           </div>
 
@@ -1244,7 +1415,13 @@ const Messages = () => {
               rows={2}
               placeholder={activeConversationId ? 'Write a message...' : 'Select a friend or group to start chatting'}
               value={messageInput}
-              onChange={(event) => setMessageInput(event.target.value)}
+              onChange={(event) => {
+                setMessageInput(event.target.value);
+                if (activeConversationId && Date.now() - lastTypingSentRef.current > TYPING_SEND_INTERVAL_MS) {
+                  lastTypingSentRef.current = Date.now();
+                  sendSocketEvent({ type: 'typing', conversation_id: activeConversationId });
+                }
+              }}
               disabled={!activeConversationId || sending || !encryptionReady}
             />
             <button
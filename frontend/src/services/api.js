@@ -142,7 +142,7 @@ export const jobsAPI = {
 // Messaging APIs
 export const messageAPI = {
   createConversation: (data) => api.post('/messages/conversations', data),
-  listConversations: () => api.get('/messages/conversations'),
+  listConversations: (params = {}) => api.get('/messages/conversations', { params }),
   renameGroup: (conversationId, name) => api.patch(`/messages/conversations/${conversationId}/name`, { name }),
   addGroupMember: (conversationId, userId) => api.post(`/messages/conversations/${conversationId}/participants`, { user_id: userId }),
   removeGroupMember: (conversationId, userId) => api.delete(`/messages/conversations/${conversationId}/participants/${userId}`),
@@ -152,7 +152,13 @@ export const messageAPI = {
   approveGroupJoinRequest: (conversationId, requestId) => api.post(`/messages/conversations/${conversationId}/join-requests/${requestId}/approve`),
   rejectGroupJoinRequest: (conversationId, requestId) => api.post(`/messages/conversations/${conversationId}/join-requests/${requestId}/reject`),
   sendMessage: (conversationId, data) => api.post(`/messages/conversations/${conversationId}/messages`, data),
-  listMessages: (conversationId) => api.get(`/messages/conversations/${conversationId}/messages`),
+  markConversationRead: (conversationId, messageId) =>
+    api.post(`/messages/conversations/${conversationId}/read`, { message_id: messageId }),
+  socketUrl: () => {
+    const token = localStorage.getItem('access_token') || '';
+    return `${API_BASE_URL.replace(/^http/, 'ws')}/messages/ws?token=${encodeURIComponent(token)}`;
+  },
+  listMessages: (conversationId, params = {}) => api.get(`/messages/conversations/${conversationId}/messages`, { params }),
   upsertMyPublicKey: (publicKey) => api.put('/messages/keys/me', { public_key: publicKey }),
   getUsersPublicKeys: (userIds) => api.get('/messages/keys/users', { params: { user_ids: userIds.join(',') } }),
   upsertConversationKeys: (conversationId, envelopes) =>
@@ -192,6 +198,7 @@ export const feedAPI = {
   deletePost: (postId) => api.delete(`/feed/posts/${postId}`),
   togglePostLike: (postId) => api.post(`/feed/posts/${postId}/likes/toggle`),
   addPostComment: (postId, content) => api.post(`/feed/posts/${postId}/comments`, { content }),
+  listPostComments: (postId, params = {}) => api.get(`/feed/posts/${postId}/comments`, { params }),
 };
 
 export default api;
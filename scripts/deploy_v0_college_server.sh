@@ -28,6 +28,9 @@ set -a
 source "$REPO_ROOT/.env"
 set +a
 
+echo "[v0] Applying database migrations..."
+./.venv/bin/python -m app.tools.migrate_db upgrade
+
 echo "[v0] Restarting backend on 0.0.0.0:${BACKEND_PORT}..."
 fuser -k "${BACKEND_PORT}/tcp" >/dev/null 2>&1 || true
 nohup ./.venv/bin/python -m uvicorn app.main:app --host 0.0.0.0 --port "$BACKEND_PORT" > "$REPO_ROOT/backend/backend_v0.log" 2>&1 &
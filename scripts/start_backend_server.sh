@@ -36,5 +36,8 @@ fi
 # optional: kill old process on 8010
 fuser -k 8010/tcp >/dev/null 2>&1 || true
 
+echo "Applying database migrations..."
+./.venv/bin/python -m app.tools.migrate_db upgrade
+
 echo "Starting backend on 0.0.0.0:8010"
 ./.venv/bin/python -m uvicorn app.main:app --host 0.0.0.0 --port 8010